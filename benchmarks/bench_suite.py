@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Benchmarks de los caminos críticos sobre un archivo sintético de varios tamaños: buscar pacientes
+(índice, búsqueda incremental y recorrido sin índice), historial (importar el log y leer páginas),
+carpeta de origen (find_docs_ordered) y organizar un lote. Para cada caso se mide el mejor tiempo
+de varias repeticiones y el pico de memoria de Python (tracemalloc, en una pasada aparte).
+
+    python benchmarks/bench_suite.py                           # tamaños pequeño y mediano
+    python benchmarks/bench_suite.py --tamanos grande -r 5
+    python benchmarks/bench_suite.py --guardar                 # guarda benchmarks/baseline.json
+    python benchmarks/bench_suite.py --comparar                # compara con la referencia guardada
+
+Con --comparar, los casos más lentos que la referencia en más de --umbral (25 % por defecto)
+se marcan y el código de salida es 1. La referencia depende del equipo: compárala en el mismo.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import make_archive, make_log, make_inbox, DEFAULT_DAYS
+from terapias_config import MESES
+from terapias_fuzzy import IncrementalSearch, normalize_name, name_score
+from terapias_history import HistoryStore
+from terapias_inbox import InboxSnapshot
+from terapias_index import PatientIndex
+from terapias_journal import OperationJournal
+from terapias_organize import plan_batch, apply_batch, record_batch
+from terapias_walk import iter_patient_folders
+
+# años, pacientes por día, documentos en la carpeta de origen, documentos por lote
+SIZES = {
+    "pequeno": {"years": 1, "patients": 5, "inbox": 200, "batch": 20},
+    "mediano": {"years": 3, "patients": 10, "inbox": 2000, "batch": 50},
+    "grande": {"years": 5, "patients": 20, "inbox": 10000, "batch": 100},
+}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def measure(run, setup=None, repeat: int = 3) -> dict:
+    """Mejor tiempo de repeat pasadas de run(setup()) y pico de memoria de una pasada más."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        result = run(state)
+        best = min(best, time.perf_counter() - start)
+    state = setup() if setup else None
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ms": round(best * 1000, 2), "pico_kb": round(peak / 1024, 1), "n": result if isinstance(result, int) else None}
+
+
+def find_docs_listdir(source_dir: str, max_count: int = 50) -> list:
+    """find_docs_ordered original: os.listdir, un getmtime por archivo y ordenar la lista entera."""
+    result = []
+    for fname in os.listdir(source_dir):
+        if fname.lower().endswith((".doc", ".docx")):
+            fpath = os.path.join(source_dir, fname)
+            result.append((fpath, os.path.getmtime(fpath)))
+    result.sort(key=lambda x: x[1], reverse=True)
+    return result[:max_count]
+
+
+def search_fs(base: str, query: str, max_results: int = 100) -> int:
+    """Búsqueda sin índice de search_patients: recorrido completo y name_score por carpeta."""
+    tokens = normalize_name(query).split()
+    found = 0
+    for patient, *_ in iter_patient_folders(base):
+        if found < max_results and name_score(tokens, normalize_name(patient).split()) > 0:
+            found += 1
+    return found
+
+
+def run_size(name: str, spec: dict, work: str, repeat: int, days: int) -> dict:
+    base = os.path.join(work, "TERAPIAS")
+    t0 = time.perf_counter()
+    entries = make_archive(base, spec["years"], days, spec["patients"])
+    logfile = os.path.join(work, "organizar_log.txt")
+    log_lines = make_log(logfile, entries)
+    inbox_dir = os.path.join(work, "origen")
+    make_inbox(inbox_dir, spec["inbox"])
+    print(f"\n== {name}: {len(entries)} carpetas de paciente, {log_lines} líneas de log, "
+          f"{spec['inbox']} documentos en origen (generado en {time.perf_counter() - t0:.1f} s)")
+
+    query = entries[len(entries) // 2][0]
+    typed = [query[:i] for i in range(2, len(query) + 1)]
+    index = PatientIndex(os.path.join(work, "indice.sqlite"), MESES)
+    index.rebuild(base)
+    history_paths = iter(range(10**6))
+    history = HistoryStore(os.path.join(work, "historial.sqlite"))
+    history.import_log([logfile])
+    snapshot = InboxSnapshot()
+    snapshot.find(inbox_dir)
+    journal = OperationJournal(os.path.join(work, "operaciones"))
+    today = datetime.date(2026, 12, 31)
+    batch_dir = os.path.join(work, "lote")
+
+    def new_batch():
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        return [(path, f"SS {patient}") for path, patient in make_inbox(batch_dir, spec["batch"])]
+
+    def organize(items, use_journal):
+        plan = plan_batch(items, base, today, MESES)
+        results = apply_batch(plan, os.path.join(work, "RESPALDO"), journal=journal if use_journal else None)
+        return record_batch(results, index, history, base, journal if use_journal else None)
+
+    def incremental(_):
+        session = IncrementalSearch()
+        return sum(len(index.search(q, 100, session)) for q in typed)
+
+    cases = [
+        ("índice: reconstruir", lambda _: index.rebuild(base) or 0, None),
+        ("buscar: índice (frío)", lambda idx: len(idx.search(query)), lambda: PatientIndex(index.db_path, MESES)),
+        ("buscar: índice (caliente)", lambda _: len(index.search(query)), lambda: index.search(query)),
+        ("buscar: al escribir", incremental, None),
+        ("buscar: sin índice", lambda _: search_fs(base, query), None),
+        ("historial: importar log", lambda h: h.import_log([logfile]),
+         lambda: HistoryStore(os.path.join(work, f"historial_{next(history_paths)}.sqlite"))),
+        ("historial: primera página", lambda _: len(history.page(0, 50)), None),
+        ("historial: filtrar paciente", lambda _: len(history.get_many(history.find_ids(query)[:50])), None),
+        ("origen: listdir + stat", lambda _: len(find_docs_listdir(inbox_dir)), None),
+        ("origen: instantánea (fría)", lambda snap: len(snap.find(inbox_dir)), InboxSnapshot),
+        ("origen: instantánea", lambda _: len(snapshot.find(inbox_dir)), None),
+        ("organizar lote", lambda items: organize(items, False), new_batch),
+        ("organizar lote + diario", lambda items: organize(items, True), new_batch),
+    ]
+    results = {}
+    for case, run, setup in cases:
+        r = measure(run, setup, repeat)
+        results[case] = r
+        count = f"{r['n']:7d}" if r["n"] is not None else " " * 7
+        print(f"  {case:<30} {r['ms']:10.1f} ms {r['pico_kb']:10.0f} KB {count}")
+    journal.close()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> int:
+    """Imprime la comparación con la referencia y devuelve cuántos casos empeoraron."""
+    worse = 0
+    print(f"\nComparación con la referencia del {baseline.get('fecha', '?')} ({baseline.get('plataforma', '?')}):")
+    for size, cases in results.items():
+        old_cases = baseline.get("resultados", {}).get(size)
+        if not old_cases:
+            continue
+        for case, r in cases.items():
+            old = old_cases.get(case)
+            if not old or not old["ms"]:
+                continue
+            ratio = r["ms"] / old["ms"]
+            mark = ""
+            if ratio > 1 + threshold:
+                mark = "  ▲ más lento"
+                worse += 1
+            elif ratio < 1 - threshold:
+                mark = "  ▼ más rápido"
+            print(f"  {size:<8} {case:<30} {old['ms']:10.1f} → {r['ms']:10.1f} ms  x{ratio:5.2f}{mark}")
+    return worse
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", default="pequeno,mediano", help=f"Tamaños separados por comas: {', '.join(SIZES)}")
+    parser.add_argument("--dias", type=int, default=DEFAULT_DAYS, help="Días con consulta por mes")
+    parser.add_argument("-r", "--repeticiones", type=int, default=3)
+    parser.add_argument("--guardar", nargs="?", const=DEFAULT_BASELINE, metavar="JSON", help="Guardar los resultados como referencia")
+    parser.add_argument("--comparar", nargs="?", const=DEFAULT_BASELINE, metavar="JSON", help="Comparar con una referencia guardada")
+    parser.add_argument("--umbral", type=float, default=0.25, help="Diferencia relativa que cuenta como cambio")
+    args = parser.parse_args(argv)
+
+    names = [s.strip() for s in args.tamanos.split(",") if s.strip()]
+    unknown = [s for s in names if s not in SIZES]
+    if unknown:
+        parser.error(f"Tamaño desconocido: {', '.join(unknown)}")
+    baseline = None
+    if args.comparar:
+        try:
+            with open(args.comparar, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer la referencia {args.comparar}: {e}", file=sys.stderr)
+            return 2
+
+    results = {}
+    for name in names:
+        work = tempfile.mkdtemp(prefix=f"bench_{name}_")
+        try:
+            results[name] = run_size(name, SIZES[name], work, args.repeticiones, args.dias)
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    worse = compare(results, baseline, args.umbral) if baseline else 0
+    if args.guardar:
+        data = {"fecha": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "plataforma": f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+                "resultados": results}
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"\nReferencia guardada en {args.guardar}")
+    return 1 if worse else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Benchmark: recorrido anidado con os.listdir + os.path.isdir (versión original de
+search_patients) frente a terapias_walk.iter_patient_folders (scandir + hilos).
+
+    python benchmarks/bench_tree_walk.py                      # árbol sintético temporal
+    python benchmarks/bench_tree_walk.py --root "\\\\servidor\\TERAPIAS"   # árbol real (solo lectura)
+"""
+import argparse
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import make_archive
+from terapias_config import MESES
+from terapias_walk import iter_patient_folders
+
+
+def walk_listdir(base: str):
+    """Recorrido original: cuatro os.listdir anidados con un os.path.isdir por entrada."""
+    for year in os.listdir(base):
+        year_path = os.path.join(base, year)
+        if not os.path.isdir(year_path):
+            continue
+        for month in os.listdir(year_path):
+            month_path = os.path.join(year_path, month)
+            if not os.path.isdir(month_path):
+                continue
+            for day in os.listdir(month_path):
+                day_path = os.path.join(month_path, day)
+                if not os.path.isdir(day_path):
+                    continue
+                for patient in os.listdir(day_path):
+                    patient_path = os.path.join(day_path, patient)
+                    if os.path.isdir(patient_path):
+                        yield patient, patient_path, year, month, day
+
+
+def timed(fn, repeat: int) -> tuple[float, int]:
+    best, count = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in fn())
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", help="Árbol existente a recorrer (no se modifica)")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--days", type=int, default=22)
+    parser.add_argument("--patients", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    tmp = None
+    root = args.root
+    if not root:
+        tmp = tempfile.mkdtemp(prefix="bench_walk_")
+        root = tmp
+        total = len(make_archive(root, args.years, args.days, args.patients))
+        print(f"Árbol sintético: {total} carpetas de paciente en {root}")
+    try:
+        rows = [("listdir anidado", lambda: walk_listdir(root))]
+        for workers in (1, 4, 8, 16):
+            rows.append((f"scandir ({workers} hilos)", lambda w=workers: iter_patient_folders(root, max_workers=w)))
+        # Un mes concreto: con la poda por fechas el coste depende del rango, no del archivo
+        month = datetime.date(2026, 6, 1)
+        rows.append(("scandir (un mes)", lambda: iter_patient_folders(
+            root, date_from=month, date_to=month.replace(day=30), meses=MESES)))
+        base_time = None
+        for name, fn in rows:
+            seconds, count = timed(fn, args.repeat)
+            base_time = base_time or seconds
+            print(f"{name:<22} {seconds * 1000:9.1f} ms  {count:7d} carpetas  x{base_time / seconds:4.2f}")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
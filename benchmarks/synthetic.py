@@ -0,0 +1,96 @@
+"""
+Generadores de datos sintéticos para los benchmarks: un archivo de terapias con la estructura
+real (AÑO/MM- MES/DD DE MES/PACIENTE, creada con build_folder_structure y MESES), el log de texto
+antiguo que importa el historial y una carpeta de origen con documentos por organizar.
+Los nombres salen de un generador con semilla, así dos ejecuciones crean lo mismo.
+"""
+import os
+import sys
+import random
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from terapias_config import MESES
+from terapias_logic import build_folder_structure
+
+_FIRST = ("Juan", "María", "José", "Ana", "Luis", "Carmen", "Pedro", "Lucía", "Jorge", "Sofía",
+          "Andrés", "Valentina", "Carlos", "Isabel", "Miguel", "Paula", "Diego", "Elena", "Tomás", "Rocío")
+_LAST = ("García", "Pérez", "López", "Martínez", "Rodríguez", "Gómez", "Fernández", "Sánchez", "Díaz",
+         "Torres", "Ramírez", "Flores", "Castro", "Vargas", "Rojas", "Morales", "Ortiz", "Núñez", "Herrera",
+         "Medina", "Ruiz", "Silva", "Mendoza", "Aguilar", "Cruz", "Ibáñez", "Muñoz", "Peña", "Vega", "Soto")
+# Días laborables por mes en el archivo (~22)
+DEFAULT_DAYS = 22
+
+
+def patient_names(count: int, seed: int = 0) -> list[str]:
+    """count nombres distintos 'Nombre Apellido Apellido'."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(_FIRST)} {rng.choice(_LAST)} {rng.choice(_LAST)}")
+    return sorted(names)
+
+
+def make_archive(base: str, years: int, days: int = DEFAULT_DAYS, patients: int = 8, seed: int = 0,
+                 last_year: int = 2026) -> list[tuple[str, str, str, str, str]]:
+    """
+    Crea years × 12 meses × days días × patients carpetas de paciente bajo base. Cada día atiende
+    a patients pacientes de una lista fija (unas 20 veces más grande), como en la consulta real,
+    donde los mismos pacientes vuelven. Devuelve (paciente, ruta, año, mes, día) de cada carpeta.
+    """
+    rng = random.Random(seed)
+    pool = patient_names(max(patients * 20, patients), seed)
+    entries = []
+    for y in range(last_year - years + 1, last_year + 1):
+        for m in range(1, 13):
+            for d in range(1, days + 1):
+                ruta_anio, ruta_mes, ruta_dia, _ = build_folder_structure(base, y, m, d, MESES)
+                for patient in rng.sample(pool, patients):
+                    path = os.path.join(ruta_dia, patient)
+                    os.makedirs(path, exist_ok=True)
+                    entries.append((patient, path, os.path.basename(ruta_anio), os.path.basename(ruta_mes), os.path.basename(ruta_dia)))
+    return entries
+
+
+def make_log(path: str, entries, noise: int = 2, seed: int = 0) -> int:
+    """
+    Log de texto antiguo con una línea 'Esperado PDF' por carpeta de entries (formato de
+    parse_log_line) y noise líneas de otros mensajes entre cada una. Devuelve las líneas escritas.
+    """
+    rng = random.Random(seed)
+    lines = 0
+    when = datetime.datetime(2020, 1, 1, 8, 0, 0)
+    with open(path, "w", encoding="utf-8") as f:
+        for patient, folder, year, month, day in entries:
+            when += datetime.timedelta(seconds=rng.randint(30, 900))
+            ts = when.strftime("%Y-%m-%d %H:%M:%S")
+            for _ in range(noise):
+                f.write(f"{ts} - INFO - Vigilando {os.path.dirname(folder)} (sondeo)\n")
+            f.write(f"{ts} - INFO - Esperado PDF: SS {patient}.pdf → {folder} | Paciente: {patient} | Fecha: {year}/{month}/{day}\n")
+            lines += noise + 1
+    return lines
+
+
+def make_inbox(folder: str, count: int, seed: int = 0, extensions=(".docx", ".doc"), size: int = 2048) -> list[tuple[str, str]]:
+    """
+    count documentos 'Informe Paciente NNNNN.ext' en folder con fechas de modificación distintas
+    (la carpeta queda con la del más reciente, como una bandeja que no cambia desde hace rato).
+    Devuelve (ruta, paciente) de cada uno.
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    names = patient_names(min(count, 2000), seed)
+    start = datetime.datetime(2026, 1, 1).timestamp()
+    docs = []
+    mtime = start
+    for i in range(count):
+        patient = names[i % len(names)]
+        path = os.path.join(folder, f"Informe {patient} {i:05d}{rng.choice(extensions)}")
+        with open(path, "wb") as f:
+            f.write(rng.randbytes(size))
+        mtime = start + i * 60
+        os.utime(path, (mtime, mtime))
+        docs.append((path, patient))
+    os.utime(folder, (mtime, mtime))
+    return docs
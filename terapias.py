@@ -1,7 +1,7 @@
 """
 Organizador de Terapias - Aplicación unificada.
 Combina UI moderna (CustomTkinter), selector de carpeta, confirmación explícita,
-reintentos de respaldo y conversión automática a PDF (win32com).
+reintentos de respaldo y conversión automática a PDF (Word por COM o LibreOffice, ver terapias_pdf).
 """
 __version__ = "3.0.0"
 
@@ -13,6 +13,8 @@ import datetime
 import subprocess
 import logging
 import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from logging.handlers import RotatingFileHandler
 import configparser
 import tkinter as tk
@@ -22,113 +24,98 @@ import customtkinter as ctk
 
 from ui_components import (
     VisionSys, apply_acrylic, GlassFrame, FloatingButton,
-    GlassCard, SectionHeader, add_tooltip, center_window
+    GlassCard, VirtualCardList, SectionHeader, add_tooltip, center_window
 )
 from terapias_logic import (
     sanitize_filename,
     patient_from_user_input,
     check_path_length,
     build_folder_structure,
+    parse_user_date,
+    date_range_preset,
+    DATE_PRESETS,
+)
+from terapias_index import PatientIndex
+from terapias_fuzzy import IncrementalSearch, normalize_name, name_score
+from terapias_walk import iter_patient_folders
+from terapias_content import ContentIndex
+from terapias_watch import FolderWatcher
+from terapias_history import HistoryStore, EVENT_ORGANIZED, EVENT_PDF
+from terapias_jobs import JobRunner, JobCancelled
+from terapias_pdf import ConverterPool, backend_factory, detect_backend, BACKEND_AUTO
+from terapias_convert import (
+    ConversionQueue, find_pending_docs, backup_converted, replay_backup, default_workers, pdf_path_for, KIND_BACKUP,
+    CONV_OK, CONV_SKIPPED, CONV_ERROR, CONV_CANCELLED,
+)
+from terapias_pending import PendingPdfTracker
+from terapias_backup import get_store
+from terapias_transfer import move_file, TransferCancelled
+from terapias_journal import OperationJournal
+from terapias_inbox import InboxSnapshot, InboxQueue, SUPPORTED_INBOX_EXTENSIONS, INBOX_READY
+from terapias_organize import (
+    plan_batch, apply_batch, record_batch, replay_organize, journal_step, free_doc_stem, STATUS_OK, DEFAULT_MAX_PATH_LEN, KIND_ORGANIZE,
+)
+from terapias_config import (
+    MESES, USER_HOME, INDEX_FILE_NAME, CONTENT_INDEX_FILE_NAME, HISTORY_FILE_NAME, JOURNAL_DIR_NAME,
+    config_path, load_config as _load_config, get_rutas, get_pdf_config, get_backup_config, get_inbox_config, data_file,
 )
 
 # =========================
-# Configuración Global (tema se aplica tras cargar config)
+# Configuración Global (el modo claro/oscuro se aplica en init_app)
 # =========================
 ctk.set_default_color_theme("blue")
 
 # =========================
-# Ruta del archivo de configuración
+# Ruta del archivo de configuración (ver terapias_config)
 # =========================
-if getattr(sys, "frozen", False):
-    _base_dir = os.path.dirname(sys.executable)
-else:
-    _base_dir = os.path.dirname(os.path.abspath(__file__))
-
-_user_home = os.path.expanduser("~")
-# Instalador: config en AppData. Ejecución desde script/exe en carpeta: config junto al exe/script.
-_app_data = os.path.join(os.environ.get("APPDATA", _user_home), "OrganizadorTerapias")
-def _get_config_path():
-    if getattr(sys, "frozen", False):
-        os.makedirs(_app_data, exist_ok=True)
-        return os.path.join(_app_data, "organizar_config.ini")
-    return os.path.join(_base_dir, "organizar_config.ini")
-
-CONFIG_FILE = _get_config_path()
-
-_REQUIRED_KEYS = ("source", "base_dest", "backup", "logfile")
-_DEFAULT_RUTAS = {
-    "source": os.path.join(_user_home, "Documents", "TERAPIAS", "DOCUMENTOS PARA ARMAR"),
-    "base_dest": os.path.join(_user_home, "Documents", "TERAPIAS", "TERAPIAS"),
-    "backup": os.path.join(_user_home, "Documents", "TERAPIAS", "Respaldo"),
-    "logfile": os.path.join(_user_home, "Documents", "TERAPIAS", "organizar_log.txt"),
-    "word_path": "winword.exe",
-}
+_user_home = USER_HOME
+CONFIG_FILE = config_path()
 
 
 def load_config() -> configparser.ConfigParser:
-    config = configparser.ConfigParser()
-    if not os.path.exists(CONFIG_FILE):
-        config["RUTAS"] = _DEFAULT_RUTAS
-        config["UI"] = {"appearance": "Dark"}
-        try:
-            os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                config.write(f)
-        except OSError:
-            pass
-    config.read(CONFIG_FILE, encoding="utf-8")
-    if "UI" not in config:
-        config["UI"] = {"appearance": "Dark"}
-    return config
+    return _load_config(CONFIG_FILE)
 
 
 config = load_config()
-# Aplicar modo claro/oscuro antes de construir la ventana
-_appearance = config.get("UI", "appearance", fallback="Dark") if "UI" in config else "Dark"
-ctk.set_appearance_mode(_appearance)
-if "RUTAS" not in config:
-    _err_msg = "Error: En organizar_config.ini falta la sección [RUTAS]."
-    sys.stderr.write(_err_msg + "\n")
-    try:
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror("Error de configuración", _err_msg)
-        root.destroy()
-    except Exception:
-        pass
-    sys.exit(1)
-
-SOURCE_DEFAULT = config["RUTAS"].get("source", _DEFAULT_RUTAS["source"])
-BASE_DEST = config["RUTAS"].get("base_dest", _DEFAULT_RUTAS["base_dest"])
-BACKUP = config["RUTAS"].get("backup", _DEFAULT_RUTAS["backup"])
-LOGFILE = config["RUTAS"].get("logfile", _DEFAULT_RUTAS["logfile"])
-WORD_PATH = config["RUTAS"].get("word_path", "winword.exe").strip() or "winword.exe"
-
-for ruta in (BASE_DEST, BACKUP):
-    try:
-        os.makedirs(ruta, exist_ok=True)
-    except OSError:
-        pass
-
-# Logging
-try:
-    os.makedirs(os.path.dirname(LOGFILE), exist_ok=True)
-except OSError:
-    pass
-_log_handler = RotatingFileHandler(LOGFILE, maxBytes=1024 * 1024, backupCount=1, encoding="utf-8")
-_log_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
-_logger = logging.getLogger()
-_logger.setLevel(logging.INFO)
-if not any(getattr(h, "baseFilename", None) == getattr(_log_handler, "baseFilename", "") for h in _logger.handlers):
-    _logger.addHandler(_log_handler)
-
-MESES = {
-    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
-    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
-    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE"
-}
-_MAX_PATH_LEN = 250
-_MAX_BACKUP_RETRIES = 3
+_rutas = get_rutas(config)
+SOURCE_DEFAULT = _rutas["source"]
+BASE_DEST = _rutas["base_dest"]
+BACKUP = _rutas["backup"]
+LOGFILE = _rutas["logfile"]
+WORD_PATH = _rutas["word_path"]
+PDF_CONFIG = get_pdf_config(config)
+BACKUP_CONFIG = get_backup_config(config)
+INBOX_CONFIG = get_inbox_config(config)
+
+# Índice de carpetas de paciente (junto al archivo de configuración)
+INDEX_FILE = data_file(CONFIG_FILE, INDEX_FILE_NAME)
+patient_index = PatientIndex(INDEX_FILE, MESES)
+# Índice de texto completo de los .docx/.pdf organizados
+CONTENT_INDEX_FILE = data_file(CONFIG_FILE, CONTENT_INDEX_FILE_NAME)
+content_index = ContentIndex(CONTENT_INDEX_FILE)
+# Historial estructurado de archivos procesados (no depende del log, que rota)
+HISTORY_FILE = data_file(CONFIG_FILE, HISTORY_FILE_NAME)
+history_store = HistoryStore(HISTORY_FILE)
+# Instantánea de la carpeta de origen: solo se vuelve a listar si cambió
+inbox = InboxSnapshot()
+# Diario de operaciones de organizar y respaldar (se recupera en init_app)
+journal = OperationJournal(data_file(CONFIG_FILE, JOURNAL_DIR_NAME))
+# Vigilante de BASE_DEST que mantiene el índice de pacientes al día (ver start_index_watcher)
+_index_watcher = None
+# Conversores a PDF abiertos entre conversiones (ver get_pdf_pool)
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+_MAX_PATH_LEN = DEFAULT_MAX_PATH_LEN
+_SEARCH_MAX_RESULTS = 500
+_SEARCH_BATCH_SIZE = 20
+_SEARCH_BATCH_SECONDS = 0.05
+_SEARCH_DEBOUNCE_MS = 250
+_SEARCH_MIN_CHARS = 2
+_SEARCH_MODE_NAME = "Nombre"
+_SEARCH_MODE_CONTENT = "Contenido"
+_SNIPPET_MAX_CHARS = 140
+# Días hacia atrás en los que, al iniciar, se buscan documentos que siguen esperando su PDF
+_PENDING_PDF_DAYS = 7
 _WORD_PATHS = [
     "winword.exe",
     os.path.join(os.environ.get("ProgramFiles", r"C:\Program Files"), "Microsoft Office", "root", "Office16", "WINWORD.EXE"),
@@ -137,30 +124,85 @@ _WORD_PATHS = [
     r"C:\Program Files (x86)\Microsoft Office\Office16\WINWORD.EXE",
 ]
 
+# =========================
+# Arranque
+# =========================
+def init_app():
+    """
+    Efectos del arranque: comprobar [RUTAS], tema, carpetas, log, importar el log antiguo al
+    historial y recuperar el diario. Solo se llama desde __main__, después de freeze_support: los
+    procesos del índice de contenido vuelven a importar este módulo y no deben repetirlos.
+    """
+    if "RUTAS" not in config:
+        err_msg = "Error: En organizar_config.ini falta la sección [RUTAS]."
+        sys.stderr.write(err_msg + "\n")
+        try:
+            root = tk.Tk()
+            root.withdraw()
+            messagebox.showerror("Error de configuración", err_msg)
+            root.destroy()
+        except Exception:
+            pass
+        sys.exit(1)
+    # Aplicar modo claro/oscuro antes de construir la ventana
+    ctk.set_appearance_mode(config.get("UI", "appearance", fallback="Dark") if "UI" in config else "Dark")
+
+    for ruta in (BASE_DEST, BACKUP, os.path.dirname(LOGFILE)):
+        try:
+            os.makedirs(ruta, exist_ok=True)
+        except OSError:
+            pass
+
+    # Logging
+    log_handler = RotatingFileHandler(LOGFILE, maxBytes=1024 * 1024, backupCount=1, encoding="utf-8")
+    log_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    if not any(getattr(h, "baseFilename", None) == log_handler.baseFilename for h in logger.handlers):
+        logger.addHandler(log_handler)
+    else:
+        log_handler.close()
+
+    history_store.import_log([LOGFILE + ".1", LOGFILE])
+    # Lo que quedó a medias si la app se cerró organizando o respaldando
+    journal.replay({
+        KIND_ORGANIZE: lambda op: replay_organize(op, patient_index, history_store, BASE_DEST),
+        KIND_BACKUP: replay_backup,
+    })
+
+
 # =========================
 # Funciones de lógica
 # =========================
 def find_latest_doc(source_dir: str) -> str | None:
-    """Devuelve el .doc/.docx más reciente por fecha de modificación, o None."""
+    """Devuelve el documento más reciente por fecha de modificación, o None."""
     docs = find_docs_ordered(source_dir)
     return docs[0][0] if docs else None
 
 
 def find_docs_ordered(source_dir: str, max_count: int = 50) -> list[tuple[str, float]]:
-    """Lista .doc/.docx en source_dir ordenados por mtime descendente. Devuelve [(ruta, mtime), ...]."""
-    if not os.path.isdir(source_dir):
-        return []
-    result = []
-    for fname in os.listdir(source_dir):
-        if fname.lower().endswith((".doc", ".docx")):
-            fpath = os.path.join(source_dir, fname)
-            try:
-                mtime = os.path.getmtime(fpath)
-                result.append((fpath, mtime))
-            except OSError:
-                continue
-    result.sort(key=lambda x: x[1], reverse=True)
-    return result[:max_count]
+    """
+    Documentos de source_dir (extensiones y subcarpetas según [ORIGEN]) ordenados por mtime
+    descendente, desde la instantánea de terapias_inbox. Devuelve [(ruta, mtime), ...].
+    """
+    return inbox.find(source_dir, max_count, INBOX_CONFIG["recursive"], INBOX_CONFIG["extensions"])
+
+
+def inbox_extensions_label() -> str:
+    """'.doc, .docx' (o las extensiones configuradas) para los mensajes de estado."""
+    return ", ".join(INBOX_CONFIG["extensions"])
+
+
+def suggest_patient(text: str) -> str | None:
+    """Paciente del índice que coincide con text (nombres sugeridos de la bandeja vigilada), o None."""
+    results = patient_index.search(text, 1)
+    return results[0]["patient"] if results else None
+
+
+def backup_copy_of(file_hash: str) -> dict | None:
+    """Copia más reciente en Respaldo con ese contenido, o None (documentos ya organizados)."""
+    entries = get_store(BACKUP).find_hash(file_hash, 1)
+    return entries[0] if entries else None
 
 
 def find_word_executable() -> str | None:
@@ -176,130 +218,254 @@ def find_word_executable() -> str | None:
     return None
 
 
-def parse_log_history(max_entries=20):
-    entries = []
-    if not os.path.exists(LOGFILE):
-        return entries
-    try:
-        with open(LOGFILE, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        for line in reversed(lines[-100:]):
-            if "Paciente:" in line and "→" in line:
-                try:
-                    parts = line.split(" - ", 2)
-                    if len(parts) >= 3:
-                        timestamp_str = parts[0].strip()
-                        message = parts[2] if len(parts) > 2 else ""
-                        if "| Paciente:" in message:
-                            patient_part = message.split("| Paciente:")[1].split("|")[0].strip()
-                            dest_part = message.split("→")[1].split("|")[0].strip()
-                            entries.append({"timestamp": timestamp_str, "patient": patient_part, "path": dest_part})
-                            if len(entries) >= max_entries:
-                                break
-                except Exception as e:
-                    logging.debug("parse_log_history line skipped: %s", e)
-                    continue
-    except Exception as e:
-        logging.error("Error parsing log: %s", e)
-    return entries
+def rebuild_patient_index() -> int | None:
+    """Reconstruye el índice de pacientes desde BASE_DEST. Devuelve el número de carpetas o None."""
+    return patient_index.rebuild(BASE_DEST)
 
 
-def search_patients(query, max_results=100):
-    """Busca carpetas de paciente cuyo nombre contenga query. Devuelve como máximo max_results."""
-    if not query or not os.path.isdir(BASE_DEST):
-        return []
-    query_lower = query.lower()
-    results = []
+def start_index_watcher():
+    """
+    (Re)inicia la vigilancia de BASE_DEST: los cambios de carpetas (también los hechos a mano o
+    por otro equipo) se aplican al índice por lotes, releyendo solo la parte del árbol afectada.
+    """
+    global _index_watcher
+    stop_index_watcher()
+    if not os.path.isdir(BASE_DEST):
+        return
+    base_dest = BASE_DEST
     try:
-        for year in os.listdir(BASE_DEST):
-            if len(results) >= max_results:
-                break
-            year_path = os.path.join(BASE_DEST, year)
-            if not os.path.isdir(year_path):
+        _index_watcher = FolderWatcher(base_dest, lambda dirs: patient_index.sync_dirs(base_dest, dirs))
+        _index_watcher.start()
+    except Exception as e:
+        logging.error("No se pudo vigilar %s: %s", base_dest, e)
+        _index_watcher = None
+
+
+def stop_index_watcher():
+    global _index_watcher
+    if _index_watcher is not None:
+        _index_watcher.stop()
+        _index_watcher = None
+
+
+def start_content_indexing(on_done=None):
+    """Actualiza el índice de contenido en un hilo aparte (la extracción va en un grupo de procesos)."""
+    if content_index.updating:
+        return
+
+    def run_in_background():
+        stats = content_index.update(BASE_DEST)
+        if on_done:
+            on_done(stats)
+
+    threading.Thread(target=run_in_background, daemon=True).start()
+
+
+def start_backup_maintenance():
+    """
+    En un hilo aparte: pasa al almacén de respaldo los archivos sueltos del respaldo plano anterior
+    y, una vez al día, empaqueta por meses los respaldos antiguos ([RESPALDO] compactar_dias).
+    """
+    def run_in_background():
+        store = get_store(BACKUP)
+        store.import_flat()
+        if BACKUP_CONFIG["compact_days"] and store.compact_due():
+            store.compact(BACKUP_CONFIG["compact_days"])
+
+    threading.Thread(target=run_in_background, daemon=True).start()
+
+
+def search_patients(
+    query,
+    max_results=100,
+    cancel: threading.Event | None = None,
+    session: IncrementalSearch | None = None,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+):
+    """
+    Generador: produce las carpetas de paciente que encajan con query (como máximo max_results).
+    Con índice los resultados salen ya ordenados; sin índice se recorre BASE_DEST y se van
+    produciendo según aparecen (el recorrido completo deja el índice construido).
+    session permite refinar en memoria la búsqueda anterior al ir escribiendo.
+    date_from/date_to limitan la búsqueda a un periodo; con periodo, query puede ir vacía.
+    """
+    has_range = date_from is not None or date_to is not None
+    if (not query and not has_range) or not os.path.isdir(BASE_DEST):
+        return
+    if patient_index.is_built_for(BASE_DEST):
+        yield from patient_index.search(query, max_results, session, date_from, date_to)
+        return
+    yield from _search_patients_fs(query, max_results, cancel, date_from, date_to)
+
+
+def _search_patients_fs(query, max_results=100, cancel: threading.Event | None = None, date_from=None, date_to=None):
+    """
+    Búsqueda recorriendo BASE_DEST (solo las carpetas del periodo, si lo hay). Si el recorrido
+    es completo (sin periodo ni cancelación), reconstruye el índice con él.
+    """
+    query_tokens = normalize_name(query).split()
+    base_dest = BASE_DEST
+    full_walk = date_from is None and date_to is None
+    walked = []
+    found = 0
+    try:
+        for entry in iter_patient_folders(base_dest, cancel=cancel, date_from=date_from, date_to=date_to, meses=MESES):
+            if full_walk:
+                walked.append(entry)
+            patient, patient_path, year, month, day = entry
+            if found >= max_results:
+                if not full_walk:
+                    return
                 continue
-            for month in os.listdir(year_path):
-                if len(results) >= max_results:
-                    break
-                month_path = os.path.join(year_path, month)
-                if not os.path.isdir(month_path):
-                    continue
-                for day in os.listdir(month_path):
-                    if len(results) >= max_results:
-                        break
-                    day_path = os.path.join(month_path, day)
-                    if not os.path.isdir(day_path):
-                        continue
-                    for patient in os.listdir(day_path):
-                        if len(results) >= max_results:
-                            break
-                        patient_path = os.path.join(day_path, patient)
-                        if os.path.isdir(patient_path) and query_lower in patient.lower():
-                            results.append({"patient": patient, "path": patient_path, "date": f"{year}/{month}/{day}"})
+            if not query_tokens or name_score(query_tokens, normalize_name(patient).split()) > 0:
+                found += 1
+                yield {"patient": patient, "path": patient_path, "date": f"{year}/{month}/{day}"}
     except Exception as e:
         logging.error("Error searching patients: %s", e)
-    return results
+        return
+    if full_walk and (cancel is None or not cancel.is_set()):
+        patient_index.replace_all(base_dest, walked)
+
+
+def get_pdf_pool() -> ConverterPool | None:
+    """Grupo de conversores a PDF (se crea con la primera conversión y se reutiliza). None si no hay conversor."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            backend = PDF_CONFIG["backend"]
+            if backend == BACKEND_AUTO:
+                backend = detect_backend(PDF_CONFIG["soffice_path"]) or backend
+            try:
+                factory = backend_factory(backend, PDF_CONFIG["soffice_path"])
+            except ValueError as e:
+                logging.error("%s", e)
+                return None
+            _pdf_pool = ConverterPool(factory, size=default_workers(backend))
+        return _pdf_pool
+
+
+def close_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.close()
+            _pdf_pool = None
 
 
 def convert_doc_to_pdf(doc_path: str, pdf_path: str) -> bool:
+    """Convierte doc_path en pdf_path con el conversor configurado ([PDF] backend). False si falla."""
+    pool = get_pdf_pool()
+    return pool.convert(doc_path, pdf_path) if pool is not None else False
+
+
+def organize_document(job, source_file, patient_dir, patient, stem, ext, date_names, base_dest, backup_dir) -> str:
+    """
+    Tarea de organizar: crea AÑO/MES/DÍA/PACIENTE, registra la carpeta en el índice y mueve el
+    documento con un nombre libre (stem, stem_1...): ni el documento ni su PDF pueden existir ya,
+    así el PDF que se espera es siempre el suyo. Devuelve la ruta final del documento.
+    """
+    job.report("Creando carpetas...")
+    os.makedirs(patient_dir, exist_ok=True)
+    os.makedirs(backup_dir, exist_ok=True)
+    if patient_index.is_built_for(base_dest):
+        patient_index.add(patient, patient_dir, *date_names)
+    new_doc_path = free_doc_stem(patient_dir, stem, ext) + ext
+    doc_name = os.path.splitext(os.path.basename(new_doc_path))[0]
+    if not check_path_length(new_doc_path, _MAX_PATH_LEN):
+        raise ValueError("La ruta del archivo es demasiado larga para Windows. Usa un nombre más corto.")
+    job.check_cancelled()
+    job.report("Moviendo documento...")
+    op = journal.begin(KIND_ORGANIZE, [journal_step(source_file, new_doc_path, patient, patient_dir, date_names)])
     try:
-        import win32com.client
-        import pythoncom
-        pythoncom.CoInitialize()
-        try:
-            doc_path = os.path.abspath(doc_path)
-            pdf_path = os.path.abspath(pdf_path)
-            doc_path_lower = doc_path.lower()
-            word = None
-            doc = None
-            used_existing = False
-            try:
-                word = win32com.client.GetActiveObject("Word.Application")
-                for open_doc in word.Documents:
-                    try:
-                        if os.path.abspath(open_doc.FullName).lower() == doc_path_lower:
-                            doc = open_doc
-                            used_existing = True
-                            break
-                    except Exception:
-                        continue
-            except Exception:
-                pass
-            if not doc:
-                try:
-                    if not word:
-                        word = win32com.client.DispatchEx("Word.Application")
-                        word.Visible = False
-                        word.DisplayAlerts = 0
-                    doc = word.Documents.Open(doc_path, ReadOnly=False)
-                except Exception as e:
-                    logging.error("Error opening Word: %s", e)
-                    if word and not used_existing:
-                        try:
-                            word.Quit()
-                        except Exception:
-                            pass
-                    return False
-            try:
-                doc.SaveAs(pdf_path, FileFormat=17)
-                doc.Close(SaveChanges=False)
-                return True
-            except Exception as e:
-                logging.error("Error saving PDF: %s", e)
-                return False
-            finally:
-                if word and not used_existing:
-                    try:
-                        word.Quit()
-                    except Exception:
-                        pass
-        finally:
-            try:
-                pythoncom.CoUninitialize()
-            except Exception:
-                pass
+        move_file(source_file, new_doc_path, cancel=job.cancel_event,
+                  progress=lambda done, total: job.report(f"Moviendo documento... {done * 100 // total}%", done / total))
+    except TransferCancelled:
+        # La copia parcial se conserva: al volver a organizar continúa donde quedó
+        journal.finish(op)
+        raise JobCancelled(job.name)
     except Exception as e:
-        logging.error("PDF conversion error: %s", e)
-        return False
+        logging.error("No se pudo mover %s → %s: %s", source_file, new_doc_path, e)
+        journal.finish(op)
+        raise
+    logging.info(
+        "Esperado PDF: %s → %s | Paciente: %s | Fecha: %s/%s/%s",
+        doc_name + ".pdf", patient_dir, patient, *date_names
+    )
+    history_store.record(EVENT_ORGANIZED, patient, patient_dir, new_doc_path)
+    journal.step_done(op, 0)
+    journal.finish(op)
+    return new_doc_path
+
+
+def organize_batch(job, items, base_dest, backup_dir) -> list[dict]:
+    """
+    Tarea de organizar por lotes: planifica items [(ruta, nombre)], aplica carpetas, respaldos y
+    movimientos juntos y registra cada documento organizado en el índice y el historial.
+    """
+    job.report("Preparando lote...")
+    plan = plan_batch(items, base_dest, datetime.date.today(), MESES, _MAX_PATH_LEN)
+    job.check_cancelled()
+    results = apply_batch(plan, backup_dir, cancel=job.cancel_event, journal=journal,
+                          progress=lambda done, total: job.report(f"Organizando {done}/{total}...", done / total))
+    record_batch(results, patient_index, history_store, base_dest, journal)
+    return results
+
+
+def convert_and_backup(job, doc_path, pdf_path, patient, backup_dir) -> str | None:
+    """
+    Tarea de Finalizar (PDF): convierte con Word y mueve el documento a respaldo. Devuelve None si
+    todo fue bien o el mensaje de error a mostrar; si Word no pudo convertir lanza RuntimeError
+    (el documento sigue pendiente y se puede reintentar).
+    """
+    if not convert_doc_to_pdf(doc_path, pdf_path):
+        raise RuntimeError("No se pudo crear el PDF. ¿Cerraste Word?")
+    if not os.path.exists(pdf_path):
+        return "PDF no detectado en la carpeta."
+    history_store.record(EVENT_PDF, patient, os.path.dirname(pdf_path), pdf_path)
+    job.report("Moviendo a respaldo...")
+    try:
+        backup_converted(doc_path, backup_dir, journal)
+    except Exception as e:
+        return f"Error al mover a respaldo: {e}"
+    return None
+
+
+def convert_pending_day(job, base_dest, backup_dir, day, tracker=None) -> dict:
+    """
+    Tarea de «PDF del día»: convierte a la vez los .doc/.docx que siguen en las carpetas de paciente
+    de day (los que ya tienen un PDF al día solo se finalizan) y mueve cada uno a respaldo.
+    Los documentos del lote salen de tracker (PendingPdfTracker) mientras tanto y vuelven si fallan.
+    Devuelve las estadísticas de la cola y, en 'fallidos', las entradas con error.
+    """
+    job.report("Buscando documentos sin PDF...")
+    docs = find_pending_docs(base_dest, MESES, day, day, cancel=job.cancel_event)
+    job.check_cancelled()
+    pool = get_pdf_pool()
+    if pool is None:
+        raise RuntimeError("No hay ningún conversor a PDF disponible (Word o LibreOffice).")
+    conv_queue = ConversionQueue(pool, backup_dir, history_store=history_store, journal=journal)
+    tracked = {}
+    for doc_path, patient in docs:
+        expected = tracker.get(doc_path) if tracker is not None else None
+        conv_queue.add(doc_path, expected["pdf"] if expected else None, patient)
+        if expected:
+            tracked[doc_path] = expected
+            tracker.forget(doc_path)
+
+    def on_update(entry):
+        stats = conv_queue.stats()
+        done = stats[CONV_OK] + stats[CONV_SKIPPED] + stats[CONV_ERROR] + stats[CONV_CANCELLED]
+        job.report(f"PDF {done}/{stats['total']} · {stats['por_minuto']:.0f} por minuto", done / stats["total"])
+
+    try:
+        stats = conv_queue.run(cancel=job.cancel_event, on_update=on_update)
+    finally:
+        for doc_path, expected in tracked.items():
+            if os.path.exists(doc_path):
+                tracker.expect(doc_path, expected["pdf"], expected["patient"], expected["since"])
+    stats["fallidos"] = [e for e in conv_queue.entries if e["status"] not in (CONV_OK, CONV_SKIPPED)]
+    return stats
 
 
 def open_folder(path):
@@ -311,6 +477,21 @@ def open_folder(path):
             logging.error("Error opening folder: %s", e)
 
 
+def save_inbox_watch(enabled: bool) -> bool:
+    """Guarda en [ORIGEN] vigilar si la app vigila la carpeta de origen al iniciar."""
+    INBOX_CONFIG["watch"] = enabled
+    if "ORIGEN" not in config:
+        config["ORIGEN"] = {}
+    config["ORIGEN"]["vigilar"] = "sí" if enabled else "no"
+    try:
+        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+            config.write(f)
+        return True
+    except Exception as e:
+        logging.error("Error saving config: %s", e)
+        return False
+
+
 def save_config(new_source: str, new_dest: str, new_backup: str, word_path: str | None = None, appearance: str | None = None) -> bool:
     """Guarda rutas y opciones en el .ini. Devuelve False si las rutas son inválidas o falla la escritura."""
     s = (new_source or "").strip()
@@ -451,6 +632,64 @@ def ask_file_picker_dialog(parent, files_with_mtime: list[tuple[str, float]], ti
     return result[0]
 
 
+def ask_batch_dialog(parent, files_with_mtime: list[tuple[str, float]], title: str = "Organizar varios", names: dict | None = None) -> list[tuple[str, str]] | None:
+    """
+    Tabla editable para organizar varios documentos: casilla, archivo, nombre nuevo y paciente
+    (vista previa con patient_from_user_input). names {ruta: nombre} da nombres iniciales (por
+    defecto, el del archivo). Devuelve [(ruta, nombre)] marcados o None.
+    """
+    result = [None]
+    win = DialogBase(parent, title, width=780, height=560)
+    GlassFrame(win).place(relx=0, rely=0, relwidth=1, relheight=1)
+    ctk.CTkLabel(win, text=title, font=VisionSys.FONT_H2, text_color=VisionSys.TEXT_PRIMARY_DARK).pack(pady=(VisionSys.SPACE_L, VisionSys.SPACE_XXS), padx=VisionSys.SPACE_L, anchor="w")
+    ctk.CTkLabel(win, text="Escribe el nombre de cada documento ('SS Nombre Paciente' crea la carpeta del paciente). Solo se organizan los marcados.", font=VisionSys.FONT_CAPTION, text_color=VisionSys.TEXT_SECONDARY_DARK, wraplength=720, justify="left").pack(anchor="w", padx=VisionSys.SPACE_L, pady=(0, VisionSys.SPACE_S))
+    table = ctk.CTkScrollableFrame(win, fg_color=VisionSys.GLASS_DARK)
+    table.pack(fill="both", expand=True, padx=VisionSys.SPACE_L, pady=VisionSys.SPACE_S)
+    table.grid_columnconfigure(2, weight=1)
+    rows = []
+    btn_ok = None
+
+    def update_count():
+        n = sum(1 for var, _, _, _ in rows if var.get())
+        btn_ok.configure(text=f"Organizar ({n})", state="normal" if n else "disabled")
+
+    def preview(entry, lbl):
+        name = sanitize_filename(entry.get().strip())
+        patient = patient_from_user_input(name) if name else ""
+        if not name:
+            lbl.configure(text="Falta el nombre", text_color=VisionSys.ERROR)
+        elif patient == "PACIENTE_DESCONOCIDO":
+            lbl.configure(text="⚠ Falta 'SS'", text_color=VisionSys.WARNING)
+        else:
+            lbl.configure(text=patient, text_color=VisionSys.TEXT_SECONDARY_DARK)
+
+    for i, (fpath, mtime) in enumerate(files_with_mtime):
+        var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(table, text="", variable=var, width=24, command=lambda: update_count()).grid(row=i, column=0, padx=(VisionSys.SPACE_XS, 0), pady=2)
+        ctk.CTkLabel(table, text=os.path.basename(fpath), width=200, anchor="w", font=VisionSys.FONT_CAPTION, text_color=VisionSys.TEXT_PRIMARY_DARK).grid(row=i, column=1, sticky="w", padx=VisionSys.SPACE_XS)
+        entry = ctk.CTkEntry(table, height=32, corner_radius=VisionSys.RADIUS_S, border_width=VisionSys.BORDER_WIDTH_SUBTLE, border_color=VisionSys.BORDER_DARK_SOFT)
+        entry.grid(row=i, column=2, sticky="ew", padx=VisionSys.SPACE_XS, pady=2)
+        entry.insert(0, (names or {}).get(fpath) or os.path.splitext(os.path.basename(fpath))[0])
+        lbl = ctk.CTkLabel(table, text="", width=180, anchor="w", font=VisionSys.FONT_CAPTION)
+        lbl.grid(row=i, column=3, sticky="w", padx=VisionSys.SPACE_XS)
+        entry.bind("<KeyRelease>", lambda e, en=entry, lb=lbl: preview(en, lb))
+        preview(entry, lbl)
+        rows.append((var, fpath, entry, lbl))
+
+    def on_ok():
+        result[0] = [(fpath, entry.get().strip()) for var, fpath, entry, _ in rows if var.get()]
+        win.destroy()
+
+    btn_frame = ctk.CTkFrame(win, fg_color="transparent")
+    btn_frame.pack(pady=VisionSys.SPACE_L, padx=VisionSys.SPACE_L, side="bottom", fill="x")
+    btn_ok = FloatingButton(btn_frame, text="Organizar", command=on_ok, width=150)
+    btn_ok.pack(side="right", padx=(VisionSys.SPACE_S, 0))
+    FloatingButton(btn_frame, text="Cancelar", command=win.destroy, width=110, fg_color="transparent", border_width=VisionSys.BORDER_WIDTH_SUBTLE, border_color=VisionSys.BORDER_DARK).pack(side="right")
+    update_count()
+    parent.wait_window(win)
+    return result[0]
+
+
 # =========================
 # Vistas
 # =========================
@@ -472,7 +711,12 @@ class ConfigView(ctk.CTkFrame):
         self.appearance_var = ctk.StringVar(value=config.get("UI", "appearance", fallback="Dark") if "UI" in config else "Dark")
         self.appearance_menu = ctk.CTkOptionMenu(ap_row, values=["Dark", "Light", "System"], variable=self.appearance_var, width=120, height=40)
         self.appearance_menu.pack(side="left", padx=VisionSys.SPACE_S)
-        FloatingButton(self, text="Guardar Cambios", command=self.save, fg_color=VisionSys.ACCENT, hover_color=VisionSys.ACCENT_HOVER, width=200).pack(pady=VisionSys.SPACE_XL, anchor="e")
+        btn_row = ctk.CTkFrame(self, fg_color="transparent")
+        btn_row.pack(fill="x", pady=VisionSys.SPACE_XL)
+        FloatingButton(btn_row, text="Guardar Cambios", command=self.save, fg_color=VisionSys.ACCENT, hover_color=VisionSys.ACCENT_HOVER, width=200).pack(side="right")
+        self.btn_reindex = FloatingButton(btn_row, text="Reconstruir índice", command=self.rebuild_index, fg_color=VisionSys.GLASS_DARK, hover_color=VisionSys.BORDER_DARK_HOVER, text_color=VisionSys.TEXT_SECONDARY_DARK, width=200)
+        self.btn_reindex.pack(side="right", padx=VisionSys.SPACE_S)
+        add_tooltip(self.btn_reindex, "Vuelve a recorrer la carpeta Destino: reconstruye el índice de pacientes y actualiza el de contenido usados por Buscar.")
 
     def _add_row(self, parent, label_text, default_val, key):
         row = ctk.CTkFrame(parent, fg_color="transparent")
@@ -508,80 +752,298 @@ class ConfigView(ctk.CTkFrame):
             if os.path.exists(path) and os.path.isfile(path):
                 show_info_dialog(self, f"«{name}» debe ser una carpeta, no un archivo.")
                 return
+        previous_dest = BASE_DEST
         if save_config(s, d, b, word_path=word_path_val or None, appearance=appearance_val):
+            self.main_app.pending_pdfs.backup_dir = BACKUP
+            if BASE_DEST != previous_dest:
+                start_index_watcher()
+                # Los resultados mostrados en Buscar son de la carpeta Destino anterior
+                self.main_app.invalidate_view("Buscar")
             show_info_dialog(self, "Configuración guardada correctamente.")
         else:
             show_info_dialog(self, "No se pudo guardar la configuración.")
 
+    def rebuild_index(self):
+        self.btn_reindex.configure(state="disabled", text="Indexando…")
+        start_content_indexing()
+
+        def run_in_background():
+            total = rebuild_patient_index()
+            self.after(0, lambda: self._on_index_rebuilt(total))
+
+        threading.Thread(target=run_in_background, daemon=True).start()
+
+    def _on_index_rebuilt(self, total):
+        self.btn_reindex.configure(state="normal", text="Reconstruir índice")
+        if total is None:
+            show_info_dialog(self, "No se pudo reconstruir el índice. Revisa la carpeta Destino.")
+        else:
+            show_info_dialog(self, f"Índice reconstruido: {total} carpetas de paciente.")
+
 
 class HistoryView(ctk.CTkFrame):
+    """Historial completo (filtrable por paciente y periodo) en una lista virtual que solo lee la ventana visible."""
+
     def __init__(self, parent, main_app):
         super().__init__(parent, fg_color="transparent")
         self.main_app = main_app
         header = ctk.CTkFrame(self, fg_color="transparent")
         header.pack(fill="x", pady=(0, VisionSys.SPACE_S))
         header.grid_columnconfigure(0, weight=1)
-        SectionHeader(header, "Historial", "Últimos archivos procesados").grid(row=0, column=0, sticky="w")
+        SectionHeader(header, "Historial", "Todos los archivos procesados").grid(row=0, column=0, sticky="w")
         FloatingButton(header, text="Actualizar", width=120, command=self._refresh).grid(row=0, column=1, padx=VisionSys.SPACE_S)
-        self.scroll_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
-        self.scroll_frame.pack(fill="both", expand=True, pady=(VisionSys.SPACE_M, 0))
+        filter_row = ctk.CTkFrame(self, fg_color="transparent")
+        filter_row.pack(fill="x")
+        self.patient_entry = ctk.CTkEntry(filter_row, placeholder_text="Filtrar por paciente…", width=260, height=36, border_width=VisionSys.BORDER_WIDTH_SUBTLE, border_color=VisionSys.BORDER_DARK_SOFT, corner_radius=VisionSys.RADIUS_M)
+        self.patient_entry.pack(side="left")
+        self.patient_entry.bind("<KeyRelease>", self._on_filter_key)
+        self.range_var = ctk.StringVar(value=DATE_PRESETS[0])
+        ctk.CTkOptionMenu(filter_row, values=[p for p in DATE_PRESETS if p != "Personalizado"], variable=self.range_var, width=160, height=36, command=lambda v: self._refresh()).pack(side="left", padx=(VisionSys.SPACE_S, 0))
+        self.count_lbl = ctk.CTkLabel(filter_row, text="", font=VisionSys.FONT_CAPTION, text_color=VisionSys.TEXT_SECONDARY_DARK)
+        self.count_lbl.pack(side="right")
+        # Con filtro: id de las entradas que lo cumplen; sin filtro (None) se pagina por rango de id
+        self._ids = None
+        # Id más alto al leer la lista: las páginas se cuentan desde él aunque se añadan entradas
+        self._top_id = 0
+        # Última ventana leída del historial: (desplazamiento, filas)
+        self._window = (0, [])
+        self._filter_job = None
+        self.entries_list = VirtualCardList(self, fetch=self._rows, card_content=self._card_content, empty_text="No hay historial disponible")
+        self.entries_list.pack(fill="both", expand=True, pady=(VisionSys.SPACE_M, 0))
         self._refresh()
 
+    def _on_filter_key(self, event=None):
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(_SEARCH_DEBOUNCE_MS, self._refresh)
+
     def _refresh(self):
-        for w in self.scroll_frame.winfo_children():
-            w.destroy()
-        entries = parse_log_history()
-        if not entries:
-            ctk.CTkLabel(self.scroll_frame, text="No hay historial disponible", font=VisionSys.FONT_BODY_M, text_color=VisionSys.TEXT_TERTIARY_DARK).pack(pady=VisionSys.SPACE_XXL)
+        """Relee el total (o los id del filtro) y vuelve a pintar desde el principio."""
+        self._filter_job = None
+        patient = self.patient_entry.get().strip()
+        date_from, date_to = date_range_preset(self.range_var.get(), datetime.date.today())
+        self._top_id = history_store.count()
+        if patient or date_from or date_to:
+            self._ids = [i for i in history_store.find_ids(patient, date_from, date_to) if i <= self._top_id]
+            total = len(self._ids)
         else:
-            for entry in entries:
-                GlassCard(self.scroll_frame, icon="🕒", title=entry["patient"], subtitle=entry["timestamp"],
-                          command=lambda p=entry["path"]: open_folder(p)).pack(fill="x", pady=VisionSys.SPACE_XS)
+            self._ids = None
+            total = self._top_id
+        self._window = (0, [])
+        self.count_lbl.configure(text=f"{total} entradas")
+        self.entries_list.set_total(total)
+
+    def on_show(self):
+        """La vista se conserva entre visitas: solo se relee si hay entradas nuevas."""
+        if history_store.count() != self._top_id:
+            self._refresh()
+
+    def _rows(self, offset: int, count: int) -> list[dict]:
+        """Entradas offset..offset+count-1; lee del historial una ventana mayor para no consultar en cada paso."""
+        start, rows = self._window
+        if start <= offset and offset + count <= start + len(rows):
+            return rows[offset - start:offset - start + count]
+        start = max(0, offset - count)
+        size = count * 3
+        if self._ids is None:
+            rows = history_store.page(start, size, self._top_id)
+        else:
+            rows = history_store.get_many(self._ids[start:start + size])
+        self._window = (start, rows)
+        return rows[offset - start:offset - start + count]
+
+    @staticmethod
+    def _card_content(entry: dict) -> dict:
+        return {
+            "icon": "📄" if entry["event"] == EVENT_PDF else "🕒",
+            "title": entry["patient"],
+            "subtitle": entry["timestamp"],
+            "command": lambda p=entry["path"]: open_folder(p),
+        }
 
 
 class SearchView(ctk.CTkFrame):
     def __init__(self, parent, main_app):
         super().__init__(parent, fg_color="transparent")
         self.main_app = main_app
-        SectionHeader(self, "Buscar Paciente", "Escribe el nombre para buscar en las carpetas").pack(anchor="w", pady=(0, VisionSys.SPACE_L))
+        SectionHeader(self, "Buscar Paciente", "Escribe el nombre: los resultados aparecen mientras escribes").pack(anchor="w", pady=(0, VisionSys.SPACE_L))
         search_frame = GlassFrame(self)
         search_frame.pack(fill="x", pady=(0, VisionSys.SPACE_L))
         self.search_entry = ctk.CTkEntry(search_frame, placeholder_text="Escribe el nombre…",
                                          border_width=VisionSys.BORDER_WIDTH_SUBTLE, border_color=VisionSys.BORDER_DARK_SOFT, height=48, font=VisionSys.FONT_BODY_L, fg_color="transparent", text_color=VisionSys.TEXT_PRIMARY_DARK, corner_radius=VisionSys.RADIUS_M)
         self.search_entry.pack(side="left", fill="x", expand=True, padx=VisionSys.SPACE_L, pady=VisionSys.SPACE_S)
         self.search_entry.bind("<Return>", lambda e: self.perform_search())
+        self.search_entry.bind("<KeyRelease>", self._on_key_release)
         FloatingButton(search_frame, text="🔍", width=52, height=44, command=self.perform_search).pack(side="right", padx=VisionSys.SPACE_S, pady=VisionSys.SPACE_S)
-        self.results_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
-        self.results_frame.pack(fill="both", expand=True, pady=(VisionSys.SPACE_M, 0))
-        ctk.CTkLabel(self.results_frame, text="Resultados aparecerán aquí", font=VisionSys.FONT_BODY_M, text_color=VisionSys.TEXT_TERTIARY_DARK).pack(pady=VisionSys.SPACE_XXL)
+        # Periodo: solo se recorren (o consultan) las carpetas AÑO/MES/DÍA del rango
+        range_row = ctk.CTkFrame(self, fg_color="transparent")
+        range_row.pack(fill="x")
+        ctk.CTkLabel(range_row, text="Periodo", font=VisionSys.FONT_CAPTION, text_color=VisionSys.TEXT_SECONDARY_DARK).pack(side="left", padx=(0, VisionSys.SPACE_S))
+        self.range_var = ctk.StringVar(value=DATE_PRESETS[0])
+        ctk.CTkOptionMenu(range_row, values=list(DATE_PRESETS), variable=self.range_var, width=160, height=36, command=self._on_range_change).pack(side="left")
+        self.custom_range = ctk.CTkFrame(range_row, fg_color="transparent")
+        self.date_from_entry = ctk.CTkEntry(self.custom_range, placeholder_text="Desde (DD/MM/AAAA)", width=160, height=36, border_width=VisionSys.BORDER_WIDTH_SUBTLE, border_color=VisionSys.BORDER_DARK_SOFT, corner_radius=VisionSys.RADIUS_M)
+        self.date_from_entry.pack(side="left", padx=(VisionSys.SPACE_S, 0))
+        self.date_to_entry = ctk.CTkEntry(self.custom_range, placeholder_text="Hasta (DD/MM/AAAA)", width=160, height=36, border_width=VisionSys.BORDER_WIDTH_SUBTLE, border_color=VisionSys.BORDER_DARK_SOFT, corner_radius=VisionSys.RADIUS_M)
+        self.date_to_entry.pack(side="left", padx=(VisionSys.SPACE_S, 0))
+        for entry in (self.date_from_entry, self.date_to_entry):
+            entry.bind("<Return>", lambda e: self.perform_search())
+        # Buscar por nombre de carpeta o dentro del texto de los documentos (.docx/.pdf)
+        self.mode_var = ctk.StringVar(value=_SEARCH_MODE_NAME)
+        ctk.CTkSegmentedButton(range_row, values=[_SEARCH_MODE_NAME, _SEARCH_MODE_CONTENT], variable=self.mode_var, height=36, command=lambda v: self.perform_search()).pack(side="right")
+        # Avisos bajo la búsqueda (límite de resultados, índice de contenido no disponible...)
+        self.note_lbl = ctk.CTkLabel(self, text="", font=VisionSys.FONT_CAPTION, text_color=VisionSys.TEXT_SECONDARY_DARK, anchor="w")
+        self.note_lbl.pack(fill="x", pady=(VisionSys.SPACE_S, 0))
+        self._results = []
+        self.results_list = VirtualCardList(self, fetch=lambda offset, count: self._results[offset:offset + count],
+                                            card_content=self._card_content, empty_text="Resultados aparecerán aquí")
+        self.results_list.pack(fill="both", expand=True, pady=(VisionSys.SPACE_S, 0))
+        # Un único hilo de búsqueda: cada búsqueda nueva cancela la anterior
+        self._search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        self._search_cancel = threading.Event()
+        self._pending_clear = False
+        # Búsqueda mientras se escribe: espera a una pausa y refina la consulta anterior
+        self._debounce_job = None
+        self._last_query = None
+        self._session = IncrementalSearch()
+
+    def _on_range_change(self, value=None):
+        if self.range_var.get() == "Personalizado":
+            self.custom_range.pack(side="left")
+            self.date_from_entry.focus_set()
+            return
+        self.custom_range.pack_forget()
+        self.perform_search()
+
+    def _current_range(self):
+        """(desde, hasta) del periodo elegido; None si el periodo personalizado no es válido."""
+        preset = self.range_var.get()
+        if preset != "Personalizado":
+            return date_range_preset(preset, datetime.date.today())
+        texts = (self.date_from_entry.get().strip(), self.date_to_entry.get().strip())
+        dates = tuple(parse_user_date(t) if t else None for t in texts)
+        if any(t and d is None for t, d in zip(texts, dates)):
+            return None
+        return dates
+
+    def _on_key_release(self, event=None):
+        if event is not None and event.keysym in ("Return", "KP_Enter"):
+            return
+        if self._debounce_job is not None:
+            self.after_cancel(self._debounce_job)
+        self._debounce_job = self.after(_SEARCH_DEBOUNCE_MS, self._search_as_you_type)
 
-    def perform_search(self):
+    def _search_as_you_type(self):
+        self._debounce_job = None
         query = self.search_entry.get().strip()
-        for w in self.results_frame.winfo_children():
-            w.destroy()
-        if not query:
+        if (query, self._current_range(), self.mode_var.get()) == self._last_query or 0 < len(query) < _SEARCH_MIN_CHARS:
             return
-        ctk.CTkLabel(self.results_frame, text="Buscando…", font=VisionSys.FONT_BODY_M, text_color=VisionSys.TEXT_SECONDARY_DARK).pack(pady=VisionSys.SPACE_XXL)
-        self.results_frame.update()
+        self.perform_search()
 
-        def run_in_background():
-            results = search_patients(query)
-            self.after(0, lambda: self._show_search_results(query, results))
-
-        threading.Thread(target=run_in_background, daemon=True).start()
-
-    def _show_search_results(self, query: str, results: list):
-        for w in self.results_frame.winfo_children():
-            w.destroy()
-        if not results:
-            ctk.CTkLabel(self.results_frame, text=f"Sin resultados para «{query}»", font=VisionSys.FONT_BODY_M, text_color=VisionSys.TEXT_SECONDARY_DARK).pack(pady=VisionSys.SPACE_XXL)
+    def perform_search(self):
+        if self._debounce_job is not None:
+            self.after_cancel(self._debounce_job)
+            self._debounce_job = None
+        query = self.search_entry.get().strip()
+        date_range = self._current_range()
+        mode = self.mode_var.get()
+        self._last_query = (query, date_range, mode)
+        # Cancela la búsqueda anterior: el hilo de búsqueda la abandona en cuanto lo detecta
+        self._search_cancel.set()
+        self._search_cancel = threading.Event()
+        if date_range is None:
+            self._clear_results("Fecha no válida. Usa DD/MM/AAAA o AAAA-MM-DD.", VisionSys.ERROR)
+            return
+        date_from, date_to = date_range
+        if not query and (mode == _SEARCH_MODE_CONTENT or (date_from is None and date_to is None)):
+            self._clear_results()
+            return
+        # Los resultados anteriores siguen visibles hasta que llega el primer lote nuevo
+        self._pending_clear = True
+        if not self._results:
+            self._clear_results("Buscando…")
+        self._search_executor.submit(self._run_search, query, self._search_cancel, date_from, date_to, mode)
+
+    def _run_search(self, query: str, cancel: threading.Event, date_from=None, date_to=None, mode=_SEARCH_MODE_NAME):
+        """Se ejecuta en el hilo de búsqueda: envía los resultados a la UI por lotes."""
+        batch = []
+        last_flush = time.monotonic()
+        if mode == _SEARCH_MODE_CONTENT:
+            results = content_index.search(query, _SEARCH_MAX_RESULTS)
         else:
-            _max = 100
-            if len(results) >= _max:
-                ctk.CTkLabel(self.results_frame, text=f"Mostrando los primeros {_max} resultados.", font=VisionSys.FONT_CAPTION, text_color=VisionSys.TEXT_SECONDARY_DARK).pack(anchor="w", pady=(0, VisionSys.SPACE_S))
-            for r in results:
-                GlassCard(self.results_frame, icon="📂", title=r["patient"], subtitle=r["date"],
-                          command=lambda p=r["path"]: open_folder(p)).pack(fill="x", pady=VisionSys.SPACE_XS)
+            results = search_patients(query, _SEARCH_MAX_RESULTS, cancel, self._session, date_from, date_to)
+        try:
+            for result in results:
+                if cancel.is_set():
+                    return
+                batch.append(result)
+                if len(batch) >= _SEARCH_BATCH_SIZE or time.monotonic() - last_flush >= _SEARCH_BATCH_SECONDS:
+                    self.after(0, lambda b=batch: self._append_results(cancel, b))
+                    batch = []
+                    last_flush = time.monotonic()
+        except Exception as e:
+            logging.error("Error en búsqueda: %s", e)
+        if not cancel.is_set():
+            self.after(0, lambda: (self._append_results(cancel, batch), self._finish_search(cancel, query)))
+
+    def _clear_results(self, message="Resultados aparecerán aquí", text_color=None):
+        self._results = []
+        self._pending_clear = False
+        self.note_lbl.configure(text="")
+        self.results_list.set_empty_text(message, text_color)
+        self.results_list.set_total(0)
+
+    @staticmethod
+    def _card_content(r: dict) -> dict:
+        if "snippet" in r:
+            return {
+                "icon": "📄", "title": f"{r['patient']} · {os.path.basename(r['file'])}",
+                "subtitle": f"{r['date']}  —  {r['snippet']}"[:_SNIPPET_MAX_CHARS],
+                "command": lambda p=r["path"]: open_folder(p),
+            }
+        return {"icon": "📂", "title": r["patient"], "subtitle": r["date"], "command": lambda p=r["path"]: open_folder(p)}
+
+    def _append_results(self, cancel: threading.Event, results: list):
+        if cancel.is_set() or not results:
+            return
+        if self._pending_clear:
+            self._clear_results()
+        self._results.extend(results)
+        # Solo se repintan las tarjetas visibles; la posición de la lista se conserva
+        self.results_list.set_total(len(self._results), reset=False)
+
+    def _finish_search(self, cancel: threading.Event, query: str):
+        if cancel.is_set():
+            return
+        if self._pending_clear:
+            self._clear_results()
+        notes = []
+        if not self._results:
+            msg = f"Sin resultados para «{query}»" if query else "No hay carpetas de paciente en ese periodo"
+            self.results_list.set_empty_text(msg, VisionSys.TEXT_SECONDARY_DARK)
+        elif len(self._results) >= _SEARCH_MAX_RESULTS:
+            notes.append(f"Mostrando los primeros {_SEARCH_MAX_RESULTS} resultados.")
+        else:
+            notes.append(f"{len(self._results)} resultados")
+        if self.mode_var.get() == _SEARCH_MODE_CONTENT:
+            if not content_index.available:
+                notes.append("La búsqueda en contenido no está disponible en este equipo (SQLite sin FTS5).")
+            elif content_index.updating:
+                notes.append("El índice de contenido se está actualizando; puede que falten documentos recientes.")
+        self.note_lbl.configure(text="  ".join(notes))
+
+    def on_hide(self):
+        # Una búsqueda en curso termina igualmente; solo se descarta la pendiente de escribir
+        if self._debounce_job is not None:
+            self.after_cancel(self._debounce_job)
+            self._debounce_job = None
+
+    def destroy(self):
+        if self._debounce_job is not None:
+            self.after_cancel(self._debounce_job)
+        self._search_cancel.set()
+        self._search_executor.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
 
 
 class HomeView(ctk.CTkFrame):
@@ -604,18 +1066,42 @@ class HomeView(ctk.CTkFrame):
         initial = SOURCE_DEFAULT if os.path.isdir(SOURCE_DEFAULT) else _user_home
         self.path_entry.insert(0, initial)
         ctk.CTkButton(path_inner, text="Examinar…", width=110, height=44, fg_color=VisionSys.ACCENT, hover_color=VisionSys.ACCENT_HOVER, corner_radius=VisionSys.RADIUS_M, command=self._browse_folder).grid(row=0, column=1)
+        self.watch_switch = ctk.CTkSwitch(path_card, text="Vigilar la carpeta y mostrar los documentos nuevos al llegar", font=VisionSys.FONT_CAPTION, text_color=VisionSys.TEXT_SECONDARY_DARK, command=self._toggle_watch)
+        self.watch_switch.pack(anchor="w", padx=VisionSys.SPACE_L, pady=(0, VisionSys.SPACE_L))
+        if INBOX_CONFIG["watch"]:
+            self.watch_switch.select()
 
         # Barra de estado: limpia, redondeada, no invasiva
         self.status_frame = ctk.CTkFrame(self, fg_color=VisionSys.GLASS_DARK, corner_radius=VisionSys.RADIUS_L, height=48, border_width=VisionSys.BORDER_WIDTH_SUBTLE, border_color=VisionSys.BORDER_DARK_SOFT)
         self.status_frame.pack(fill="x", pady=VisionSys.SPACE_L)
         self.status_lbl = ctk.CTkLabel(self.status_frame, text="Listo. Selecciona carpeta y haz clic en Buscar y organizar.", font=VisionSys.FONT_BODY_M, text_color=VisionSys.TEXT_SECONDARY_DARK)
-        self.status_lbl.pack(pady=VisionSys.SPACE_S, padx=VisionSys.SPACE_L)
+        self.status_lbl.pack(side="left", pady=VisionSys.SPACE_S, padx=VisionSys.SPACE_L)
+        # Visible solo mientras hay una tarea en segundo plano (ver _start_job)
+        self.btn_cancel = ctk.CTkButton(self.status_frame, text="Cancelar", width=96, height=32, fg_color=VisionSys.GLASS_DARK, hover_color=VisionSys.BORDER_DARK_HOVER, corner_radius=VisionSys.RADIUS_M, command=self._cancel_job)
 
         # Acciones principales: botones protagonistas, bien separados
+        # Documentos organizados cuyo PDF aún no aparece (ver App.pending_pdfs); oculto si no hay
+        self.pending_lbl = ctk.CTkLabel(self, text="", font=VisionSys.FONT_CAPTION, text_color=VisionSys.WARNING)
+        # Bandeja vigilada (App.inbox_queue): documentos nuevos en Origen con su nombre sugerido; oculta si no hay
+        self.inbox_frame = GlassFrame(self)
+        inbox_head = ctk.CTkFrame(self.inbox_frame, fg_color="transparent")
+        inbox_head.pack(fill="x", padx=VisionSys.SPACE_L, pady=(VisionSys.SPACE_S, 0))
+        self.inbox_lbl = ctk.CTkLabel(inbox_head, text="", font=VisionSys.FONT_BODY_M, text_color=VisionSys.TEXT_PRIMARY_DARK)
+        self.inbox_lbl.pack(side="left")
+        self.btn_inbox_batch = ctk.CTkButton(inbox_head, text="Organizar todos", width=140, height=32, fg_color=VisionSys.ACCENT, hover_color=VisionSys.ACCENT_HOVER, corner_radius=VisionSys.RADIUS_M, command=self.run_inbox_batch)
+        self.btn_inbox_batch.pack(side="right")
+        self.inbox_rows = ctk.CTkFrame(self.inbox_frame, fg_color="transparent")
+        self.inbox_rows.pack(fill="x", padx=VisionSys.SPACE_L, pady=(VisionSys.SPACE_XS, VisionSys.SPACE_S))
+
         self.btn_organize = FloatingButton(self, text="Buscar y Organizar (Word)", height=56, font=VisionSys.FONT_H2, command=self.run_organize)
         self.btn_organize.pack(fill="x", pady=VisionSys.SPACE_S)
         add_tooltip(self.btn_organize, "Busca el documento más reciente en la carpeta, pide el nombre y lo organiza en la estructura Año/Mes/Día/Paciente.")
 
+        self.btn_batch = FloatingButton(self, text="Organizar varios", height=44, font=VisionSys.FONT_BODY_L, command=self.run_batch_organize,
+                                        fg_color=VisionSys.GLASS_DARK, hover_color=VisionSys.BORDER_DARK_HOVER, text_color=VisionSys.TEXT_PRIMARY_DARK)
+        self.btn_batch.pack(fill="x", pady=VisionSys.SPACE_S)
+        add_tooltip(self.btn_batch, "Organiza de una vez varios documentos de la carpeta: un nombre por documento en una sola tabla.")
+
         self.btn_open_folder = FloatingButton(
             self, text="Abrir carpeta del paciente",
             height=48, font=VisionSys.FONT_BODY_L,
@@ -632,6 +1118,11 @@ class HomeView(ctk.CTkFrame):
         self.btn_pdf.pack(fill="x", pady=VisionSys.SPACE_S)
         add_tooltip(self.btn_pdf, "Genera el PDF desde el documento Word y mueve el .doc a respaldo.")
 
+        self.btn_pdf_day = FloatingButton(self, text="PDF de todo el día", height=44, font=VisionSys.FONT_BODY_L, command=self.run_pdf_day,
+                                          fg_color=VisionSys.GLASS_DARK, hover_color=VisionSys.BORDER_DARK_HOVER, text_color=VisionSys.TEXT_PRIMARY_DARK)
+        self.btn_pdf_day.pack(fill="x", pady=VisionSys.SPACE_S)
+        add_tooltip(self.btn_pdf_day, "Convierte a la vez todos los documentos de hoy que aún no tienen PDF y los mueve a respaldo.")
+
         # Tarjeta que flota: acceso rápido a carpeta origen
         self.folder_card = GlassCard(self, icon="📁", title="Carpeta Origen por defecto",
                                      subtitle=os.path.basename(SOURCE_DEFAULT) or "...",
@@ -641,13 +1132,24 @@ class HomeView(ctk.CTkFrame):
         self.current_doc_path = None
         self.current_pdf_path = None
         self.last_patient_folder = None
+        self.current_patient = None
+        self._shown_source = SOURCE_DEFAULT
+        self._job = None
 
     def on_show(self):
-        """Actualiza path_entry y folder_card con los valores actuales de configuración (al volver a Inicio)."""
+        """
+        Al volver a Inicio: si cambió la carpeta Origen en Configuración se actualizan path_entry y
+        folder_card; si no, se conserva la carpeta que el usuario había escrito.
+        """
+        if SOURCE_DEFAULT == self._shown_source:
+            return
+        self._shown_source = SOURCE_DEFAULT
         self.path_entry.delete(0, "end")
         initial = SOURCE_DEFAULT if os.path.isdir(SOURCE_DEFAULT) else _user_home
         self.path_entry.insert(0, initial)
-        self.folder_card.lbl_sub.configure(text=os.path.basename(SOURCE_DEFAULT) or "...")
+        self.folder_card.update_content(subtitle=os.path.basename(SOURCE_DEFAULT) or "...", command=lambda: open_folder(SOURCE_DEFAULT))
+        if self.main_app.inbox_queue.running:
+            self.main_app.start_inbox_watch(initial)
 
     def _browse_folder(self):
         initial = self.path_entry.get().strip() if self.path_entry.get().strip() and os.path.isdir(self.path_entry.get().strip()) else _user_home
@@ -655,11 +1157,62 @@ class HomeView(ctk.CTkFrame):
         if folder:
             self.path_entry.delete(0, "end")
             self.path_entry.insert(0, folder)
+            if self.main_app.inbox_queue.running:
+                self.main_app.start_inbox_watch(folder)
+
+    def _toggle_watch(self):
+        enabled = bool(self.watch_switch.get())
+        if enabled:
+            self.main_app.start_inbox_watch(self.path_entry.get().strip() or SOURCE_DEFAULT)
+            self.set_status("Vigilando la carpeta: los documentos nuevos aparecerán aquí al terminar de copiarse.")
+        else:
+            self.main_app.stop_inbox_watch()
+        save_inbox_watch(enabled)
+        self.refresh_inbox()
+
+    def refresh_inbox(self):
+        """Muestra la cola de la bandeja vigilada (los 5 más recientes); cada fila organiza su documento."""
+        queue = self.main_app.inbox_queue
+        entries = queue.entries() if queue.running else []
+        for child in self.inbox_rows.winfo_children():
+            child.destroy()
+        if not entries:
+            self.inbox_frame.pack_forget()
+            return
+        ready = [e for e in entries if e["status"] == INBOX_READY]
+        self.inbox_lbl.configure(text=f"📥 Documentos nuevos: {len(entries)}")
+        self.btn_inbox_batch.configure(text=f"Organizar todos ({len(ready)})", state="normal" if ready else "disabled")
+        for e in entries[:5]:
+            name = os.path.basename(e["path"])
+            if e["status"] != INBOX_READY:
+                text, color = f"⏳ {name} — copiándose…", VisionSys.TEXT_SECONDARY_DARK
+            elif e["duplicate"]:
+                text, color = f"⚠ {name} — ya en Respaldo ({e['duplicate']['timestamp'][:10]})", VisionSys.WARNING
+            else:
+                text, color = f"{name}  →  {e['suggestion'] or 'sin nombre sugerido'}", VisionSys.TEXT_PRIMARY_DARK
+            ctk.CTkButton(self.inbox_rows, text=text, anchor="w", height=30, fg_color="transparent", hover_color=VisionSys.BORDER_DARK_HOVER,
+                          text_color=color, state="normal" if e["status"] == INBOX_READY else "disabled",
+                          command=lambda p=e["path"], m=e["mtime"]: self._organize_pick([(p, m)])).pack(fill="x")
+        if len(entries) > 5:
+            ctk.CTkLabel(self.inbox_rows, text=f"… y {len(entries) - 5} más", font=VisionSys.FONT_CAPTION, text_color=VisionSys.TEXT_SECONDARY_DARK).pack(anchor="w")
+        if not self.inbox_frame.winfo_ismapped():
+            self.inbox_frame.pack(fill="x", before=self.btn_organize, pady=(0, VisionSys.SPACE_S))
+
+    def run_inbox_batch(self):
+        ready = self.main_app.inbox_queue.entries(ready_only=True)
+        if not ready:
+            return
+        items = ask_batch_dialog(self, [(e["path"], e["mtime"]) for e in ready], title="Organizar documentos nuevos",
+                                 names={e["path"]: e["suggestion"] for e in ready if e["suggestion"]})
+        if not items:
+            self.set_status("Operación cancelada.")
+            return
+        self.set_status(f"Organizando {len(items)} documentos...")
+        self._start_job("organizar lote", organize_batch, items, BASE_DEST, BACKUP, on_done=self._on_batch_done)
 
     def set_status(self, msg, is_error=False):
         color = VisionSys.ERROR if is_error else "gray80"
         self.status_lbl.configure(text=msg, text_color=color)
-        self.update()
 
     def open_patient_folder(self):
         if self.last_patient_folder and os.path.exists(self.last_patient_folder):
@@ -677,11 +1230,14 @@ class HomeView(ctk.CTkFrame):
             set_status(f"La carpeta no existe:\n{source_folder}", True)
             return
 
-        set_status("Buscando archivos .doc y .docx...")
-        self.update()
-        docs_ordered = find_docs_ordered(source_folder)
+        set_status(f"Buscando documentos ({inbox_extensions_label()})...")
+        self._start_job("buscar documentos", lambda job, folder: find_docs_ordered(folder), source_folder, on_done=self._organize_pick)
+
+    def _organize_pick(self, docs_ordered):
+        """Continúa run_organize con los documentos encontrados: diálogos en el hilo de la interfaz."""
+        set_status = self.set_status
         if not docs_ordered:
-            set_status("No se encontró ningún archivo .doc o .docx. Elige otra carpeta o añade un documento.", True)
+            set_status(f"No se encontró ningún documento ({inbox_extensions_label()}). Elige otra carpeta o añade un documento.", True)
             return
         latest_file = ask_file_picker_dialog(self, docs_ordered, title="Elegir archivo a organizar")
         if not latest_file:
@@ -696,7 +1252,8 @@ class HomeView(ctk.CTkFrame):
             "Escribe el nuevo nombre (sin extensión).\n"
             "Si escribes 'SS Nombre Paciente', la carpeta del paciente se creará con ese nombre."
         )
-        user_name = ask_text_dialog(self, prompt, title="Nombre del archivo")
+        queued = self.main_app.inbox_queue.get(latest_file)
+        user_name = ask_text_dialog(self, prompt, default=queued["suggestion"] if queued else "", title="Nombre del archivo")
         if user_name is None:
             set_status("Operación cancelada.")
             return
@@ -714,25 +1271,12 @@ class HomeView(ctk.CTkFrame):
         hoy = datetime.date.today()
         ruta_anio, ruta_mes, ruta_dia, _ = build_folder_structure(BASE_DEST, hoy.year, hoy.month, hoy.day, MESES)
         destino_paciente = os.path.join(ruta_dia, paciente)
-        anio = os.path.basename(ruta_anio)
-        mes_nombre = os.path.basename(ruta_mes)
-        dia_nombre = os.path.basename(ruta_dia)
-
-        for r in (ruta_anio, ruta_mes, ruta_dia, destino_paciente, BACKUP):
-            os.makedirs(r, exist_ok=True)
+        date_names = (os.path.basename(ruta_anio), os.path.basename(ruta_mes), os.path.basename(ruta_dia))
 
         ext = os.path.splitext(latest_file)[1].lower()
-        if ext not in (".doc", ".docx"):
+        if ext not in SUPPORTED_INBOX_EXTENSIONS:
             ext = ".docx"
-        stem, n = user_name, 0
-        while True:
-            doc_name = f"{stem}_{n}" if n else stem
-            new_doc_path = os.path.join(destino_paciente, doc_name + ext)
-            if not os.path.exists(new_doc_path):
-                break
-            n += 1
-
-        if not check_path_length(new_doc_path, _MAX_PATH_LEN):
+        if not check_path_length(os.path.join(destino_paciente, user_name + ext), _MAX_PATH_LEN):
             set_status("La ruta del archivo es demasiado larga para Windows. Usa un nombre más corto.", True)
             return
 
@@ -747,21 +1291,33 @@ class HomeView(ctk.CTkFrame):
             set_status("Operación cancelada.")
             return
 
-        try:
-            shutil.move(latest_file, new_doc_path)
-        except Exception as e:
-            logging.error("No se pudo mover %s → %s: %s", latest_file, new_doc_path, e)
-            set_status(f"No se pudo mover el archivo:\n{e}", True)
-            return
+        set_status("Organizando...")
+        self._start_job(
+            "organizar", organize_document, latest_file, destino_paciente, paciente, user_name, ext, date_names, BASE_DEST, BACKUP,
+            on_done=lambda new_doc_path: self._on_organized(new_doc_path, paciente, destino_paciente, latest_file),
+            on_error=lambda e: set_status(f"No se pudo mover el archivo:\n{e}", True),
+        )
 
+    def _on_organized(self, new_doc_path, paciente, destino_paciente, source_file):
+        self.main_app.inbox_queue.discard(source_file)
         open_folder(destino_paciente)
+        if new_doc_path.lower().endswith(".pdf"):
+            # Ya es el PDF final: no hay Word que abrir ni PDF que esperar
+            self.last_patient_folder = destino_paciente
+            self.btn_open_folder.configure(state="normal", fg_color=VisionSys.ACCENT, hover_color=VisionSys.ACCENT_HOVER, text_color="#ffffff")
+            self._restore_buttons()
+            self.set_status(f"✓ PDF organizado: {os.path.basename(new_doc_path)}")
+            return
+        # Si el nombre ya estaba ocupado el documento es «nombre_1»: su PDF se llama igual que él
+        pdf_path = pdf_path_for(new_doc_path)
+        pdf_name = os.path.basename(pdf_path)
         show_info_dialog(
             self,
             f"Abriendo Word…\n\n"
-            f"Guarda como PDF con el nombre: {user_name}.pdf\n"
+            f"Guarda como PDF con el nombre: {pdf_name}\n"
             f"Carpeta destino: {destino_paciente}\n\n"
-            "Cuando termines, cierra Word y pulsa «Finalizar (PDF)» en esta ventana.\n"
-            "La app no se bloqueará mientras Word esté abierto."
+            "Al guardar el PDF y cerrar Word, el documento se moverá a respaldo automáticamente.\n"
+            "Puedes seguir organizando otros documentos mientras tanto."
         )
 
         word_exe = find_word_executable()
@@ -770,50 +1326,36 @@ class HomeView(ctk.CTkFrame):
                 subprocess.Popen(["start", "", word_exe, new_doc_path], shell=True)
             except Exception as e:
                 logging.error("No se pudo abrir Word: %s", e)
-                set_status(f"No se pudo abrir Word:\n{e}", True)
+                self.set_status(f"No se pudo abrir Word:\n{e}", True)
         else:
             subprocess.Popen(["start", new_doc_path], shell=True)
 
-        show_info_dialog(
-            self,
-            f"Recuerda: guarda el PDF en:\n{destino_paciente}\n\n"
-            f"Nombre: {user_name}.pdf\n\n"
-            "Cuando cierres Word, pulsa «Finalizar (PDF)» para generar el PDF y mover el .doc a respaldo."
-        )
-
+        self.main_app.pending_pdfs.expect(new_doc_path, pdf_path, paciente)
         self.current_doc_path = new_doc_path
-        self.current_pdf_path = os.path.join(destino_paciente, user_name + ".pdf")
+        self.current_pdf_path = pdf_path
+        self.current_patient = paciente
         self.last_patient_folder = destino_paciente
-        self.btn_organize.configure(state="disabled", fg_color=VisionSys.GLASS_DARK)
-        self.btn_pdf.configure(state="normal", fg_color=VisionSys.WARNING)
         self.btn_open_folder.configure(state="normal", fg_color=VisionSys.ACCENT, hover_color=VisionSys.ACCENT_HOVER, text_color="#ffffff")
+        self._restore_buttons()
+        self.refresh_pending()
+        self.set_status(f"Esperando {pdf_name} en la carpeta del paciente.\nAl detectarlo, el Word se moverá a Respaldo.")
 
-        # Mover Word a respaldo con reintentos (mejora del proyecto actual)
-        if os.path.exists(new_doc_path):
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            base_backup = os.path.splitext(os.path.basename(new_doc_path))[0]
-            ext_backup = os.path.splitext(new_doc_path)[1]
-            backup_path = os.path.join(BACKUP, f"{base_backup}_{timestamp}{ext_backup}")
-            for intento in range(_MAX_BACKUP_RETRIES):
-                try:
-                    shutil.move(new_doc_path, backup_path)
-                    set_status(f"✓ Completado. Respaldo: {os.path.basename(backup_path)}\nEl PDF debe estar en la carpeta del paciente.")
-                    break
-                except Exception as e:
-                    logging.error("Intento %s/%s respaldo: %s", intento + 1, _MAX_BACKUP_RETRIES, e)
-                    if intento < _MAX_BACKUP_RETRIES - 1:
-                        set_status(f"Reintentando respaldo... ({intento + 1}/{_MAX_BACKUP_RETRIES})")
-                        self.update()
-                        time.sleep(3)
-                    else:
-                        set_status(f"No se pudo mover a Respaldo tras {_MAX_BACKUP_RETRIES} intentos.", True)
+    def on_pdfs_finalized(self, entries):
+        """PDF detectados por el seguimiento de pendientes (App.pending_pdfs): documentos ya en respaldo."""
+        if self.current_doc_path and any(os.path.normcase(e["doc"]) == os.path.normcase(self.current_doc_path) for e in entries):
+            self._reset_ui()
+        names = ", ".join(os.path.basename(e["pdf"]) for e in entries[:3]) + ("…" if len(entries) > 3 else "")
+        self.set_status(f"✓ PDF detectado: {names}\nWord movido a Respaldo.")
+        self.refresh_pending()
+
+    def refresh_pending(self):
+        count = len(self.main_app.pending_pdfs.pending())
+        if count:
+            self.pending_lbl.configure(text=f"⏳ Esperando PDF: {count} documento{'s' if count != 1 else ''}")
+            if not self.pending_lbl.winfo_ismapped():
+                self.pending_lbl.pack(anchor="w", before=self.btn_organize, pady=(0, VisionSys.SPACE_XS))
         else:
-            set_status("Proceso completado. Recuerda guardar el PDF en la carpeta del paciente.")
-
-        logging.info(
-            "Esperado PDF: %s → %s | Paciente: %s | Fecha: %s/%s/%s",
-            user_name + ".pdf", destino_paciente, paciente, anio, mes_nombre, dia_nombre
-        )
+            self.pending_lbl.pack_forget()
 
     def run_pdf_conversion(self):
         if not self.current_doc_path or not os.path.exists(self.current_doc_path):
@@ -821,31 +1363,128 @@ class HomeView(ctk.CTkFrame):
             self._reset_ui()
             return
         self.set_status("Generando PDF...")
-        self.update()
-        success = convert_doc_to_pdf(self.current_doc_path, self.current_pdf_path)
-        if not success:
-            self.set_status("No se pudo crear el PDF. ¿Cerraste Word?", True)
-            return
-        if os.path.exists(self.current_pdf_path):
-            self.set_status("Moviendo a respaldo...")
-            self.update()
-            try:
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                base = os.path.basename(self.current_doc_path)
-                backup_path = os.path.join(BACKUP, f"{timestamp}_{base}")
-                shutil.move(self.current_doc_path, backup_path)
-                show_info_dialog(self, "¡Listo!\nPDF creado en la carpeta del paciente.")
-                self.set_status("Proceso finalizado.")
-            except Exception as e:
-                self.set_status(f"Error al mover a respaldo: {e}", True)
+        doc_path, pdf_path, patient = self.current_doc_path, self.current_pdf_path, self.current_patient or ""
+        # Mientras se convierte a mano, el seguimiento no debe mover el mismo documento
+        expected = self.main_app.pending_pdfs.get(doc_path)
+        self.main_app.pending_pdfs.forget(doc_path)
+
+        def on_error(e):
+            self.main_app.pending_pdfs.expect(doc_path, pdf_path, patient, expected["since"] if expected else None)
+            self.set_status(str(e), True)
+
+        self._start_job("pdf", convert_and_backup, doc_path, pdf_path, patient, BACKUP, on_done=self._on_pdf_done, on_error=on_error)
+
+    def _on_pdf_done(self, error):
+        self.refresh_pending()
+        if error:
+            self.set_status(error, True)
         else:
-            self.set_status("PDF no detectado en la carpeta.", True)
+            show_info_dialog(self, "¡Listo!\nPDF creado en la carpeta del paciente.")
+            self.set_status("Proceso finalizado.")
         self._reset_ui()
 
-    def _reset_ui(self):
+    def run_pdf_day(self):
+        if self.current_doc_path and not ask_yesno_dialog(
+                self, "Hay un documento pendiente de «Finalizar (PDF)».\nSe convertirá también con los demás de hoy. ¿Continuar?"):
+            return
+        self.set_status("Generando los PDF de hoy...")
+        self._start_job("pdf del día", convert_pending_day, BASE_DEST, BACKUP, datetime.date.today(), self.main_app.pending_pdfs,
+                        on_done=self._on_pdf_day_done)
+
+    def _on_pdf_day_done(self, stats):
+        self.refresh_pending()
+        if self.current_doc_path and not os.path.exists(self.current_doc_path):
+            # El documento pendiente de Finalizar ya se convirtió en el lote
+            self._reset_ui()
+        if not stats["total"]:
+            self.set_status("No hay documentos de hoy pendientes de PDF.")
+            return
+        failed = stats["fallidos"]
+        msg = (f"{stats[CONV_OK]} PDF creados y {stats[CONV_SKIPPED]} ya estaban al día "
+               f"({stats['segundos']:.0f} s, {stats['por_minuto']:.0f} por minuto).\nLos documentos se movieron a Respaldo.")
+        if failed:
+            detail = "\n".join(f"• {os.path.basename(e['doc'])}: {e['error'] or e['status']}" for e in failed[:5])
+            more = f"\n… y {len(failed) - 5} más" if len(failed) > 5 else ""
+            msg += f"\n\nSin PDF ({len(failed)}):\n{detail}{more}"
+        self.set_status(f"✓ {stats[CONV_OK] + stats[CONV_SKIPPED]} finalizados" + (f", {len(failed)} con errores" if failed else "."), bool(failed))
+        show_info_dialog(self, msg)
+
+    def run_batch_organize(self):
+        source_folder = self.path_entry.get().strip() or SOURCE_DEFAULT
+        if not source_folder or not os.path.isdir(source_folder):
+            self.set_status(f"La carpeta no existe:\n{source_folder}", True)
+            return
+        self.set_status(f"Buscando documentos ({inbox_extensions_label()})...")
+        self._start_job("buscar documentos", lambda job, folder: find_docs_ordered(folder), source_folder, on_done=self._batch_pick)
+
+    def _batch_pick(self, docs_ordered):
+        if not docs_ordered:
+            self.set_status(f"No se encontró ningún documento ({inbox_extensions_label()}). Elige otra carpeta o añade un documento.", True)
+            return
+        items = ask_batch_dialog(self, docs_ordered)
+        if not items:
+            self.set_status("Operación cancelada.")
+            return
+        self.set_status(f"Organizando {len(items)} documentos...")
+        self._start_job("organizar lote", organize_batch, items, BASE_DEST, BACKUP, on_done=self._on_batch_done)
+
+    def _on_batch_done(self, results):
+        ok = [r for r in results if r["status"] == STATUS_OK]
+        failed = [r for r in results if r["status"] != STATUS_OK]
+        for r in ok:
+            self.main_app.inbox_queue.discard(r["source"])
+        if ok:
+            self.last_patient_folder = ok[-1]["folder"]
+            self.btn_open_folder.configure(state="normal", fg_color=VisionSys.ACCENT, hover_color=VisionSys.ACCENT_HOVER, text_color="#ffffff")
+        msg = f"{len(ok)} documentos organizados (con copia en Respaldo)."
+        if failed:
+            detail = "\n".join(f"• {os.path.basename(r['source'])}: {r['error'] or r['status']}" for r in failed[:5])
+            more = f"\n… y {len(failed) - 5} más" if len(failed) > 5 else ""
+            msg += f"\n\nNo organizados ({len(failed)}):\n{detail}{more}"
+        self.set_status(f"✓ {len(ok)} organizados" + (f", {len(failed)} con errores" if failed else "."), bool(failed))
+        show_info_dialog(self, msg)
+
+    def _start_job(self, name, fn, *args, on_done, on_error=None):
+        """
+        Ejecuta fn(job, *args) con main_app.jobs: el progreso va a la barra de estado, «Cancelar»
+        queda visible mientras dura y los botones de acción se desactivan hasta que termina.
+        """
+        def finished(callback=None, *values):
+            self._job = None
+            self.btn_cancel.pack_forget()
+            self._restore_buttons()
+            if callback:
+                callback(*values)
+
+        self.btn_organize.configure(state="disabled", fg_color=VisionSys.GLASS_DARK)
+        self.btn_batch.configure(state="disabled")
+        self.btn_pdf.configure(state="disabled")
+        self.btn_pdf_day.configure(state="disabled")
+        self.btn_cancel.pack(side="right", padx=VisionSys.SPACE_S)
+        self._job = self.main_app.jobs.submit(
+            name, fn, *args,
+            on_progress=lambda message, fraction: self.set_status(message),
+            on_done=lambda result: finished(on_done, result),
+            on_error=lambda e: finished(on_error or (lambda err: self.set_status(f"Error: {err}", True)), e),
+            on_cancel=lambda: finished(self.set_status, "Operación cancelada."),
+        )
+
+    def _cancel_job(self):
+        if self._job is not None:
+            self._job.cancel()
+            self.set_status("Cancelando...")
+
+    def _restore_buttons(self):
+        # Con el seguimiento de PDF pendientes se puede organizar otro documento mientras el
+        # anterior sigue abierto en Word; «Finalizar (PDF)» convierte a mano el último organizado
+        self.btn_batch.configure(state="normal")
+        self.btn_pdf_day.configure(state="normal")
         self.btn_organize.configure(state="normal", fg_color=VisionSys.ACCENT_GREEN)
-        self.btn_pdf.configure(state="disabled", fg_color=VisionSys.WARNING)
+        self.btn_pdf.configure(state="normal" if self.current_doc_path else "disabled", fg_color=VisionSys.WARNING)
+
+    def _reset_ui(self):
         self.current_doc_path = None
+        self._restore_buttons()
         self.btn_open_folder.configure(state="disabled", fg_color=VisionSys.GLASS_DARK, hover_color=VisionSys.BORDER_DARK_HOVER, text_color=VisionSys.TEXT_SECONDARY_DARK)
 
 
@@ -886,11 +1525,66 @@ class App(ctk.CTk):
         self.main_container.grid_columnconfigure(0, weight=1)
         self.main_container.grid_rowconfigure(0, weight=1)
         self.current_view = None
+        # Vistas ya construidas: se ocultan y se vuelven a mostrar en lugar de recrearse
+        self.views = {}
+        # Tareas lentas (mover, respaldo, PDF) fuera del hilo de Tk; los avisos vuelven con after()
+        self.jobs = JobRunner(dispatch=lambda fn: self.after(0, fn))
+        # Documentos organizados que esperan su PDF: al aparecer, el Word pasa solo a respaldo
+        self.pending_pdfs = PendingPdfTracker(
+            BACKUP, history_store=history_store, journal=journal,
+            on_finalized=lambda entries: self.after(0, lambda: self._on_pdfs_finalized(entries)),
+        )
+        # Bandeja vigilada de la carpeta de origen (opcional, ver HomeView.watch_switch)
+        self.inbox_queue = InboxQueue(
+            inbox, SOURCE_DEFAULT, INBOX_CONFIG["extensions"], INBOX_CONFIG["recursive"],
+            lookup=suggest_patient, known=backup_copy_of,
+            on_change=lambda: self.after(0, self._on_inbox_changed),
+        )
         self.show_view("Inicio")
         self._bind_shortcuts()
 
         # Efecto Acrylic/Blur tras mostrar ventana (Windows 11)
         self.after(100, lambda: apply_acrylic(self))
+        # Índice de contenido en segundo plano, cuando la ventana ya está visible
+        self.after(3000, start_content_indexing)
+        self.after(1000, start_index_watcher)
+        self.after(1500, self._start_pending_pdfs)
+        self.after(5000, start_backup_maintenance)
+        if INBOX_CONFIG["watch"]:
+            self.after(2000, lambda: self.start_inbox_watch(self.views["Inicio"].path_entry.get().strip() or SOURCE_DEFAULT))
+
+    def start_inbox_watch(self, source_dir: str):
+        """Vigila source_dir (o pasa a vigilarlo): la cola empieza con lo que llegue desde ahora."""
+        self.inbox_queue.set_source(source_dir)
+        self.inbox_queue.start()
+        logging.info("Vigilando la carpeta de origen %s", source_dir)
+
+    def stop_inbox_watch(self):
+        self.inbox_queue.stop()
+
+    def _on_inbox_changed(self):
+        home = self.views.get("Inicio")
+        if home is not None:
+            home.refresh_inbox()
+
+    def _start_pending_pdfs(self):
+        """Recupera los documentos de los últimos días que siguen sin PDF y empieza a vigilarlos."""
+        today = datetime.date.today()
+        self.jobs.submit(
+            "pdf pendientes",
+            lambda job: self.pending_pdfs.adopt(BASE_DEST, MESES, today - datetime.timedelta(days=_PENDING_PDF_DAYS - 1), today),
+            on_done=lambda added: self._on_pdfs_finalized([]),
+        )
+        self.pending_pdfs.start()
+
+    def _on_pdfs_finalized(self, entries):
+        home = self.views.get("Inicio")
+        if home is None:
+            return
+        if entries:
+            home.on_pdfs_finalized(entries)
+        else:
+            home.refresh_pending()
 
     def _bind_shortcuts(self):
         self.bind("<Control-o>", lambda e: (self.show_view("Inicio"), self.after(50, lambda: getattr(self.current_view, "path_entry", None) and self.current_view.path_entry.focus_set())))
@@ -926,27 +1620,59 @@ class App(ctk.CTk):
         self.nav_btns[name] = {"btn": btn, "view": view_class}
 
     def show_view(self, name):
+        """
+        Muestra la vista name. Cada vista se construye una sola vez y conserva su estado
+        (resultados, rutas escritas...); al cambiar de vista se llama a on_hide de la saliente y a
+        on_show de la entrante si las definen. Para reconstruir una vista, ver invalidate_view.
+        """
         for key, val in self.nav_btns.items():
             val["btn"].configure(fg_color=VisionSys.GLASS_DARK if key == name else "transparent")
-        # Sensación de transición: el contenido se actualiza sin cortes
+        view = self.views.get(name)
+        if view is not None and view is self.current_view:
+            return
         if self.current_view:
+            getattr(self.current_view, "on_hide", lambda: None)()
             self.current_view.pack_forget()
-            self.current_view.destroy()
         try:
-            self.current_view = self.nav_btns[name]["view"](self.main_container, self)
-            self.current_view.pack(fill="both", expand=True, padx=VisionSys.SPACE_M, pady=VisionSys.SPACE_M)
-            getattr(self.current_view, "on_show", lambda: None)()
+            if view is None:
+                view = self.nav_btns[name]["view"](self.main_container, self)
+                self.views[name] = view
+            self.current_view = view
+            view.pack(fill="both", expand=True, padx=VisionSys.SPACE_M, pady=VisionSys.SPACE_M)
+            getattr(view, "on_show", lambda: None)()
         except Exception as e:
             lbl = ctk.CTkLabel(self.main_container, text=f"Error al cargar vista: {e}", text_color=VisionSys.ERROR)
             lbl.pack()
             logging.exception("View error: %s", e)
 
+    def invalidate_view(self, name):
+        """Descarta la vista name para que se construya de nuevo la próxima vez (o ya, si está visible)."""
+        view = self.views.pop(name, None)
+        if view is None:
+            return
+        if view is self.current_view:
+            getattr(view, "on_hide", lambda: None)()
+            self.current_view = None
+            view.destroy()
+            self.show_view(name)
+        else:
+            view.destroy()
+
     def quit_app(self):
+        self.jobs.shutdown()
+        self.pending_pdfs.stop()
+        self.inbox_queue.stop()
+        stop_index_watcher()
+        close_pdf_pool()
+        journal.close()
         self.destroy()
 
 
 if __name__ == "__main__":
+    # Necesario en el .exe (PyInstaller) para el grupo de procesos del índice de contenido
+    multiprocessing.freeze_support()
     try:
+        init_app()
         app = App()
         center_window(app, 920, 680)
         app.mainloop()
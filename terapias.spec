@@ -14,6 +14,23 @@ a = Analysis(
     hiddenimports=[
         "terapias_logic",
         "ui_components",
+        "terapias_index",
+        "terapias_fuzzy",
+        "terapias_walk",
+        "terapias_content",
+        "terapias_watch",
+        "terapias_history",
+        "terapias_jobs",
+        "terapias_organize",
+        "terapias_config",
+        "terapias_pdf",
+        "terapias_convert",
+        "terapias_pending",
+        "terapias_backup",
+        "terapias_transfer",
+        "terapias_journal",
+        "terapias_inbox",
+        "pypdf",
         "win32com.client",
         "pythoncom",
         "pywintypes",
@@ -0,0 +1,556 @@
+"""
+Respaldo de documentos por contenido: cada documento se guarda una sola vez en
+RESPALDO/objetos/ab/<sha256>.ext y un catálogo SQLite (RESPALDO/catalogo.sqlite) anota cada copia
+con su nombre original, ruta de origen y fecha. Los documentos idénticos no ocupan más espacio y
+buscar por nombre original usa un índice, sin recorrer la carpeta. Los objetos antiguos se
+empaquetan en un ZIP por mes (RESPALDO/archivos/AAAA-MM.zip): el directorio central del ZIP es su
+índice, así que se extrae un documento sin descomprimir el resto. Sin dependencias de GUI.
+"""
+import os
+import re
+import shutil
+import hashlib
+import logging
+import sqlite3
+import datetime
+import time
+import threading
+import zipfile
+
+from terapias_fuzzy import normalize_name
+from terapias_transfer import copy_file, file_sha256
+
+CATALOG_FILE_NAME = "catalogo.sqlite"
+OBJECTS_DIR_NAME = "objetos"
+ARCHIVES_DIR_NAME = "archivos"
+DEFAULT_COMPACT_DAYS = 90
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+_CHUNK = 1024 * 1024
+# Formatos que ya van comprimidos: deflate apenas los reduce y solo gasta tiempo
+_STORED_EXTENSIONS = (".docx", ".xlsx", ".pptx", ".odt", ".pdf", ".zip", ".jpg", ".jpeg", ".png")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objetos (
+    hash TEXT PRIMARY KEY,
+    ruta TEXT NOT NULL,
+    tamano INTEGER NOT NULL,
+    creado TEXT NOT NULL,
+    archivo TEXT
+);
+CREATE TABLE IF NOT EXISTS copias (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    nombre_norm TEXT NOT NULL,
+    origen TEXT NOT NULL DEFAULT '',
+    hash TEXT NOT NULL REFERENCES objetos(hash)
+);
+CREATE INDEX IF NOT EXISTS idx_copias_nombre ON copias(nombre_norm, fecha);
+CREATE INDEX IF NOT EXISTS idx_copias_fecha ON copias(fecha);
+CREATE INDEX IF NOT EXISTS idx_copias_hash ON copias(hash);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+_COLUMNS = "c.id, c.fecha, c.nombre, c.origen, c.hash, o.ruta, o.tamano, o.archivo"
+
+# Nombres del respaldo plano anterior: AAAAMMDD_HHMMSS_nombre.ext (Finalizar) y nombre_AAAAMMDD_HHMMSS.ext (organizar)
+_LEGACY_PREFIX = re.compile(r"^(\d{8}_\d{6})_(.+?)(\.[^.]+)?$")
+_LEGACY_SUFFIX = re.compile(r"^(.+)_(\d{8}_\d{6})(?:_\d+)?(\.[^.]+)?$")
+
+_stores: dict[str, "BackupStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(backup_dir: str) -> "BackupStore":
+    """BackupStore de backup_dir (uno por carpeta, compartido entre hilos)."""
+    key = os.path.normcase(os.path.abspath(backup_dir))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = BackupStore(backup_dir)
+        return store
+
+
+def name_key(name: str) -> str:
+    """Clave de búsqueda de un nombre de archivo: 'SS Pérez_1.DOCX' -> 'ss perez 1'."""
+    return normalize_name(os.path.splitext(os.path.basename(name))[0])
+
+
+def parse_legacy_name(file_name: str) -> tuple[str, datetime.datetime | None]:
+    """
+    (nombre original, fecha) de un archivo del respaldo plano anterior. Si el nombre no lleva
+    fecha, se devuelve tal cual y None.
+    """
+    for pattern, ts_group, name_group in ((_LEGACY_PREFIX, 1, 2), (_LEGACY_SUFFIX, 2, 1)):
+        m = pattern.match(file_name)
+        if not m:
+            continue
+        try:
+            when = datetime.datetime.strptime(m.group(ts_group), "%Y%m%d_%H%M%S")
+        except ValueError:
+            continue
+        return m.group(name_group) + (m.group(3) or ""), when
+    return file_name, None
+
+
+class BackupStore:
+    """
+    Almacén de respaldo de una carpeta. Una conexión SQLite por operación y sin WAL: la carpeta de
+    respaldo puede estar en una unidad de red, donde WAL no funciona.
+    """
+
+    def __init__(self, backup_dir: str):
+        self.backup_dir = backup_dir
+        self.objects_dir = os.path.join(backup_dir, OBJECTS_DIR_NAME)
+        self.archives_dir = os.path.join(backup_dir, ARCHIVES_DIR_NAME)
+        self.db_path = os.path.join(backup_dir, CATALOG_FILE_NAME)
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # Si alguien borró la carpeta de respaldo, se vuelve a crear
+        if not self._initialized or not os.path.exists(self.db_path):
+            self._initialized = False
+            os.makedirs(self.objects_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.executescript(_SCHEMA)
+            if "archivo" not in {row[1] for row in conn.execute("PRAGMA table_info(objetos)")}:
+                conn.execute("ALTER TABLE objetos ADD COLUMN archivo TEXT")
+            self._initialized = True
+        return conn
+
+    def _location(self, rel: str, archivo: str | None) -> tuple[str, str | None]:
+        """(ruta del objeto suelto o del ZIP que lo contiene, nombre dentro del ZIP o None)."""
+        if archivo:
+            return os.path.join(self.archives_dir, archivo), rel.replace(os.sep, "/")
+        return os.path.join(self.objects_dir, rel), None
+
+    def _entry(self, row: tuple) -> dict:
+        entry_id, fecha, nombre, origen, file_hash, ruta, tamano, archivo = row
+        blob, member = self._location(ruta, archivo)
+        return {"id": entry_id, "timestamp": fecha, "name": nombre, "source": origen, "hash": file_hash,
+                "blob": blob, "member": member, "size": tamano}
+
+    def _blob_rel(self, file_hash: str, ext: str) -> str:
+        return os.path.join(file_hash[:2], file_hash + ext.lower())
+
+    def _tmp_path(self, path: str) -> str:
+        """Temporal de path dentro de objetos/: nombre fijo por origen para poder continuarlo."""
+        key = os.path.normcase(os.path.abspath(path)).encode("utf-8")
+        return os.path.join(self.objects_dir, f".{hashlib.sha1(key).hexdigest()[:16]}.tmp")
+
+    def _ingest(self, path: str, move: bool) -> tuple[str, str, int, str | None, bool]:
+        """
+        Lleva path a objetos/ y devuelve (hash, ruta relativa, tamaño, ZIP donde ya estaba o None,
+        ya_existía). Con move el original desaparece; si no se puede borrar (abierto en Word) se
+        lanza OSError y el original queda como estaba. Entre discos se copia con terapias_transfer
+        (verificada y, si se corta, continuable).
+        """
+        tmp = self._tmp_path(path)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        copied = False
+        if move:
+            try:
+                # En el mismo disco es un renombrado: se calcula el hash de lo que ya es nuestro
+                os.replace(path, tmp)
+            except PermissionError:
+                raise
+            except OSError:
+                copied = True
+        if not move or copied:
+            try:
+                file_hash = copy_file(path, tmp)
+            except OSError:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        else:
+            file_hash = file_sha256(tmp)
+        placed = self._place(tmp, file_hash, os.path.splitext(path)[1])
+        if copied:
+            # Entre discos: el original se borra solo cuando la copia ya está guardada
+            os.remove(path)
+        return placed
+
+    def _place(self, tmp: str, file_hash: str, ext: str) -> tuple[str, str, int, str | None, bool]:
+        """Pone tmp en su sitio de objetos/ (o lo descarta si el contenido ya estaba). Ver _ingest."""
+        size = os.path.getsize(tmp)
+        rel = self._blob_rel(file_hash, ext)
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    row = conn.execute("SELECT ruta, archivo FROM objetos WHERE hash = ?", (file_hash,)).fetchone()
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error leyendo el catálogo de respaldo: %s", e)
+            row = None
+        archivo = None
+        existed = row is not None and os.path.isfile(self._location(*row)[0])
+        if existed:
+            os.remove(tmp)
+            rel, archivo = row
+        else:
+            os.makedirs(os.path.join(self.objects_dir, file_hash[:2]), exist_ok=True)
+            os.replace(tmp, os.path.join(self.objects_dir, rel))
+        return file_hash, rel, size, archivo, existed
+
+    def store(self, path: str, move: bool = True, when: datetime.datetime | None = None, name: str | None = None) -> dict:
+        """
+        Guarda path en el respaldo (moviéndolo o, con move=False, copiándolo) y anota la copia con
+        su nombre original (name, por defecto el de path) y fecha. Devuelve la entrada del catálogo
+        con duplicate=True si el contenido ya estaba. Lanza OSError si no se pudo guardar.
+        """
+        placed = self._ingest(path, move)
+        return self._record(placed, name or os.path.basename(path), os.path.abspath(path), when)
+
+    def resume(self, path: str, name: str | None = None, when: datetime.datetime | None = None) -> dict | None:
+        """
+        Termina de guardar path si un cierre a medias lo dejó en el temporal de objetos/ (ya no
+        está en su sitio pero tampoco en el catálogo). Devuelve la entrada o None si no hay nada.
+        """
+        tmp = self._tmp_path(path)
+        if os.path.exists(path) or not os.path.isfile(tmp):
+            return None
+        placed = self._place(tmp, file_sha256(tmp), os.path.splitext(path)[1])
+        logging.info("Respaldo: se completó el guardado interrumpido de %s", path)
+        return self._record(placed, name or os.path.basename(path), os.path.abspath(path), when)
+
+    def _record(self, placed: tuple, nombre: str, source: str, when: datetime.datetime | None) -> dict:
+        """Anota en el catálogo la copia de un contenido ya guardado por _ingest/_place."""
+        file_hash, rel, size, archivo, existed = placed
+        fecha = (when or datetime.datetime.now()).strftime(_TS_FORMAT)
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute(
+                            "INSERT OR IGNORE INTO objetos (hash, ruta, tamano, creado) VALUES (?, ?, ?, ?)",
+                            (file_hash, rel, size, fecha),
+                        )
+                        if not existed:
+                            # Si el objeto estaba anotado pero había desaparecido, vuelve a estar suelto
+                            conn.execute("UPDATE objetos SET ruta = ?, archivo = NULL WHERE hash = ?", (rel, file_hash))
+                        cur = conn.execute(
+                            "INSERT INTO copias (fecha, nombre, nombre_norm, origen, hash) VALUES (?, ?, ?, ?, ?)",
+                            (fecha, nombre, name_key(nombre), source, file_hash),
+                        )
+                        entry_id = cur.lastrowid
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            # El contenido ya está a salvo en objetos/; solo falta la fila del catálogo
+            logging.error("Error anotando %s en el catálogo de respaldo: %s", nombre, e)
+            raise OSError(f"catálogo de respaldo: {e}") from e
+        blob, member = self._location(rel, archivo)
+        return {"id": entry_id, "timestamp": fecha, "name": nombre, "source": source, "hash": file_hash,
+                "blob": blob, "member": member, "size": size, "duplicate": existed}
+
+    def find(self, name: str, prefix: bool = False, limit: int | None = None) -> list[dict]:
+        """
+        Copias cuyo nombre original coincide con name (sin acentos, mayúsculas ni extensión), más
+        recientes primero. Con prefix, los nombres que empiezan por name.
+        """
+        key = name_key(name)
+        if not key:
+            return []
+        if prefix:
+            where, params = "c.nombre_norm >= ? AND c.nombre_norm < ?", [key, key + "\U0010ffff"]
+        else:
+            where, params = "c.nombre_norm = ?", [key]
+        sql = f"SELECT {_COLUMNS} FROM copias c JOIN objetos o ON o.hash = c.hash WHERE {where} ORDER BY c.fecha DESC, c.id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._query(sql, params)
+
+    def find_hash(self, file_hash: str, limit: int | None = None) -> list[dict]:
+        """Copias con ese contenido (SHA-256), más recientes primero."""
+        sql = f"SELECT {_COLUMNS} FROM copias c JOIN objetos o ON o.hash = c.hash WHERE c.hash = ? ORDER BY c.fecha DESC, c.id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._query(sql, (file_hash,))
+
+    def get(self, entry_id: int) -> dict | None:
+        rows = self._query(f"SELECT {_COLUMNS} FROM copias c JOIN objetos o ON o.hash = c.hash WHERE c.id = ?", (entry_id,))
+        return rows[0] if rows else None
+
+    def restore(self, entry: dict, dest_dir: str) -> str:
+        """Copia la entrada a dest_dir con su nombre original (con _1, _2... si ya existe). Devuelve la ruta."""
+        os.makedirs(dest_dir, exist_ok=True)
+        stem, ext = os.path.splitext(entry["name"])
+        n = 0
+        while True:
+            target = os.path.join(dest_dir, f"{stem}_{n}{ext}" if n else entry["name"])
+            if not os.path.exists(target):
+                break
+            n += 1
+        if entry.get("member"):
+            # Solo se lee ese documento del ZIP (por su entrada en el directorio central)
+            with zipfile.ZipFile(entry["blob"]) as zf:
+                info = zf.getinfo(entry["member"])
+                with zf.open(info) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst, _CHUNK)
+            mtime = time.mktime(info.date_time + (0, 0, -1))
+            os.utime(target, (mtime, mtime))
+        else:
+            copy_file(entry["blob"], target)
+        return target
+
+    def stats(self) -> dict:
+        """copias, objetos, archivados (objetos en ZIP), bytes (de los objetos) y ahorrado (bytes que no se duplicaron)."""
+        try:
+            conn = self._connect()
+            try:
+                copias, total = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(o.tamano), 0) FROM copias c JOIN objetos o ON o.hash = c.hash"
+                ).fetchone()
+                objetos, ocupado, archivados = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(tamano), 0), COUNT(archivo) FROM objetos"
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error leyendo el catálogo de respaldo: %s", e)
+            return {"copias": 0, "objetos": 0, "archivados": 0, "bytes": 0, "ahorrado": 0}
+        return {"copias": copias, "objetos": objetos, "archivados": archivados, "bytes": ocupado, "ahorrado": total - ocupado}
+
+    def import_flat(self, cancel: threading.Event | None = None) -> int:
+        """
+        Pasa al almacén los archivos sueltos del respaldo plano anterior (nombre y fecha sacados del
+        nombre de archivo, o la fecha de modificación). Los que no se pueden mover se quedan donde
+        están. Devuelve cuántos se importaron.
+        """
+        try:
+            with os.scandir(self.backup_dir) as it:
+                files = sorted(e.path for e in it if e.is_file() and e.name != CATALOG_FILE_NAME
+                               and not e.name.startswith(CATALOG_FILE_NAME))
+        except OSError:
+            return 0
+        imported = 0
+        for path in files:
+            if cancel is not None and cancel.is_set():
+                break
+            name, when = parse_legacy_name(os.path.basename(path))
+            try:
+                when = when or datetime.datetime.fromtimestamp(os.path.getmtime(path))
+                self.store(path, move=True, when=when, name=name)
+                imported += 1
+            except OSError as e:
+                logging.warning("No se pudo importar %s al respaldo: %s", path, e)
+        if imported:
+            logging.info("Respaldo: %s archivos sueltos importados al almacén", imported)
+        return imported
+
+    def compact_due(self, hours: float = 24) -> bool:
+        """True si la última compactación fue hace más de hours horas (o nunca)."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT valor FROM meta WHERE clave = 'ultima_compactacion'").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error leyendo el catálogo de respaldo: %s", e)
+            return False
+        if row is None:
+            return True
+        try:
+            last = datetime.datetime.strptime(row[0], _TS_FORMAT)
+        except ValueError:
+            return True
+        return datetime.datetime.now() - last >= datetime.timedelta(hours=hours)
+
+    def compact(self, older_than_days: int = DEFAULT_COMPACT_DAYS, cancel: threading.Event | None = None, progress=None) -> dict:
+        """
+        Empaqueta en archivos/AAAA-MM.zip (por el mes en que se guardaron) los objetos sueltos cuya
+        copia más reciente tiene más de older_than_days días, y borra los sueltos. Cada documento se
+        copia al ZIP por bloques, sin cargar el mes en memoria. progress(hechos, total) se llama
+        desde este hilo. Devuelve archivados, meses y liberado (bytes de objetos sueltos borrados).
+        """
+        stats = {"archivados": 0, "meses": 0, "liberado": 0}
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=older_than_days)).strftime(_TS_FORMAT)
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT o.hash, o.ruta, o.tamano, substr(o.creado, 1, 7) FROM objetos o "
+                    "JOIN copias c ON c.hash = o.hash WHERE o.archivo IS NULL "
+                    "GROUP BY o.hash HAVING MAX(c.fecha) < ? ORDER BY o.creado",
+                    (cutoff,),
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error leyendo el catálogo de respaldo: %s", e)
+            return stats
+        by_month: dict[str, list[tuple]] = {}
+        for file_hash, rel, size, month in rows:
+            by_month.setdefault(month, []).append((file_hash, rel, size))
+        done = 0
+        for month, items in sorted(by_month.items()):
+            if cancel is not None and cancel.is_set():
+                break
+            try:
+                packed = self._pack_month(month, items, cancel)
+            except (OSError, zipfile.BadZipFile) as e:
+                logging.error("No se pudo empaquetar el respaldo de %s: %s", month, e)
+                continue
+            for file_hash, rel, size in packed:
+                try:
+                    os.remove(os.path.join(self.objects_dir, rel))
+                    stats["liberado"] += size
+                except OSError:
+                    pass
+            stats["archivados"] += len(packed)
+            stats["meses"] += 1 if packed else 0
+            done += len(items)
+            if progress:
+                progress(done, len(rows))
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES ('ultima_compactacion', ?)",
+                                     (datetime.datetime.now().strftime(_TS_FORMAT),))
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error guardando el catálogo de respaldo: %s", e)
+        if stats["archivados"]:
+            logging.info("Respaldo: %s objetos empaquetados en %s meses (%s bytes liberados)",
+                         stats["archivados"], stats["meses"], stats["liberado"])
+        return stats
+
+    def _pack_month(self, month: str, items: list[tuple], cancel: threading.Event | None) -> list[tuple]:
+        """
+        Añade items [(hash, ruta, tamaño)] a archivos/<month>.zip y los anota en el catálogo. Los
+        que ya están en el ZIP solo se anotan; si no queda ninguno por añadir, el ZIP no se toca.
+        Un ZIP nuevo se escribe aparte y se renombra al terminar. En uno existente se añade al final
+        (se escribe solo lo nuevo, no se copia el mes entero): antes se guarda su directorio central
+        en .<month>.zip.cola para dejarlo como estaba si algo falla o se corta a medias (ver
+        _restore_tail). Los documentos nuevos se releen antes de dar nada por bueno.
+        Devuelve los items empaquetados.
+        """
+        os.makedirs(self.archives_dir, exist_ok=True)
+        archivo = f"{month}.zip"
+        path = os.path.join(self.archives_dir, archivo)
+        tail = os.path.join(self.archives_dir, f".{archivo}.cola")
+        if os.path.exists(tail):
+            self._restore_tail(path, tail)
+        present, start_dir = set(), None
+        if os.path.exists(path):
+            with zipfile.ZipFile(path) as zf:
+                present = set(zf.namelist())
+                start_dir = zf.start_dir
+        packed, pending = [], []
+        for item in items:
+            (packed if item[1].replace(os.sep, "/") in present else pending).append(item)
+        if pending:
+            if start_dir is None:
+                packed += self._write_zip(path, pending, cancel)
+            else:
+                packed += self._append_zip(path, tail, start_dir, pending, cancel)
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("UPDATE objetos SET archivo = ? WHERE hash = ?", [(archivo, h) for h, _, _ in packed])
+            except sqlite3.Error as e:
+                # Los sueltos siguen ahí y el catálogo apunta a ellos: no se borran
+                raise OSError(f"catálogo de respaldo: {e}") from e
+            finally:
+                conn.close()
+        return packed
+
+    def _add_members(self, zf: zipfile.ZipFile, items: list[tuple], cancel: threading.Event | None) -> list[tuple]:
+        """Copia a zf por bloques los objetos sueltos de items. Devuelve los añadidos."""
+        added = []
+        for file_hash, rel, size in items:
+            if cancel is not None and cancel.is_set():
+                break
+            loose = os.path.join(self.objects_dir, rel)
+            try:
+                info = zipfile.ZipInfo.from_file(loose, rel.replace(os.sep, "/"))
+            except OSError as e:
+                logging.warning("Objeto de respaldo no encontrado %s: %s", loose, e)
+                continue
+            stored = os.path.splitext(rel)[1].lower() in _STORED_EXTENSIONS
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            with open(loose, "rb") as src, zf.open(info, "w") as dst:
+                shutil.copyfileobj(src, dst, _CHUNK)
+            added.append((file_hash, rel, size))
+        return added
+
+    @staticmethod
+    def _verify_members(path: str, items: list[tuple]):
+        """Relee los documentos de items en el ZIP (comprueba el CRC); lanza si alguno está mal."""
+        with zipfile.ZipFile(path) as zf:
+            for _, rel, _ in items:
+                with zf.open(rel.replace(os.sep, "/")) as f:
+                    while f.read(_CHUNK):
+                        pass
+
+    def _write_zip(self, path: str, items: list[tuple], cancel: threading.Event | None) -> list[tuple]:
+        tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+        try:
+            with zipfile.ZipFile(tmp, "w", allowZip64=True) as zf:
+                added = self._add_members(zf, items, cancel)
+            self._verify_members(tmp, added)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return added
+
+    def _append_zip(self, path: str, tail: str, start_dir: int, items: list[tuple], cancel: threading.Event | None) -> list[tuple]:
+        # Lo que se sobrescribe al añadir es solo el directorio central: se guarda antes
+        with open(path, "rb") as f:
+            f.seek(start_dir)
+            directory = f.read()
+        tmp = tail + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(start_dir.to_bytes(8, "little") + directory)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, tail)
+        try:
+            with zipfile.ZipFile(path, "a", allowZip64=True) as zf:
+                added = self._add_members(zf, items, cancel)
+            self._verify_members(path, added)
+        except BaseException:
+            self._restore_tail(path, tail)
+            raise
+        os.remove(tail)
+        return added
+
+    @staticmethod
+    def _restore_tail(path: str, tail: str):
+        """Deja path como antes de añadirle documentos, con el directorio central guardado en tail."""
+        with open(tail, "rb") as f:
+            data = f.read()
+        start_dir = int.from_bytes(data[:8], "little")
+        with open(path, "r+b") as f:
+            f.truncate(start_dir)
+            f.seek(start_dir)
+            f.write(data[8:])
+            f.flush()
+            os.fsync(f.fileno())
+        os.remove(tail)
+        logging.warning("Respaldo: %s restaurado tras una compactación a medias", path)
+
+    def _query(self, sql: str, params) -> list[dict]:
+        try:
+            conn = self._connect()
+            try:
+                return [self._entry(row) for row in conn.execute(sql, params)]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error leyendo el catálogo de respaldo: %s", e)
+            return []
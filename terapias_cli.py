@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+"""
+Línea de comandos del Organizador de Terapias, sin interfaz gráfica (no importa tkinter ni
+customtkinter), para importaciones masivas y tareas programadas en un servidor.
+
+    python terapias_cli.py organizar mapeo.csv [--origen DIR] [--fecha AAAA-MM-DD] [--simular]
+    python terapias_cli.py pdf [--desde FECHA] [--hasta FECHA] [--hilos N] [--forzar]
+    python terapias_cli.py reindexar [--contenido]
+    python terapias_cli.py buscar "juan perez" [--desde FECHA] [--hasta FECHA] [--contenido] [-n 50]
+    python terapias_cli.py historial [-n 50] [--paciente NOMBRE] [--desde FECHA] [--hasta FECHA]
+    python terapias_cli.py respaldo ["SS Juan Perez.docx"] [--prefijo] [--restaurar DIR] [--importar] [--compactar [--dias N]]
+
+El archivo de mapeo es un CSV (separado por comas, punto y coma o tabuladores) con una fila por
+documento: archivo, nombre. Las rutas relativas se buscan en --origen (por defecto, la carpeta
+source de la configuración). Usa el mismo organizar_config.ini, índices e historial que la app.
+Códigos de salida: 0 correcto, 1 algún documento o paso falló, 2 error de uso o configuración.
+"""
+import os
+import sys
+import csv
+import logging
+import argparse
+import datetime
+
+from terapias_config import (
+    MESES, INDEX_FILE_NAME, CONTENT_INDEX_FILE_NAME, HISTORY_FILE_NAME, JOURNAL_DIR_NAME,
+    config_path, load_config, get_rutas, get_pdf_config, get_backup_config, data_file,
+)
+from terapias_logic import parse_user_date
+from terapias_index import PatientIndex
+from terapias_content import ContentIndex
+from terapias_history import HistoryStore
+from terapias_journal import OperationJournal
+from terapias_organize import plan_batch, apply_batch, record_batch, replay_organize, DEFAULT_WORKERS, STATUS_OK, KIND_ORGANIZE
+from terapias_pdf import ConverterPool, backend_factory, detect_backend, BACKEND_AUTO, BACKENDS
+from terapias_backup import get_store
+from terapias_convert import ConversionQueue, find_pending_docs, replay_backup, default_workers, CONV_OK, CONV_SKIPPED, KIND_BACKUP
+
+_MAPPING_HEADERS = ("archivo", "file")
+
+
+class _Context:
+    """Rutas de la configuración y almacenes (índices, historial, diario) que usan los comandos."""
+
+    def __init__(self, config_file: str, config):
+        self.config_file = config_file
+        self.rutas = get_rutas(config)
+        self.pdf = get_pdf_config(config)
+        self.backup = get_backup_config(config)
+        self.base_dest = self.rutas["base_dest"]
+        self.patient_index = PatientIndex(data_file(config_file, INDEX_FILE_NAME), MESES)
+        self.content_index = ContentIndex(data_file(config_file, CONTENT_INDEX_FILE_NAME))
+        self.history_store = HistoryStore(data_file(config_file, HISTORY_FILE_NAME))
+        self.journal = OperationJournal(data_file(config_file, JOURNAL_DIR_NAME))
+
+    def replay_journal(self) -> list[dict]:
+        """Recupera las operaciones que la app u otra ejecución dejaron a medias."""
+        return self.journal.replay({
+            KIND_ORGANIZE: lambda op: replay_organize(op, self.patient_index, self.history_store, self.base_dest),
+            KIND_BACKUP: replay_backup,
+        })
+
+
+def read_mapping(path: str, source_dir: str) -> list[tuple[str, str]]:
+    """
+    Lee el CSV de mapeo y devuelve [(ruta_origen, nombre), ...]. Detecta el separador (, ; o tab),
+    omite filas vacías y una cabecera 'archivo'; las rutas relativas se resuelven en source_dir.
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        items = []
+        for i, row in enumerate(csv.reader(f, dialect)):
+            cells = [c.strip() for c in row]
+            if not cells or not cells[0]:
+                continue
+            if i == 0 and cells[0].lower() in _MAPPING_HEADERS:
+                continue
+            source = os.path.expanduser(cells[0])
+            if not os.path.isabs(source):
+                source = os.path.join(source_dir, source)
+            items.append((os.path.normpath(source), cells[1] if len(cells) > 1 else ""))
+    return items
+
+
+def _parse_date_arg(text: str) -> datetime.date:
+    date = parse_user_date(text)
+    if date is None:
+        raise argparse.ArgumentTypeError(f"fecha no válida: {text!r} (usa AAAA-MM-DD o DD/MM/AAAA)")
+    return date
+
+
+def _print_progress(label: str):
+    def progress(done, total):
+        if done == total or done % 100 == 0:
+            print(f"{label} {done}/{total}", file=sys.stderr)
+    return progress
+
+
+def cmd_organize(ctx: _Context, args) -> int:
+    source_dir = args.origen or ctx.rutas["source"]
+    try:
+        items = read_mapping(args.mapeo, source_dir)
+    except OSError as e:
+        print(f"No se pudo leer el mapeo: {e}", file=sys.stderr)
+        return 2
+    if not items:
+        print("El mapeo no tiene documentos.", file=sys.stderr)
+        return 0
+    plan = plan_batch(items, ctx.base_dest, args.fecha or datetime.date.today(), MESES)
+    for entry in plan:
+        if not entry["error"] and not os.path.isfile(entry["source"]):
+            entry["error"] = "No existe el archivo."
+    if args.simular:
+        for entry in plan:
+            if entry["error"]:
+                print(f"error\t{entry['source']}\t{entry['error']}")
+            else:
+                print(f"plan\t{entry['source']}\t{entry['target']}")
+        return 1 if any(e["error"] for e in plan) else 0
+    results = apply_batch(plan, ctx.rutas["backup"], max_workers=args.hilos, progress=_print_progress("Organizando"),
+                          journal=ctx.journal)
+    record_batch(results, ctx.patient_index, ctx.history_store, ctx.base_dest, ctx.journal)
+    for r in results:
+        if r["status"] == STATUS_OK:
+            print(f"{r['status']}\t{r['source']}\t{r['target']}")
+        else:
+            print(f"{r['status']}\t{r['source']}\t{r['error'] or ''}")
+    ok = sum(1 for r in results if r["status"] == STATUS_OK)
+    print(f"Organizados {ok} de {len(results)}.", file=sys.stderr)
+    return 0 if ok == len(results) else 1
+
+
+def cmd_pdf(ctx: _Context, args) -> int:
+    backend = args.conversor or ctx.pdf["backend"]
+    if backend == BACKEND_AUTO:
+        backend = detect_backend(ctx.pdf["soffice_path"]) or backend
+    try:
+        factory = backend_factory(backend, ctx.pdf["soffice_path"])
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    today = datetime.date.today()
+    docs = find_pending_docs(ctx.base_dest, MESES, args.desde or today, args.hasta or args.desde or today)
+    if not docs:
+        print("No hay documentos pendientes de PDF.", file=sys.stderr)
+        return 0
+    pool = ConverterPool(factory, size=args.hilos or default_workers(backend))
+    conv_queue = ConversionQueue(pool, ctx.rutas["backup"], force=args.forzar, history_store=ctx.history_store,
+                                 journal=ctx.journal)
+    for doc_path, patient in docs:
+        conv_queue.add(doc_path, patient=patient)
+
+    def on_update(entry):
+        print(f"{entry['status']}\t{entry['doc']}\t{entry['error'] or entry['pdf']}")
+
+    try:
+        stats = conv_queue.run(on_update=on_update)
+    finally:
+        pool.close(wait=True)
+    print(f"PDF creados {stats[CONV_OK]}, ya al día {stats[CONV_SKIPPED]}, de {stats['total']} "
+          f"en {stats['segundos']:.1f} s ({stats['por_minuto']} por minuto).", file=sys.stderr)
+    return 0 if stats[CONV_OK] + stats[CONV_SKIPPED] == stats["total"] else 1
+
+
+def cmd_reindex(ctx: _Context, args) -> int:
+    count = ctx.patient_index.rebuild(ctx.base_dest)
+    if count is None:
+        print(f"No se pudo reconstruir el índice de pacientes de {ctx.base_dest}", file=sys.stderr)
+        return 1
+    print(f"Índice de pacientes: {count} carpetas")
+    if args.contenido:
+        stats = ctx.content_index.update(ctx.base_dest, progress=_print_progress("Contenido"))
+        if stats is None:
+            print("No se pudo actualizar el índice de contenido.", file=sys.stderr)
+            return 1
+        print("Índice de contenido: " + ", ".join(f"{k} {v}" for k, v in stats.items()))
+    return 0
+
+
+def cmd_search(ctx: _Context, args) -> int:
+    if args.contenido:
+        for r in ctx.content_index.search(args.consulta, args.n):
+            print(f"{r['date']}\t{r['patient']}\t{r['file']}\t{r['snippet']}")
+        return 0
+    if not args.consulta and not (args.desde or args.hasta):
+        print("Indica una consulta o un periodo (--desde/--hasta).", file=sys.stderr)
+        return 2
+    if not ctx.patient_index.is_built_for(ctx.base_dest):
+        print("Construyendo índice de pacientes...", file=sys.stderr)
+        if ctx.patient_index.rebuild(ctx.base_dest) is None:
+            print(f"No se pudo recorrer {ctx.base_dest}", file=sys.stderr)
+            return 1
+    for r in ctx.patient_index.search(args.consulta, args.n, date_from=args.desde, date_to=args.hasta):
+        print(f"{r['date']}\t{r['patient']}\t{r['path']}")
+    return 0
+
+
+def cmd_history(ctx: _Context, args) -> int:
+    logfile = ctx.rutas["logfile"]
+    ctx.history_store.import_log([logfile + ".1", logfile])
+    if args.paciente or args.desde or args.hasta:
+        entries = ctx.history_store.get_many(ctx.history_store.find_ids(args.paciente, args.desde, args.hasta)[:args.n])
+    else:
+        entries = ctx.history_store.page(0, args.n)
+    for e in entries:
+        print(f"{e['timestamp']}\t{e['event']}\t{e['patient']}\t{e['file'] or e['path']}")
+    return 0
+
+
+def cmd_backup(ctx: _Context, args) -> int:
+    store = get_store(ctx.rutas["backup"])
+    if args.importar:
+        print(f"Importados {store.import_flat()} archivos sueltos al almacén de respaldo.", file=sys.stderr)
+    if args.compactar:
+        stats = store.compact(args.dias if args.dias is not None else ctx.backup["compact_days"],
+                              progress=_print_progress("Empaquetando"))
+        print(f"Empaquetados {stats['archivados']} documentos en {stats['meses']} meses "
+              f"({stats['liberado']} bytes sueltos liberados).", file=sys.stderr)
+    if not args.nombre:
+        stats = store.stats()
+        for key in ("copias", "objetos", "archivados", "bytes", "ahorrado"):
+            print(f"{key}\t{stats[key]}")
+        return 0
+    entries = store.find(args.nombre, prefix=args.prefijo, limit=args.n)
+    if not entries:
+        print(f"No hay copias de {args.nombre} en el respaldo.", file=sys.stderr)
+        return 1
+    if args.restaurar:
+        try:
+            print(store.restore(entries[0], args.restaurar))
+        except OSError as e:
+            print(f"No se pudo restaurar: {e}", file=sys.stderr)
+            return 1
+        return 0
+    for e in entries:
+        where = f"{e['blob']}!{e['member']}" if e["member"] else e["blob"]
+        print(f"{e['timestamp']}\t{e['name']}\t{e['size']}\t{where}\t{e['source']}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="terapias_cli", description="Organizador de Terapias sin interfaz gráfica.")
+    parser.add_argument("--config", help="organizar_config.ini a usar (por defecto el de la aplicación)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="mostrar el registro detallado en stderr")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("organizar", aliases=["organize"], help="organizar documentos según un CSV archivo,nombre")
+    p.add_argument("mapeo", help="CSV con una fila por documento: archivo, nombre")
+    p.add_argument("--origen", help="carpeta de las rutas relativas del mapeo (por defecto source)")
+    p.add_argument("--fecha", type=_parse_date_arg, help="día de destino (por defecto hoy)")
+    p.add_argument("--hilos", type=int, default=DEFAULT_WORKERS, help="movimientos simultáneos")
+    p.add_argument("--simular", action="store_true", help="mostrar el plan sin mover nada")
+    p.set_defaults(func=cmd_organize)
+
+    p = sub.add_parser("pdf", help="convertir a PDF los documentos pendientes de un periodo y moverlos a respaldo")
+    p.add_argument("--desde", type=_parse_date_arg, help="primer día (por defecto hoy)")
+    p.add_argument("--hasta", type=_parse_date_arg, help="último día (por defecto --desde)")
+    p.add_argument("--hilos", type=int, help="conversiones simultáneas (por defecto según los núcleos)")
+    p.add_argument("--conversor", choices=[BACKEND_AUTO, *BACKENDS], help="conversor a usar (por defecto el de [PDF])")
+    p.add_argument("--forzar", action="store_true", help="convertir aunque el PDF ya esté al día")
+    p.set_defaults(func=cmd_pdf)
+
+    p = sub.add_parser("reindexar", aliases=["reindex"], help="reconstruir el índice de pacientes")
+    p.add_argument("--contenido", action="store_true", help="actualizar también el índice de contenido")
+    p.set_defaults(func=cmd_reindex)
+
+    p = sub.add_parser("buscar", aliases=["search"], help="buscar pacientes (o texto con --contenido)")
+    p.add_argument("consulta", nargs="?", default="")
+    p.add_argument("--desde", type=_parse_date_arg)
+    p.add_argument("--hasta", type=_parse_date_arg)
+    p.add_argument("--contenido", action="store_true", help="buscar en el texto de los documentos")
+    p.add_argument("-n", type=int, default=100, help="máximo de resultados")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("historial", aliases=["history"], help="mostrar los archivos procesados más recientes")
+    p.add_argument("--paciente")
+    p.add_argument("--desde", type=_parse_date_arg)
+    p.add_argument("--hasta", type=_parse_date_arg)
+    p.add_argument("-n", type=int, default=50, help="máximo de entradas")
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("respaldo", aliases=["backup"], help="buscar o restaurar documentos del respaldo por su nombre")
+    p.add_argument("nombre", nargs="?", default="", help="nombre original (sin nombre: estadísticas del almacén)")
+    p.add_argument("--prefijo", action="store_true", help="nombres que empiezan por NOMBRE")
+    p.add_argument("--restaurar", metavar="CARPETA", help="copiar la copia más reciente a CARPETA")
+    p.add_argument("--importar", action="store_true", help="pasar al almacén los archivos sueltos del respaldo antiguo")
+    p.add_argument("--compactar", action="store_true", help="empaquetar por meses los respaldos antiguos")
+    p.add_argument("--dias", type=int, help="antigüedad para --compactar (por defecto [RESPALDO] compactar_dias)")
+    p.add_argument("-n", type=int, default=50, help="máximo de copias")
+    p.set_defaults(func=cmd_backup)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        stream=sys.stderr,
+    )
+    config_file = args.config or config_path()
+    if args.config and not os.path.isfile(config_file):
+        print(f"No existe el archivo de configuración: {config_file}", file=sys.stderr)
+        return 2
+    config = load_config(config_file)
+    if "RUTAS" not in config:
+        print(f"Error: En {config_file} falta la sección [RUTAS].", file=sys.stderr)
+        return 2
+    ctx = _Context(config_file, config)
+    recovered = ctx.replay_journal()
+    if recovered:
+        print(f"Recuperadas {len(recovered)} operaciones interrumpidas.", file=sys.stderr)
+    try:
+        return args.func(ctx, args)
+    finally:
+        ctx.journal.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
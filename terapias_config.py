@@ -0,0 +1,112 @@
+"""
+Configuración compartida por la aplicación (terapias.py) y la línea de comandos (terapias_cli.py):
+ruta del .ini, valores por defecto, nombres de meses y archivos de datos (índices, historial).
+Sin dependencias de GUI; importar este módulo no crea carpetas ni configura logging.
+"""
+import os
+import sys
+import configparser
+
+from terapias_backup import DEFAULT_COMPACT_DAYS
+from terapias_inbox import parse_extensions
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE"
+}
+
+USER_HOME = os.path.expanduser("~")
+if getattr(sys, "frozen", False):
+    BASE_DIR = os.path.dirname(sys.executable)
+else:
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Instalador: config en AppData. Ejecución desde script/exe en carpeta: config junto al exe/script.
+APP_DATA = os.path.join(os.environ.get("APPDATA", USER_HOME), "OrganizadorTerapias")
+
+DEFAULT_RUTAS = {
+    "source": os.path.join(USER_HOME, "Documents", "TERAPIAS", "DOCUMENTOS PARA ARMAR"),
+    "base_dest": os.path.join(USER_HOME, "Documents", "TERAPIAS", "TERAPIAS"),
+    "backup": os.path.join(USER_HOME, "Documents", "TERAPIAS", "Respaldo"),
+    "logfile": os.path.join(USER_HOME, "Documents", "TERAPIAS", "organizar_log.txt"),
+    "word_path": "winword.exe",
+}
+
+# Archivos de datos, junto al archivo de configuración
+INDEX_FILE_NAME = "pacientes_index.sqlite"
+CONTENT_INDEX_FILE_NAME = "contenido_index.sqlite"
+HISTORY_FILE_NAME = "historial.sqlite"
+JOURNAL_DIR_NAME = "operaciones"
+
+
+def config_path() -> str:
+    """Ruta de organizar_config.ini (en AppData si es el .exe instalado)."""
+    if getattr(sys, "frozen", False):
+        os.makedirs(APP_DATA, exist_ok=True)
+        return os.path.join(APP_DATA, "organizar_config.ini")
+    return os.path.join(BASE_DIR, "organizar_config.ini")
+
+
+def load_config(config_file: str) -> configparser.ConfigParser:
+    """Lee config_file; si no existe lo crea con las rutas por defecto."""
+    config = configparser.ConfigParser()
+    if not os.path.exists(config_file):
+        config["RUTAS"] = DEFAULT_RUTAS
+        config["UI"] = {"appearance": "Dark"}
+        try:
+            os.makedirs(os.path.dirname(config_file), exist_ok=True)
+            with open(config_file, "w", encoding="utf-8") as f:
+                config.write(f)
+        except OSError:
+            pass
+    config.read(config_file, encoding="utf-8")
+    if "UI" not in config:
+        config["UI"] = {"appearance": "Dark"}
+    return config
+
+
+def get_rutas(config: configparser.ConfigParser) -> dict:
+    """source, base_dest, backup, logfile y word_path de la sección [RUTAS] (con valores por defecto)."""
+    section = config["RUTAS"] if "RUTAS" in config else {}
+    rutas = {key: section.get(key, default) for key, default in DEFAULT_RUTAS.items()}
+    rutas["word_path"] = (rutas["word_path"] or "").strip() or "winword.exe"
+    return rutas
+
+
+def data_file(config_file: str, name: str) -> str:
+    """Ruta de un archivo de datos (índice, historial) junto a config_file."""
+    return os.path.join(os.path.dirname(config_file), name)
+
+
+def get_pdf_config(config: configparser.ConfigParser) -> dict:
+    """Conversión a PDF (sección [PDF], opcional): backend (auto, word, libreoffice, fake) y soffice_path."""
+    section = config["PDF"] if "PDF" in config else {}
+    return {
+        "backend": (section.get("backend", "auto") or "auto").strip().lower(),
+        "soffice_path": (section.get("soffice_path", "") or "").strip() or None,
+    }
+
+
+def get_backup_config(config: configparser.ConfigParser) -> dict:
+    """Respaldo (sección [RESPALDO], opcional): compact_days, días tras los que se empaqueta por mes (0 = nunca)."""
+    section = config["RESPALDO"] if "RESPALDO" in config else {}
+    try:
+        days = int((section.get("compactar_dias", "") or "").strip() or DEFAULT_COMPACT_DAYS)
+    except ValueError:
+        days = DEFAULT_COMPACT_DAYS
+    return {"compact_days": max(0, days)}
+
+
+def get_inbox_config(config: configparser.ConfigParser) -> dict:
+    """
+    Carpeta de origen (sección [ORIGEN], opcional): extensions, las extensiones que se buscan
+    (.doc y .docx por defecto; también .odt, .rtf y .pdf), recursive, si se miran las subcarpetas,
+    y watch, si la app vigila la carpeta y muestra los documentos nuevos al llegar.
+    """
+    section = config["ORIGEN"] if "ORIGEN" in config else {}
+
+    def yes(key: str) -> bool:
+        return (section.get(key, "") or "").strip().lower() in ("1", "si", "sí", "true", "yes")
+
+    extensions = parse_extensions(section.get("extensiones", "") or "")
+    return {"extensions": extensions, "recursive": yes("subcarpetas"), "watch": yes("vigilar")}
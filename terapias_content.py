@@ -0,0 +1,253 @@
+"""
+Índice de texto completo de los documentos organizados (.docx y .pdf) con SQLite FTS5.
+La extracción de texto se hace en un grupo de procesos y la actualización es incremental
+(solo se vuelven a leer los archivos cuyo mtime o tamaño cambió). Sin dependencias de GUI.
+Para PDF se usa pypdf si está instalado; si no, los PDF se registran sin texto.
+"""
+import os
+import logging
+import sqlite3
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from terapias_walk import iter_patient_folders, DEFAULT_WORKERS
+
+CONTENT_EXTENSIONS = (".docx", ".pdf")
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_PARTS = ("word/document.xml", "word/header1.xml", "word/footer1.xml")
+# Archivos por tarea enviada al grupo de procesos y filas por transacción
+_EXTRACT_CHUNK = 16
+_WRITE_BATCH = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY,
+    ruta TEXT NOT NULL UNIQUE,
+    carpeta TEXT NOT NULL,
+    paciente TEXT NOT NULL,
+    fecha_carpeta TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    tamano INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS contenido USING fts5(
+    texto, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def extract_docx_text(path: str) -> str:
+    """Texto de un .docx (cuerpo, encabezado y pie) leyendo el XML del paquete."""
+    paragraphs = []
+    with zipfile.ZipFile(path) as zf:
+        names = set(zf.namelist())
+        for part in _DOCX_PARTS:
+            if part not in names:
+                continue
+            with zf.open(part) as f:
+                current = []
+                for _, elem in ET.iterparse(f, events=("end",)):
+                    if elem.tag == _W_NS + "t" and elem.text:
+                        current.append(elem.text)
+                    elif elem.tag == _W_NS + "tab":
+                        current.append("\t")
+                    elif elem.tag == _W_NS + "p":
+                        if current:
+                            paragraphs.append("".join(current))
+                        current = []
+                        elem.clear()
+    return "\n".join(paragraphs)
+
+
+def extract_pdf_text(path: str) -> str:
+    """Texto de un PDF con pypdf (opcional). Cadena vacía si pypdf no está instalado."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return ""
+    reader = PdfReader(path)
+    return "\n".join((page.extract_text() or "") for page in reader.pages)
+
+
+def extract_text(path: str) -> str:
+    """Texto de un documento según su extensión. Lanza excepción si el archivo no se puede leer."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".docx":
+        return extract_docx_text(path)
+    if ext == ".pdf":
+        return extract_pdf_text(path)
+    return ""
+
+
+def _extract_many(paths: list[str]) -> list[tuple[str, str | None]]:
+    """Se ejecuta en un proceso hijo: [(ruta, texto o None si falló)]."""
+    out = []
+    for path in paths:
+        try:
+            out.append((path, extract_text(path)))
+        except Exception:
+            out.append((path, None))
+    return out
+
+
+def _scan_documents(folder: tuple[str, str, str]) -> list[tuple[str, str, str, str, float, int]]:
+    """Documentos de una carpeta de paciente: [(ruta, carpeta, paciente, fecha, mtime, tamaño)]."""
+    patient, patient_path, fecha_carpeta = folder
+    out = []
+    try:
+        with os.scandir(patient_path) as it:
+            for e in it:
+                if e.name.lower().endswith(CONTENT_EXTENSIONS) and e.is_file():
+                    st = e.stat()
+                    out.append((os.path.normpath(e.path), patient_path, patient, fecha_carpeta, st.st_mtime, st.st_size))
+    except OSError as err:
+        logging.warning("No se pudo leer %s: %s", patient_path, err)
+    return out
+
+
+def fts_query(text: str) -> str:
+    """Convierte lo que escribe el usuario en una consulta FTS5 segura (todas las palabras, por prefijo)."""
+    words = [w.replace('"', "") for w in text.split()]
+    return " ".join(f'"{w}"*' for w in words if w)
+
+
+class ContentIndex:
+    """Índice de texto completo en SQLite (una conexión por operación, una actualización a la vez)."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._update_lock = threading.Lock()
+        self._initialized = False
+        self.available = True
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._initialized = True
+        return conn
+
+    @property
+    def updating(self) -> bool:
+        return self._update_lock.locked()
+
+    def update(self, base_dest: str, cancel: threading.Event | None = None, progress=None, max_workers: int | None = None) -> dict | None:
+        """
+        Sincroniza el índice con los .docx/.pdf bajo base_dest. Solo extrae los archivos nuevos o
+        modificados (mtime/tamaño) y elimina los que ya no existen. progress(hechos, total) se llama
+        desde este hilo. Devuelve {'indexados', 'eliminados', 'sin_cambios', 'errores'} o None si
+        ya hay otra actualización en curso o el índice no está disponible.
+        """
+        if not self.available or not os.path.isdir(base_dest):
+            return None
+        if not self._update_lock.acquire(blocking=False):
+            return None
+        try:
+            return self._update(base_dest, cancel, progress, max_workers)
+        except sqlite3.OperationalError as e:
+            # p. ej. SQLite sin FTS5: se desactiva la búsqueda en contenido
+            logging.error("Índice de contenido no disponible: %s", e)
+            self.available = False
+            return None
+        finally:
+            self._update_lock.release()
+
+    def _update(self, base_dest, cancel, progress, max_workers):
+        stats = {"indexados": 0, "eliminados": 0, "sin_cambios": 0, "errores": 0}
+        folders = [(p, path, f"{y}/{m}/{d}") for p, path, y, m, d in iter_patient_folders(base_dest, cancel=cancel)]
+        with ThreadPoolExecutor(max_workers=DEFAULT_WORKERS, thread_name_prefix="content-scan") as pool:
+            found = {doc[0]: doc for docs in pool.map(_scan_documents, folders) for doc in docs}
+        if cancel is not None and cancel.is_set():
+            return stats
+
+        conn = self._connect()
+        try:
+            known = {ruta: (mtime, tamano, doc_id) for doc_id, ruta, mtime, tamano in
+                     conn.execute("SELECT id, ruta, mtime, tamano FROM documentos")}
+            removed = [known[r][2] for r in known.keys() - found.keys()]
+            with conn:
+                for doc_id in removed:
+                    conn.execute("DELETE FROM contenido WHERE rowid = ?", (doc_id,))
+                    conn.execute("DELETE FROM documentos WHERE id = ?", (doc_id,))
+            stats["eliminados"] = len(removed)
+            pending = []
+            for ruta, doc in found.items():
+                old = known.get(ruta)
+                if old and old[0] == doc[4] and old[1] == doc[5]:
+                    stats["sin_cambios"] += 1
+                else:
+                    pending.append(ruta)
+            if not pending:
+                return stats
+
+            total = len(pending)
+            chunks = [pending[i:i + _EXTRACT_CHUNK] for i in range(0, total, _EXTRACT_CHUNK)]
+            batch = []
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                for results in pool.map(_extract_many, chunks):
+                    if cancel is not None and cancel.is_set():
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        break
+                    batch.extend(results)
+                    if len(batch) >= _WRITE_BATCH:
+                        self._write_batch(conn, batch, found, stats)
+                        batch = []
+                    if progress:
+                        progress(stats["indexados"] + stats["errores"] + len(batch), total)
+            self._write_batch(conn, batch, found, stats)
+        finally:
+            conn.close()
+        logging.info("Índice de contenido actualizado: %s", stats)
+        return stats
+
+    @staticmethod
+    def _write_batch(conn: sqlite3.Connection, batch: list, found: dict, stats: dict):
+        with conn:
+            for ruta, text in batch:
+                if text is None:
+                    # Se registra sin texto para no volver a intentarlo hasta que el archivo cambie
+                    stats["errores"] += 1
+                    logging.warning("No se pudo extraer texto de %s", ruta)
+                _, carpeta, paciente, fecha_carpeta, mtime, tamano = found[ruta]
+                row = conn.execute("SELECT id FROM documentos WHERE ruta = ?", (ruta,)).fetchone()
+                if row:
+                    doc_id = row[0]
+                    conn.execute("UPDATE documentos SET mtime = ?, tamano = ? WHERE id = ?", (mtime, tamano, doc_id))
+                    conn.execute("DELETE FROM contenido WHERE rowid = ?", (doc_id,))
+                else:
+                    doc_id = conn.execute(
+                        "INSERT INTO documentos (ruta, carpeta, paciente, fecha_carpeta, mtime, tamano) VALUES (?, ?, ?, ?, ?, ?)",
+                        (ruta, carpeta, paciente, fecha_carpeta, mtime, tamano),
+                    ).lastrowid
+                conn.execute("INSERT INTO contenido (rowid, texto) VALUES (?, ?)", (doc_id, text or ""))
+                if text is not None:
+                    stats["indexados"] += 1
+
+    def search(self, query: str, max_results: int = 100) -> list[dict]:
+        """Documentos cuyo texto contiene todas las palabras (sin distinguir acentos), los más relevantes primero."""
+        match = fts_query(query)
+        if not match or not self.available:
+            return []
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT d.paciente, d.carpeta, d.ruta, d.fecha_carpeta, "
+                    "snippet(contenido, 0, '«', '»', '…', 12) "
+                    "FROM contenido JOIN documentos d ON d.id = contenido.rowid "
+                    "WHERE contenido MATCH ? ORDER BY rank LIMIT ?",
+                    (match, max_results),
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error buscando en el contenido: %s", e)
+            return []
+        return [
+            {"patient": p, "path": carpeta, "file": ruta, "date": fecha, "snippet": " ".join(snip.split())}
+            for p, carpeta, ruta, fecha, snip in rows
+        ]
@@ -0,0 +1,186 @@
+"""
+Conversión a PDF por lotes: una cola con el estado de cada documento que convierte varios a la vez
+con un ConverterPool (terapias_pdf), omite los que ya tienen un PDF más reciente que el documento
+y, como «Finalizar (PDF)», mueve cada documento a la carpeta de respaldo cuando su PDF está listo.
+Sin dependencias de GUI.
+"""
+import os
+import time
+import datetime
+import logging
+import threading
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from terapias_walk import iter_patient_folders
+from terapias_history import EVENT_PDF
+from terapias_backup import get_store
+
+CONV_PENDING = "pendiente"
+CONV_RUNNING = "en_curso"
+CONV_OK = "ok"
+CONV_SKIPPED = "omitido"
+CONV_ERROR = "error"
+CONV_CANCELLED = "cancelado"
+
+# Cada conversor de Word es un proceso WINWORD.EXE completo: menos simultáneos que con LibreOffice
+MAX_WORKERS_WORD = 4
+MAX_WORKERS = 8
+DOC_EXTENSIONS = (".doc", ".docx")
+# Tipo de operación en el diario (terapias_journal)
+KIND_BACKUP = "respaldo"
+
+
+def default_workers(backend: str | None = None) -> int:
+    """Conversores simultáneos según los núcleos del equipo (con Word, como mucho MAX_WORKERS_WORD)."""
+    cores = os.cpu_count() or 1
+    return max(1, min(cores, MAX_WORKERS_WORD if backend == "word" else MAX_WORKERS))
+
+
+def pdf_path_for(doc_path: str) -> str:
+    return os.path.splitext(doc_path)[0] + ".pdf"
+
+
+def pdf_is_current(doc_path: str, pdf_path: str) -> bool:
+    """True si pdf_path existe y es tan reciente como doc_path (no hace falta convertir)."""
+    try:
+        return os.path.getmtime(pdf_path) >= os.path.getmtime(doc_path)
+    except OSError:
+        return False
+
+
+def backup_converted(doc_path: str, backup_dir: str, journal=None) -> str:
+    """
+    Mueve doc_path al almacén de respaldo de backup_dir (terapias_backup) y devuelve la ruta del
+    contenido guardado. Si el documento sigue abierto en Word lanza OSError y no se toca nada.
+    Con journal (OperationJournal) el movimiento se anota antes de hacerlo.
+    """
+    op = journal.begin(KIND_BACKUP, [{"de": os.path.abspath(doc_path), "a": None}], {"respaldo": backup_dir}) if journal else None
+    try:
+        return get_store(backup_dir).store(doc_path)["blob"]
+    finally:
+        # También si falló: el documento sigue en su sitio y no hay nada que recuperar
+        if op:
+            journal.finish(op)
+
+
+def replay_backup(op: dict) -> int:
+    """
+    Recupera una operación de respaldo interrumpida: si el documento ya no está en su carpeta pero
+    quedó en el temporal del almacén, termina de guardarlo. Devuelve cuántos se completaron.
+    """
+    store = get_store(op["meta"]["respaldo"])
+    return sum(1 for step in op["steps"] if store.resume(step["de"]) is not None)
+
+
+def find_pending_docs(
+    base_dest: str,
+    meses: dict,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    cancel: threading.Event | None = None,
+) -> list[tuple[str, str]]:
+    """
+    (documento, paciente) de cada .doc/.docx que sigue en una carpeta de paciente del periodo,
+    es decir, que aún no se finalizó. Ordenados por ruta.
+    """
+    docs = []
+    for patient, path, *_ in iter_patient_folders(base_dest, cancel=cancel, date_from=date_from, date_to=date_to, meses=meses):
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    # ~$nombre.docx: archivo de bloqueo de Word mientras el documento está abierto
+                    if e.name.lower().endswith(DOC_EXTENSIONS) and not e.name.startswith("~$") and e.is_file():
+                        docs.append((e.path, patient))
+        except OSError:
+            continue
+    docs.sort()
+    return docs
+
+
+class ConversionQueue:
+    """
+    Lote de conversiones con estado por documento. Cada entrada es un dict con doc, pdf, patient,
+    status (pendiente, en_curso, ok, omitido, error o cancelado), error y backup (ruta en respaldo).
+    Con force se convierten también los documentos cuyo PDF ya está al día.
+    """
+
+    def __init__(self, pool, backup_dir: str, force: bool = False, history_store=None, journal=None):
+        self.pool = pool
+        self.backup_dir = backup_dir
+        self.force = force
+        self.history_store = history_store
+        self.journal = journal
+        self.entries: list[dict] = []
+        self._started = None
+        self._finished = None
+
+    def add(self, doc_path: str, pdf_path: str | None = None, patient: str = "") -> dict:
+        entry = {"doc": doc_path, "pdf": pdf_path or pdf_path_for(doc_path), "patient": patient,
+                 "status": CONV_PENDING, "error": None, "backup": None}
+        self.entries.append(entry)
+        return entry
+
+    def _finish(self, entry: dict, status: str):
+        """PDF listo: historial y documento a respaldo (igual que Finalizar)."""
+        if self.history_store is not None:
+            self.history_store.record(EVENT_PDF, entry["patient"], os.path.dirname(entry["pdf"]), entry["pdf"])
+        try:
+            entry["backup"] = backup_converted(entry["doc"], self.backup_dir, self.journal)
+            entry["status"] = status
+        except OSError as e:
+            logging.error("Error al mover a respaldo %s: %s", entry["doc"], e)
+            entry.update(status=CONV_ERROR, error=f"Error al mover a respaldo: {e}")
+
+    def run(self, cancel: threading.Event | None = None, on_update=None) -> dict:
+        """
+        Convierte las entradas pendientes, tantas a la vez como conversores tenga el pool.
+        on_update(entrada) se llama desde este hilo cada vez que una termina. Con cancel activado
+        las que aún no empezaron quedan canceladas. Devuelve stats().
+        """
+        self._started, self._finished = time.monotonic(), None
+        running = {}
+        for entry in self.entries:
+            if entry["status"] != CONV_PENDING:
+                continue
+            if cancel is not None and cancel.is_set():
+                entry["status"] = CONV_CANCELLED
+            elif not os.path.isfile(entry["doc"]):
+                entry.update(status=CONV_ERROR, error="Archivo original no encontrado.")
+            elif not self.force and pdf_is_current(entry["doc"], entry["pdf"]):
+                self._finish(entry, CONV_SKIPPED)
+            else:
+                entry["status"] = CONV_RUNNING
+                running[self.pool.submit(entry["doc"], entry["pdf"])] = entry
+                continue
+            if on_update:
+                on_update(entry)
+        while running:
+            done, _ = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+            if cancel is not None and cancel.is_set():
+                for future in running:
+                    future.cancel()
+            for future in done:
+                entry = running.pop(future)
+                if future.cancelled():
+                    entry["status"] = CONV_CANCELLED
+                elif future.result() and os.path.exists(entry["pdf"]):
+                    self._finish(entry, CONV_OK)
+                else:
+                    entry.update(status=CONV_ERROR, error="No se pudo crear el PDF.")
+                if on_update:
+                    on_update(entry)
+        self._finished = time.monotonic()
+        return self.stats()
+
+    def stats(self) -> dict:
+        """Cuántas entradas hay en cada estado, segundos transcurridos y PDF creados por minuto."""
+        elapsed = 0.0
+        if self._started is not None:
+            elapsed = (self._finished or time.monotonic()) - self._started
+        counts = {status: 0 for status in (CONV_PENDING, CONV_RUNNING, CONV_OK, CONV_SKIPPED, CONV_ERROR, CONV_CANCELLED)}
+        for entry in self.entries:
+            counts[entry["status"]] += 1
+        counts["total"] = len(self.entries)
+        counts["segundos"] = round(elapsed, 2)
+        counts["por_minuto"] = round(counts[CONV_OK] * 60 / elapsed, 1) if elapsed > 0 else 0.0
+        return counts
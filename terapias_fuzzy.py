@@ -0,0 +1,212 @@
+"""
+Búsqueda aproximada de nombres de paciente.
+Normaliza (sin acentos ni mayúsculas), compara palabra a palabra sin importar el orden
+y tolera errores pequeños mediante trigramas. Sin dependencias de GUI.
+"""
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+# Puntuación mínima por palabra de la consulta para considerarla encontrada
+_MIN_TOKEN_SCORE = 0.45
+# Parecido mínimo por trigramas (coeficiente de Dice) para aceptar una palabra con errores
+_MIN_DICE = 0.5
+
+
+def normalize_name(text: str) -> str:
+    """'  PÉREZ,  José ' -> 'perez jose' (sin acentos, minúsculas, solo letras/números)."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    chars = []
+    for ch in decomposed:
+        if unicodedata.combining(ch):
+            continue
+        chars.append(ch if ch.isalnum() else " ")
+    return " ".join("".join(chars).casefold().split())
+
+
+@lru_cache(maxsize=65536)
+def trigrams(token: str) -> frozenset[str]:
+    """Trigramas con relleno: 'ana' -> {'  a', ' an', 'ana', 'na '}."""
+    padded = f"  {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _edit_distance_le1(a: str, b: str) -> bool:
+    """True si a y b difieren en a lo sumo una inserción, borrado, sustitución o transposición."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    i = 0
+    while i < min(la, lb) and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        if a[i + 1:] == b[i + 1:]:
+            return True
+        return i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+    if la > lb:
+        return a[i + 1:] == b[i:]
+    return a[i:] == b[i + 1:]
+
+
+def token_score(q: str, t: str) -> float:
+    """Parecido entre una palabra de la consulta y una del nombre (0 a 1)."""
+    if q == t:
+        return 1.0
+    if t.startswith(q):
+        return 0.9
+    if q in t:
+        return 0.8
+    if len(q) >= 4 and _edit_distance_le1(q, t):
+        return 0.75
+    if len(q) < 3:
+        return 0.0
+    q_grams = trigrams(q)
+    t_grams = trigrams(t)
+    dice = 2.0 * len(q_grams & t_grams) / (len(q_grams) + len(t_grams))
+    return 0.5 + 0.2 * dice if dice >= _MIN_DICE else 0.0
+
+
+def name_score(query_tokens: list[str], name_tokens: list[str]) -> float:
+    """
+    Puntuación de un nombre para la consulta: media de la mejor coincidencia de cada palabra.
+    0 si alguna palabra de la consulta no aparece (ni aproximadamente) en el nombre.
+    """
+    if not query_tokens or not name_tokens:
+        return 0.0
+    total = 0.0
+    for q in query_tokens:
+        best = max(token_score(q, t) for t in name_tokens)
+        if best < _MIN_TOKEN_SCORE:
+            return 0.0
+        total += best
+    return total / len(query_tokens)
+
+
+class FuzzyMatcher:
+    """
+    Índice en memoria de nombres normalizados con listas invertidas de trigramas.
+    Cada entrada guarda (tokens, orden, payload); orden sirve para desempatar (p. ej. fecha ISO).
+    """
+
+    def __init__(self):
+        self._tokens: list[list[str]] = []
+        self._joined: list[str] = []
+        self._order: list[str] = []
+        self._payloads: list = []
+        self._postings: dict[str, list[int]] = {}
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def add(self, normalized: str, payload, order: str = "") -> int:
+        """Añade un nombre ya normalizado (ver normalize_name). Devuelve su id interno."""
+        entry_id = len(self._payloads)
+        tokens = normalized.split()
+        self._tokens.append(tokens)
+        self._joined.append(normalized)
+        self._order.append(order or "")
+        self._payloads.append(payload)
+        grams = set()
+        for t in tokens:
+            grams.update(trigrams(t))
+        for g in grams:
+            self._postings.setdefault(g, []).append(entry_id)
+        return entry_id
+
+    def _candidates(self, query_tokens: list[str]) -> list[int]:
+        """
+        Entradas que comparten suficientes trigramas con cada palabra de 3+ letras de la consulta.
+        Si todas las palabras son cortas se filtra por subcadena sobre todos los nombres.
+        """
+        long_tokens = [q for q in query_tokens if len(q) >= 3]
+        if not long_tokens:
+            return [i for i, joined in enumerate(self._joined) if all(q in joined for q in query_tokens)]
+        candidates = None
+        for q in long_tokens:
+            grams = trigrams(q)
+            counts = Counter()
+            for g in grams:
+                counts.update(self._postings.get(g, ()))
+            needed = max(1, int(len(grams) * 0.35))
+            ids = {i for i, n in counts.items() if n >= needed}
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        return list(candidates)
+
+    def match(self, query: str, within: list[int] | None = None, order_range: tuple[str, str] | None = None) -> list[tuple[float, str, int]]:
+        """
+        Todas las coincidencias de query como [(puntuación, orden, id)] sin ordenar.
+        Con within solo se puntúan esos ids (refinar un resultado anterior); con
+        order_range=(desde, hasta) solo las entradas cuyo orden cae en ese rango inclusivo.
+        """
+        query_tokens = normalize_name(query).split()
+        if not query_tokens:
+            return []
+        ids = self._candidates(query_tokens) if within is None else within
+        scored = []
+        for entry_id in ids:
+            if order_range is not None and not order_range[0] <= self._order[entry_id] <= order_range[1]:
+                continue
+            score = name_score(query_tokens, self._tokens[entry_id])
+            if score > 0:
+                scored.append((round(score, 2), self._order[entry_id], entry_id))
+        return scored
+
+    def top(self, matches: list[tuple[float, str, int]], max_results: int = 100) -> list:
+        """Payloads de las mejores coincidencias: por puntuación y después por orden descendente."""
+        best = sorted(matches, key=lambda x: (x[0], x[1]), reverse=True)[:max_results]
+        return [self._payloads[entry_id] for _, _, entry_id in best]
+
+    def search(self, query: str, max_results: int = 100, order_range: tuple[str, str] | None = None) -> list:
+        """Payloads que encajan con query, ordenados por puntuación y después por orden descendente."""
+        return self.top(self.match(query, order_range=order_range), max_results)
+
+
+def narrows(previous: str, query: str) -> bool:
+    """
+    True si toda coincidencia de query (normalizadas) lo es también de previous, así que basta con
+    volver a puntuar las de previous. Pasa si query añade palabras enteras (las anteriores puntúan
+    igual) o si alarga la última palabra sin llegar a 3 letras (solo encaja como subcadena, y
+    entonces también la palabra más corta). Con 3 o más letras una palabra más larga puede encajar
+    por trigramas o por una letra de diferencia donde la corta no encajaba («per» no encuentra
+    «pre», «pere» sí).
+    """
+    if not previous or not query.startswith(previous):
+        return False
+    if query[len(previous):].startswith(" "):
+        return True
+    return len(query.split()[-1]) < 3
+
+
+class IncrementalSearch:
+    """
+    Búsqueda mientras se escribe: si la consulta nueva amplía la anterior de forma que no puede
+    encontrar nombres nuevos (ver narrows), solo se vuelven a puntuar las coincidencias anteriores
+    en lugar de todo el índice. Guarda el conjunto completo de coincidencias (no solo las
+    mostradas) para que el refinado no pierda resultados.
+    """
+
+    def __init__(self):
+        self._matcher = None
+        self._last_query = ""
+        self._last_range = None
+        self._last_ids: list[int] = []
+
+    def reset(self):
+        self._matcher = None
+        self._last_query = ""
+        self._last_range = None
+        self._last_ids = []
+
+    def search(self, matcher: FuzzyMatcher, query: str, max_results: int = 100, order_range: tuple[str, str] | None = None) -> list:
+        norm = normalize_name(query)
+        within = None
+        if matcher is self._matcher and order_range == self._last_range and narrows(self._last_query, norm):
+            within = self._last_ids
+        matches = matcher.match(norm, within, order_range)
+        self._matcher, self._last_query, self._last_range = matcher, norm, order_range
+        self._last_ids = [entry_id for _, _, entry_id in matches]
+        return matcher.top(matches, max_results)
@@ -0,0 +1,225 @@
+"""
+Historial estructurado de archivos procesados (SQLite, solo se añaden filas).
+Sustituye a leer el log de texto: no depende del formato de los mensajes ni se pierde al rotar
+el log, y permite leer cualquier página o filtrar por paciente/fecha con índices. Sin dependencias de GUI.
+"""
+import os
+import datetime
+import logging
+import sqlite3
+import threading
+
+from terapias_fuzzy import normalize_name
+
+EVENT_ORGANIZED = "organizado"
+EVENT_PDF = "pdf"
+_TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS historial (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    evento TEXT NOT NULL,
+    paciente TEXT NOT NULL,
+    paciente_norm TEXT NOT NULL,
+    carpeta TEXT NOT NULL,
+    archivo TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_historial_fecha ON historial(fecha);
+CREATE INDEX IF NOT EXISTS idx_historial_paciente ON historial(paciente_norm, id);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+_COLUMNS = "id, fecha, evento, paciente, carpeta, archivo"
+
+
+def _entry(row: tuple) -> dict:
+    entry_id, fecha, evento, paciente, carpeta, archivo = row
+    return {"id": entry_id, "timestamp": fecha, "event": evento, "patient": paciente, "path": carpeta, "file": archivo}
+
+
+def parse_log_line(line: str) -> dict | None:
+    """
+    Entrada de historial a partir de una línea antigua del log
+    ('fecha - INFO - Esperado PDF: x.pdf → carpeta | Paciente: P | Fecha: ...'). None si no lo es.
+    """
+    parts = line.rstrip("\n").split(" - ", 2)
+    if len(parts) < 3 or "| Paciente:" not in parts[2] or "→" not in parts[2]:
+        return None
+    message = parts[2]
+    try:
+        datetime.datetime.strptime(parts[0].strip(), _TS_FORMAT)
+    except ValueError:
+        return None
+    head, _, rest = message.partition("→")
+    archivo = head.split(":", 1)[1].strip() if ":" in head else ""
+    carpeta = rest.split("|")[0].strip()
+    paciente = message.split("| Paciente:")[1].split("|")[0].strip()
+    if not paciente or not carpeta:
+        return None
+    return {"timestamp": parts[0].strip(), "patient": paciente, "path": carpeta,
+            "file": os.path.join(carpeta, archivo) if archivo else ""}
+
+
+class HistoryStore:
+    """
+    Historial en un archivo SQLite (una conexión por operación). Las filas nunca se borran, así
+    que los id son consecutivos y la página N (más recientes primero) es un rango de id.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._initialized = True
+        return conn
+
+    def record(self, event: str, patient: str, folder: str, file: str = "", when: datetime.datetime | None = None) -> bool:
+        """Añade una entrada (organizado, pdf...). Devuelve False si no se pudo escribir."""
+        fecha = (when or datetime.datetime.now()).strftime(_TS_FORMAT)
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute(
+                            "INSERT INTO historial (fecha, evento, paciente, paciente_norm, carpeta, archivo) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (fecha, event, patient, normalize_name(patient), os.path.normpath(folder), file or ""),
+                        )
+                finally:
+                    conn.close()
+            return True
+        except sqlite3.Error as e:
+            logging.error("Error guardando historial: %s", e)
+            return False
+
+    def import_log(self, logfiles) -> int:
+        """
+        Importa una sola vez las entradas del log de texto antiguo (logfiles del más antiguo al más
+        reciente, p. ej. el .1 rotado y el actual). Devuelve las entradas importadas.
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    if conn.execute("SELECT 1 FROM meta WHERE clave = 'log_importado'").fetchone():
+                        return 0
+                    entries = []
+                    for logfile in logfiles:
+                        if not os.path.isfile(logfile):
+                            continue
+                        with open(logfile, "r", encoding="utf-8", errors="replace") as f:
+                            for line in f:
+                                entry = parse_log_line(line)
+                                if entry:
+                                    entries.append(entry)
+                    entries.sort(key=lambda e: e["timestamp"])
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO historial (fecha, evento, paciente, paciente_norm, carpeta, archivo) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            [(e["timestamp"], EVENT_ORGANIZED, e["patient"], normalize_name(e["patient"]),
+                              os.path.normpath(e["path"]), e["file"]) for e in entries],
+                        )
+                        conn.execute("INSERT INTO meta (clave, valor) VALUES ('log_importado', '1')")
+                finally:
+                    conn.close()
+        except (OSError, sqlite3.Error) as e:
+            logging.error("Error importando historial del log: %s", e)
+            return 0
+        if entries:
+            logging.info("Historial: %s entradas importadas del log", len(entries))
+        return len(entries)
+
+    def count(self) -> int:
+        """Número de entradas (el id más alto, sin recorrer la tabla)."""
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute("SELECT COALESCE(MAX(id), 0) FROM historial").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error leyendo historial: %s", e)
+            return 0
+
+    def page(self, offset: int, limit: int, max_id: int | None = None) -> list[dict]:
+        """
+        Entradas offset..offset+limit-1 empezando por la más reciente (coste independiente de offset).
+        Con max_id se cuenta desde esa entrada: una lista que lo fija al abrirse pagina igual aunque
+        se añadan entradas mientras tanto.
+        """
+        top = (self.count() if max_id is None else max_id) - offset
+        if top <= 0 or limit <= 0:
+            return []
+        return self._query(
+            f"SELECT {_COLUMNS} FROM historial WHERE id BETWEEN ? AND ? ORDER BY id DESC",
+            (max(1, top - limit + 1), top),
+        )
+
+    def find_ids(
+        self,
+        patient: str | None = None,
+        date_from: datetime.date | None = None,
+        date_to: datetime.date | None = None,
+    ) -> list[int]:
+        """
+        Id de las entradas que cumplen el filtro, más recientes primero. patient filtra por nombre
+        normalizado (palabras del principio del nombre); date_from/date_to, por día inclusive.
+        Las páginas de un filtro se leen después con get_many.
+        """
+        where, params = [], []
+        norm = normalize_name(patient or "")
+        if norm:
+            where.append("paciente_norm >= ? AND paciente_norm < ?")
+            params += [norm, norm + "\U0010ffff"]
+        if date_from:
+            where.append("fecha >= ?")
+            params.append(date_from.isoformat())
+        if date_to:
+            where.append("fecha < ?")
+            params.append((date_to + datetime.timedelta(days=1)).isoformat())
+        sql = "SELECT id FROM historial"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        try:
+            conn = self._connect()
+            try:
+                ids = [row[0] for row in conn.execute(sql, params)]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error leyendo historial: %s", e)
+            return []
+        ids.sort(reverse=True)
+        return ids
+
+    def get_many(self, ids: list[int]) -> list[dict]:
+        """Entradas de ids en el mismo orden."""
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        by_id = {e["id"]: e for e in self._query(f"SELECT {_COLUMNS} FROM historial WHERE id IN ({placeholders})", ids)}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def _query(self, sql: str, params) -> list[dict]:
+        try:
+            conn = self._connect()
+            try:
+                return [_entry(row) for row in conn.execute(sql, params)]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error leyendo historial: %s", e)
+            return []
@@ -0,0 +1,338 @@
+"""
+Carpeta de origen (bandeja de entrada): los documentos por organizar, del más reciente al más
+antiguo. Se guarda una instantánea por carpeta (nombre y mtime de cada documento, leídos con
+scandir sin un stat aparte por archivo) y en las siguientes búsquedas solo se vuelve a listar una
+carpeta si cambió su mtime (se añadió, borró o renombró algo). De la instantánea se sacan los
+max_count más recientes con un montículo, sin ordenar la lista entera.
+En modo vigilancia (InboxQueue) la misma instantánea se consulta cada pocos segundos y los
+documentos que van llegando forman una cola, con su SHA-256 y un nombre sugerido, en cuanto
+terminan de escribirse.
+Sin dependencias de GUI.
+"""
+import os
+import re
+import heapq
+import logging
+import threading
+import time
+
+from terapias_logic import sanitize_filename, patient_from_user_input
+from terapias_fuzzy import normalize_name
+from terapias_transfer import file_sha256
+
+DEFAULT_INBOX_EXTENSIONS = (".doc", ".docx")
+# Extensiones que se pueden añadir en [ORIGEN] extensiones
+SUPPORTED_INBOX_EXTENSIONS = (".doc", ".docx", ".odt", ".rtf", ".pdf")
+DEFAULT_MAX_DOCS = 50
+DEFAULT_WATCH_INTERVAL = 2.0
+INBOX_WAITING = "esperando"
+INBOX_READY = "listo"
+# Palabras del nombre de archivo que se prueban como nombre de paciente
+_SUGGEST_MAX_WORDS = 6
+# Si la carpeta cambió tan poco antes de listarla, su mtime no basta para saber si cambió después
+# (resolución de 2 s en FAT y en algunas carpetas de red): se vuelve a listar en la siguiente
+_RACY_SECONDS = 2.0
+
+
+def parse_extensions(text: str) -> tuple[str, ...]:
+    """'.doc, docx .PDF' -> ('.doc', '.docx', '.pdf'). Ignora las no admitidas; vacío -> por defecto."""
+    exts = []
+    for item in text.replace(",", " ").split():
+        ext = "." + item.strip().lstrip(".").lower()
+        if ext in SUPPORTED_INBOX_EXTENSIONS and ext not in exts:
+            exts.append(ext)
+        elif ext not in SUPPORTED_INBOX_EXTENSIONS:
+            logging.warning("Extensión no admitida en la carpeta de origen: %s", item)
+    return tuple(exts) or DEFAULT_INBOX_EXTENSIONS
+
+
+class InboxSnapshot:
+    """
+    Instantáneas de carpetas de origen, compartidas entre hilos. Cada carpeta listada guarda su
+    mtime, sus documentos [(mtime, ruta)] con las extensiones pedidas y sus subcarpetas.
+    Un documento editado sin cambiar de nombre no cambia el mtime de la carpeta y conserva su
+    posición hasta el siguiente cambio (Word guarda con un temporal y un renombrado, que sí cuenta).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (carpeta en normcase, extensiones) -> {"mtime": ns, "stable": bool, "docs": [...], "dirs": [...]}
+        self._dirs: dict[tuple, dict] = {}
+        self.listings = 0
+
+    def find(
+        self,
+        source_dir: str,
+        max_count: int = DEFAULT_MAX_DOCS,
+        recursive: bool = False,
+        extensions: tuple[str, ...] = DEFAULT_INBOX_EXTENSIONS,
+    ) -> list[tuple[str, float]]:
+        """
+        Documentos de source_dir (y sus subcarpetas con recursive) con esas extensiones, del más
+        reciente al más antiguo, como mucho max_count. Devuelve [(ruta, mtime), ...].
+        """
+        exts = tuple(e.lower() for e in extensions)
+        docs = []
+        pending = [source_dir]
+        seen = set()
+        while pending:
+            folder = pending.pop()
+            key = (os.path.normcase(os.path.abspath(folder)), exts)
+            if key in seen:
+                continue
+            seen.add(key)
+            snap = self._snapshot(folder, key)
+            if snap is None:
+                continue
+            docs.extend(snap["docs"])
+            if recursive:
+                pending.extend(snap["dirs"])
+        top = heapq.nlargest(max_count, docs) if max_count else sorted(docs, reverse=True)
+        return [(path, mtime) for mtime, path in top]
+
+    def _snapshot(self, folder: str, key: tuple) -> dict | None:
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._dirs.pop(key, None)
+            return None
+        with self._lock:
+            snap = self._dirs.get(key)
+        if snap is not None and snap["stable"] and snap["mtime"] == mtime:
+            return snap
+        listed_at = time.time()
+        snap = self._list(folder, key[1])
+        if snap is None:
+            return None
+        snap["mtime"] = mtime
+        snap["stable"] = listed_at - mtime / 1e9 > _RACY_SECONDS
+        with self._lock:
+            self._dirs[key] = snap
+            self.listings += 1
+        return snap
+
+    @staticmethod
+    def _list(folder: str, exts: tuple[str, ...]) -> dict | None:
+        docs, dirs = [], []
+        try:
+            with os.scandir(folder) as it:
+                for e in it:
+                    name = e.name
+                    # ~$nombre.docx: archivo de bloqueo de Word; .~ y ocultos: temporales
+                    if name.startswith(("~$", ".")):
+                        continue
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            dirs.append(e.path)
+                        elif name.lower().endswith(exts) and e.is_file():
+                            docs.append((e.stat().st_mtime, e.path))
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return {"docs": docs, "dirs": dirs}
+
+    def invalidate(self, source_dir: str | None = None):
+        """Olvida la instantánea de source_dir (y sus subcarpetas), o todas sin argumento."""
+        with self._lock:
+            if source_dir is None:
+                self._dirs.clear()
+                return
+            prefix = os.path.normcase(os.path.abspath(source_dir))
+            for key in [k for k in self._dirs if k[0] == prefix or k[0].startswith(prefix + os.sep)]:
+                del self._dirs[key]
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def suggest_name(path: str, lookup=None) -> tuple[str, str]:
+    """
+    (nombre, paciente) sugeridos para organizar path a partir del nombre del archivo. Si ya sigue
+    la regla 'SS', se usa tal cual; si no, lookup(texto) -> paciente o None (p. ej. el índice de
+    pacientes) se prueba con las palabras del nombre, de más a menos. ('', '') si no hay sugerencia.
+    """
+    stem = sanitize_filename(os.path.splitext(os.path.basename(path))[0])
+    patient = patient_from_user_input(stem)
+    if patient != "PACIENTE_DESCONOCIDO":
+        return stem, patient
+    if lookup is None:
+        return "", ""
+    words = [w for w in normalize_name(re.sub(r"\d+", " ", stem)).split() if len(w) > 1][:_SUGGEST_MAX_WORDS]
+    for size in range(len(words), 1, -1):
+        for start in range(len(words) - size + 1):
+            try:
+                found = lookup(" ".join(words[start:start + size]))
+            except Exception as e:
+                logging.error("Error sugiriendo paciente para %s: %s", path, e)
+                return "", ""
+            if found:
+                return f"SS {found}", found
+    return "", ""
+
+
+def _word_lock_exists(path: str) -> bool:
+    """True si Word tiene abierto path (archivo ~$ junto a él; Word recorta los nombres largos)."""
+    folder, name = os.path.split(path)
+    return any(os.path.exists(os.path.join(folder, "~$" + name[i:])) for i in (0, 1, 2))
+
+
+class InboxQueue:
+    """
+    Modo vigilancia de la carpeta de origen. Cada interval segundos consulta la instantánea
+    (solo se relista una carpeta si cambió) y los documentos que no estaban al empezar a vigilar
+    entran en la cola. Uno está listo cuando tamaño y mtime no cambian entre dos pasadas, no está
+    vacío ni abierto en Word y se puede leer; entonces se calcula su SHA-256, se sugiere el nombre
+    (suggest_name con lookup) y known(hash) -> copia del respaldo o None avisa si ya se organizó.
+    Cada entrada es un dict con path, size, mtime, since, status (esperando/listo), hash,
+    suggestion, patient y duplicate. on_change() se llama desde el hilo de sondeo si la cola cambia.
+    """
+
+    def __init__(
+        self,
+        snapshot: InboxSnapshot,
+        source_dir: str,
+        extensions: tuple[str, ...] = DEFAULT_INBOX_EXTENSIONS,
+        recursive: bool = False,
+        lookup=None,
+        known=None,
+        on_change=None,
+        interval: float = DEFAULT_WATCH_INTERVAL,
+    ):
+        self.snapshot = snapshot
+        self.source_dir = source_dir
+        self.extensions = extensions
+        self.recursive = recursive
+        self.lookup = lookup
+        self.known = known
+        self.on_change = on_change
+        self.interval = interval
+        self._entries: dict[str, dict] = {}
+        self._baseline: set[str] | None = None
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        return not self._stop.is_set()
+
+    def set_source(self, source_dir: str):
+        """Vigila otra carpeta: la cola empieza de nuevo con lo que llegue a partir de ahora."""
+        with self._poll_lock, self._lock:
+            self.source_dir = source_dir
+            self._entries.clear()
+            self._baseline = None
+        if self.on_change is not None:
+            self.on_change()
+
+    def entries(self, ready_only: bool = False) -> list[dict]:
+        """Copia de la cola, del documento más reciente al más antiguo."""
+        with self._lock:
+            items = [self._public(e) for e in self._entries.values() if not ready_only or e["status"] == INBOX_READY]
+        return sorted(items, key=lambda e: e["mtime"] or e["since"], reverse=True)
+
+    def get(self, path: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(_key(path))
+            return self._public(entry) if entry is not None else None
+
+    def discard(self, path: str):
+        """Quita path de la cola (recién organizado o descartado); no vuelve a entrar mientras siga ahí."""
+        with self._lock:
+            removed = self._entries.pop(_key(path), None)
+            if self._baseline is not None:
+                self._baseline.add(_key(path))
+        if removed is not None and self.on_change is not None:
+            self.on_change()
+
+    @staticmethod
+    def _public(entry: dict) -> dict:
+        return {k: v for k, v in entry.items() if not k.startswith("_")}
+
+    def poll(self) -> bool:
+        """Una pasada: añade los documentos nuevos y completa los que terminaron de escribirse. True si la cola cambió."""
+        with self._poll_lock:
+            docs = self.snapshot.find(self.source_dir, 0, self.recursive, self.extensions)
+            current = {_key(p): p for p, _ in docs}
+            changed = False
+            with self._lock:
+                if self._baseline is None:
+                    # Lo que ya estaba al empezar a vigilar no es nuevo (sale en «Buscar y Organizar»)
+                    self._baseline = set(current)
+                    return False
+                self._baseline &= current.keys()
+                for key in [k for k in self._entries if k not in current]:
+                    del self._entries[key]
+                    changed = True
+                for key, path in current.items():
+                    if key in self._baseline or key in self._entries:
+                        continue
+                    self._entries[key] = {"path": path, "size": None, "mtime": None, "since": time.time(),
+                                          "status": INBOX_WAITING, "hash": None, "suggestion": "", "patient": "",
+                                          "duplicate": None, "_sig": None}
+                    changed = True
+                waiting = [e for e in self._entries.values() if e["status"] == INBOX_WAITING]
+            for entry in waiting:
+                changed = self._settle(entry) or changed
+        if changed and self.on_change is not None:
+            self.on_change()
+        return changed
+
+    def _settle(self, entry: dict) -> bool:
+        """Comprueba si entry terminó de escribirse y, si es así, la completa. True si pasó a lista."""
+        path = entry["path"]
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        sig = (st.st_size, st.st_mtime_ns)
+        if sig != entry["_sig"] or not st.st_size or _word_lock_exists(path):
+            # Visto por primera vez, aún creciendo o abierto: se confirma en la siguiente pasada
+            entry["_sig"] = sig
+            return False
+        try:
+            digest = file_sha256(path)
+            after = os.stat(path)
+            if (after.st_size, after.st_mtime_ns) != sig:
+                entry["_sig"] = None
+                return False
+        except OSError:
+            # Aún bloqueado por quien lo copia
+            return False
+        suggestion, patient = suggest_name(path, self.lookup)
+        duplicate = None
+        if self.known is not None:
+            try:
+                duplicate = self.known(digest)
+            except Exception as e:
+                logging.error("Error buscando %s en el respaldo: %s", path, e)
+        with self._lock:
+            if self._entries.get(_key(path)) is not entry:
+                return False
+            entry.update(size=st.st_size, mtime=st.st_mtime, status=INBOX_READY, hash=digest,
+                         suggestion=suggestion, patient=patient, duplicate=duplicate)
+        logging.info("Bandeja: documento nuevo %s%s", path, f" (paciente sugerido: {patient})" if patient else "")
+        return True
+
+    def start(self):
+        if self.running:
+            return
+        # Un evento por hilo: un hilo anterior aún esperando no revive al volver a empezar
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(self._stop,), name="inbox-watch", daemon=True).start()
+
+    def _run(self, stop: threading.Event):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error("Error vigilando la carpeta de origen: %s", e)
+            if stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
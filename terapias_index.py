@@ -0,0 +1,280 @@
+"""
+Índice persistente de carpetas de paciente (SQLite).
+Guarda paciente, ruta y fecha de cada carpeta AÑO/MES/DÍA/PACIENTE para que las
+búsquedas no tengan que recorrer BASE_DEST. Sin dependencias de GUI.
+"""
+import os
+import datetime
+import logging
+import sqlite3
+import threading
+
+from terapias_logic import parse_folder_date
+from terapias_fuzzy import FuzzyMatcher, IncrementalSearch, normalize_name
+from terapias_walk import iter_patient_folders, iter_patient_folders_under, folder_depth
+
+# Subir al cambiar el esquema: el índice es una caché y se reconstruye entero
+_SCHEMA_VERSION = "2"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pacientes (
+    id INTEGER PRIMARY KEY,
+    paciente TEXT NOT NULL,
+    paciente_norm TEXT NOT NULL,
+    ruta TEXT NOT NULL UNIQUE,
+    fecha_carpeta TEXT NOT NULL,
+    fecha TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pacientes_fecha ON pacientes(fecha);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+
+class PatientIndex:
+    """Índice de carpetas de paciente en un archivo SQLite (una conexión por operación)."""
+
+    def __init__(self, db_path: str, meses: dict):
+        self.db_path = db_path
+        self.meses = meses
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._matcher = None
+        self._matcher_version = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT valor FROM meta WHERE clave = 'schema'").fetchone()
+            if not row or row[0] != _SCHEMA_VERSION:
+                with conn:
+                    conn.execute("DROP TABLE IF EXISTS pacientes")
+                    conn.execute("DELETE FROM meta")
+                conn.executescript(_SCHEMA)
+                with conn:
+                    conn.execute("INSERT INTO meta (clave, valor) VALUES ('schema', ?)", (_SCHEMA_VERSION,))
+            self._initialized = True
+        return conn
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection):
+        """Marca el índice como modificado (invalida las cachés en memoria de otros procesos)."""
+        conn.execute(
+            "INSERT INTO meta (clave, valor) VALUES ('version', '1') "
+            "ON CONFLICT(clave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1"
+        )
+
+    @staticmethod
+    def _version(conn: sqlite3.Connection) -> str | None:
+        row = conn.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+        return row[0] if row else None
+
+    def _row(self, patient: str, path: str, year: str, month: str, day: str) -> tuple:
+        fecha = parse_folder_date(year, month, day, self.meses)
+        return (
+            patient, normalize_name(patient), os.path.normpath(path),
+            f"{year}/{month}/{day}", fecha.isoformat() if fecha else None,
+        )
+
+    def base_dest(self) -> str | None:
+        """Carpeta raíz con la que se construyó el índice (None si nunca se construyó)."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT valor FROM meta WHERE clave = 'base_dest'").fetchone()
+            finally:
+                conn.close()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logging.error("Error leyendo índice de pacientes: %s", e)
+            return None
+
+    def is_built_for(self, base_dest: str) -> bool:
+        """True si el índice existe y corresponde a base_dest."""
+        built = self.base_dest()
+        return built is not None and os.path.normcase(os.path.normpath(built)) == os.path.normcase(os.path.normpath(base_dest))
+
+    def add(self, patient: str, path: str, year: str, month: str, day: str) -> bool:
+        """Registra (o actualiza) una carpeta de paciente recién creada."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    row = self._row(patient, path, year, month, day)
+                    with conn:
+                        cur = conn.execute(
+                            "INSERT OR IGNORE INTO pacientes (paciente, paciente_norm, ruta, fecha_carpeta, fecha) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            row,
+                        )
+                        if cur.rowcount == 0:
+                            return True
+                        was_current = self._matcher is not None and self._version(conn) == self._matcher_version
+                        self._bump_version(conn)
+                        if was_current:
+                            self._matcher_add(self._matcher, row)
+                            self._matcher_version = self._version(conn)
+                finally:
+                    conn.close()
+            return True
+        except sqlite3.Error as e:
+            logging.error("Error actualizando índice de pacientes: %s", e)
+            return False
+
+    def rebuild(self, base_dest: str) -> int | None:
+        """Reconstruye el índice completo recorriendo base_dest. Devuelve el número de carpetas o None si falla."""
+        if not os.path.isdir(base_dest):
+            return None
+        return self.replace_all(base_dest, iter_patient_folders(base_dest))
+
+    def replace_all(self, base_dest: str, entries) -> int | None:
+        """
+        Sustituye el contenido del índice por entries [(paciente, ruta, año, mes, día), ...]
+        ya recorridas de base_dest. Devuelve el número de carpetas o None si falla.
+        """
+        rows = [self._row(*entry) for entry in entries]
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute("DELETE FROM pacientes")
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO pacientes (paciente, paciente_norm, ruta, fecha_carpeta, fecha) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            rows,
+                        )
+                        conn.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES ('base_dest', ?)", (base_dest,))
+                        self._bump_version(conn)
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error reconstruyendo índice de pacientes: %s", e)
+            return None
+        logging.info("Índice de pacientes reconstruido: %s carpetas", len(rows))
+        return len(rows)
+
+    def sync_dirs(self, base_dest: str, dirs) -> bool:
+        """
+        Vuelve a leer solo las carpetas dirs (raíz, año, mes o día de base_dest) y sustituye en el
+        índice lo que cuelga de ellas. Lo usa el vigilante de carpetas para aplicar cambios por lotes.
+        """
+        if not self.is_built_for(base_dest):
+            return False
+        targets = sorted({os.path.normpath(d) for d in dirs if folder_depth(base_dest, d) is not None})
+        if any(folder_depth(base_dest, d) == 0 for d in targets):
+            return self.rebuild(base_dest) is not None
+        # Si cambian un mes y uno de sus días, basta con releer el mes
+        roots = []
+        for d in targets:
+            if not any(d.startswith(r + os.sep) for r in roots):
+                roots.append(d)
+        rows = {r: [self._row(*entry) for entry in iter_patient_folders_under(base_dest, r)] for r in roots}
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        for root, root_rows in rows.items():
+                            prefix = root + os.sep
+                            conn.execute(
+                                "DELETE FROM pacientes WHERE ruta >= ? AND ruta < ?",
+                                (prefix, prefix + "\U0010ffff"),
+                            )
+                            conn.executemany(
+                                "INSERT OR REPLACE INTO pacientes (paciente, paciente_norm, ruta, fecha_carpeta, fecha) "
+                                "VALUES (?, ?, ?, ?, ?)",
+                                root_rows,
+                            )
+                        self._bump_version(conn)
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error actualizando índice de pacientes: %s", e)
+            return False
+        logging.debug("Índice de pacientes sincronizado: %s", ", ".join(roots))
+        return True
+
+    @staticmethod
+    def _matcher_add(matcher: FuzzyMatcher, row: tuple):
+        patient, norm, path, fecha_carpeta, fecha = row
+        matcher.add(norm, {"patient": patient, "path": path, "date": fecha_carpeta}, order=fecha or "")
+
+    def _get_matcher(self) -> FuzzyMatcher:
+        """Matcher en memoria con todos los nombres; se recarga solo si el índice cambió."""
+        conn = self._connect()
+        try:
+            version = self._version(conn)
+            if self._matcher is not None and version == self._matcher_version:
+                return self._matcher
+            matcher = FuzzyMatcher()
+            for row in conn.execute("SELECT paciente, paciente_norm, ruta, fecha_carpeta, fecha FROM pacientes"):
+                self._matcher_add(matcher, row)
+        finally:
+            conn.close()
+        self._matcher, self._matcher_version = matcher, version
+        return matcher
+
+    def search(
+        self,
+        query: str,
+        max_results: int = 100,
+        session: IncrementalSearch | None = None,
+        date_from: datetime.date | None = None,
+        date_to: datetime.date | None = None,
+    ) -> list[dict]:
+        """
+        Búsqueda aproximada (sin acentos ni mayúsculas, cualquier orden de palabras, errores pequeños).
+        Resultados por relevancia y, a igualdad, los más recientes primero. Con session, las
+        consultas que amplían la anterior refinan sus coincidencias en memoria.
+        date_from/date_to limitan a un periodo; sin query devuelve todo el periodo (más reciente primero).
+        """
+        order_range = None
+        if date_from or date_to:
+            order_range = (date_from.isoformat() if date_from else "0000-01-01", date_to.isoformat() if date_to else "9999-12-31")
+        if not query:
+            return self._search_range(order_range, max_results) if order_range else []
+        try:
+            with self._lock:
+                matcher = self._get_matcher()
+        except sqlite3.Error as e:
+            logging.error("Error buscando en índice de pacientes: %s", e)
+            return []
+        if session is not None:
+            results = session.search(matcher, query, max_results, order_range)
+        else:
+            results = matcher.search(query, max_results, order_range)
+        return [dict(r) for r in results]
+
+    def _search_range(self, order_range: tuple[str, str], max_results: int) -> list[dict]:
+        """Carpetas de un periodo usando el índice por fecha (el coste depende del periodo, no del archivo)."""
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT paciente, ruta, fecha_carpeta FROM pacientes "
+                    "WHERE fecha BETWEEN ? AND ? ORDER BY fecha DESC, paciente LIMIT ?",
+                    (order_range[0], order_range[1], max_results),
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error buscando en índice de pacientes: %s", e)
+            return []
+        return [{"patient": p, "path": r, "date": d} for p, r, d in rows]
+
+    def count(self) -> int:
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute("SELECT COUNT(*) FROM pacientes").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error("Error leyendo índice de pacientes: %s", e)
+            return 0
@@ -0,0 +1,118 @@
+"""
+Ejecución de tareas lentas (mover archivos, respaldos, conversión a PDF) fuera del hilo de la
+interfaz. Cada tarea recibe su Job para informar del progreso y comprobar si se canceló; los
+avisos (progreso, fin, error, cancelación) se entregan a través de dispatch, que en la GUI es
+widget.after(0, ...) para que lleguen al hilo de Tk. Sin dependencias de GUI.
+"""
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_PENDING = "pendiente"
+JOB_RUNNING = "en_curso"
+JOB_DONE = "hecho"
+JOB_CANCELLED = "cancelado"
+JOB_FAILED = "error"
+
+
+class JobCancelled(Exception):
+    """La tarea se canceló (ver Job.check_cancelled / Job.sleep)."""
+
+
+class Job:
+    """Una tarea enviada a JobRunner."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name: str, dispatch, on_progress=None):
+        self.id = next(self._ids)
+        self.name = name
+        self.status = JOB_PENDING
+        self.result = None
+        self.error = None
+        self._cancel = threading.Event()
+        self._dispatch = dispatch
+        self._on_progress = on_progress
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        """Event de cancelación, para funciones que aceptan cancel (p. ej. apply_batch)."""
+        return self._cancel
+
+    def cancel(self):
+        """Pide la cancelación; la tarea la atiende en su próxima comprobación."""
+        self._cancel.set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+
+    def sleep(self, seconds: float):
+        """Espera seconds segundos o hasta que se cancele (en ese caso lanza JobCancelled)."""
+        if self._cancel.wait(seconds):
+            raise JobCancelled(self.name)
+
+    def report(self, message: str, fraction: float | None = None):
+        """Progreso desde la tarea: on_progress(mensaje, fracción) llega por dispatch."""
+        if self._on_progress is not None and not self._cancel.is_set():
+            self._dispatch(lambda: self._on_progress(message, fraction))
+
+
+class JobRunner:
+    """Grupo acotado de hilos para tareas con progreso, cancelación y resultado."""
+
+    def __init__(self, dispatch, max_workers: int = 2):
+        self._dispatch = dispatch
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._active: dict[int, Job] = {}
+
+    def submit(self, name: str, fn, *args, on_progress=None, on_done=None, on_error=None, on_cancel=None) -> Job:
+        """
+        Ejecuta fn(job, *args) en segundo plano. Al terminar se llama (por dispatch) a
+        on_done(resultado), on_error(excepción) u on_cancel() según el caso.
+        """
+        job = Job(name, self._dispatch, on_progress)
+        with self._lock:
+            self._active[job.id] = job
+        self._executor.submit(self._run, job, fn, args, on_done, on_error, on_cancel)
+        return job
+
+    def _run(self, job: Job, fn, args, on_done, on_error, on_cancel):
+        job.status = JOB_RUNNING
+        try:
+            job.check_cancelled()
+            job.result = fn(job, *args)
+            job.status = JOB_DONE
+        except JobCancelled:
+            job.status = JOB_CANCELLED
+        except Exception as e:
+            logging.error("Tarea «%s» falló: %s", job.name, e)
+            job.error = e
+            job.status = JOB_FAILED
+        finally:
+            with self._lock:
+                self._active.pop(job.id, None)
+        if job.status == JOB_DONE and on_done is not None:
+            self._dispatch(lambda: on_done(job.result))
+        elif job.status == JOB_FAILED and on_error is not None:
+            self._dispatch(lambda: on_error(job.error))
+        elif job.status == JOB_CANCELLED and on_cancel is not None:
+            self._dispatch(on_cancel)
+
+    def active(self) -> list[Job]:
+        """Tareas pendientes o en curso."""
+        with self._lock:
+            return list(self._active.values())
+
+    def shutdown(self, cancel: bool = True):
+        """Detiene el grupo; con cancel se piden las cancelaciones y se descartan las pendientes."""
+        if cancel:
+            for job in self.active():
+                job.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=cancel)
@@ -0,0 +1,269 @@
+"""
+Diario de operaciones (write-ahead) para organizar y pasar a respaldo. Antes de mover nada se
+anota la operación con todos sus pasos (origen y destino de cada archivo); después se anotan los
+pasos terminados y el final. Si la app se cierra a medias, al iniciar se revisan las operaciones
+sin terminar: cada paso se da por hecho o no hecho según lo que haya en disco y un manejador por
+tipo de operación completa lo que faltaba (historial, índice, respaldo).
+
+Las anotaciones de todas las operaciones en curso se escriben juntas (commit en grupo): un solo
+fsync por tanda en lugar de uno por paso, y solo el inicio de una operación espera a estar en
+disco. Cada proceso (la app, la línea de comandos) escribe su propio archivo y lo mantiene
+bloqueado mientras vive, así no se recupera el diario de otro proceso en marcha.
+Sin dependencias de GUI.
+"""
+import os
+import sys
+import json
+import uuid
+import logging
+import datetime
+import threading
+
+from terapias_transfer import file_sha256
+
+STEP_DONE = "hecho"
+STEP_NOT_DONE = "no_hecho"
+STEP_CONFLICT = "conflicto"
+STEP_LOST = "perdido"
+
+JOURNAL_EXTENSION = ".jsonl"
+# Sin operaciones en curso, el diario se vacía al pasar de este tamaño
+_MAX_JOURNAL_BYTES = 1024 * 1024
+
+
+def _try_lock(f) -> bool:
+    """Bloqueo exclusivo sin espera de f (se suelta al cerrarlo). False si otro proceso lo tiene."""
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def resolve_move(step: dict) -> str:
+    """
+    Estado de un paso {'de': origen, 'a': destino} según el disco. Si están los dos (la copia entre
+    discos terminó pero no se llegó a borrar el original) y son iguales, se borra el original.
+    Con 'a' None (destino no conocido de antemano, p. ej. el almacén de respaldo) solo cuenta
+    si el origen sigue ahí.
+    """
+    src, dst = step["de"], step.get("a")
+    src_exists = os.path.exists(src)
+    if dst is None:
+        return STEP_NOT_DONE if src_exists else STEP_DONE
+    dst_exists = os.path.exists(dst)
+    if dst_exists and not src_exists:
+        return STEP_DONE
+    if src_exists and not dst_exists:
+        return STEP_NOT_DONE
+    if not src_exists:
+        return STEP_LOST
+    try:
+        if file_sha256(src) == file_sha256(dst):
+            os.remove(src)
+            return STEP_DONE
+    except OSError as e:
+        logging.error("No se pudo completar el movimiento %s → %s: %s", src, dst, e)
+    return STEP_CONFLICT
+
+
+def _parse_journal(lines) -> list[dict]:
+    """Operaciones sin terminar de las líneas (bytes) de un diario."""
+    ops: dict[str, dict] = {}
+    for line in lines:
+        try:
+            rec = json.loads(line.decode("utf-8", errors="replace"))
+        except ValueError:
+            continue
+        kind = rec.get("t")
+        if kind == "inicio":
+            ops[rec["op"]] = {"op": rec["op"], "kind": rec["tipo"], "timestamp": rec.get("fecha", ""),
+                              "meta": rec.get("meta") or {}, "steps": rec.get("pasos") or []}
+        elif kind == "paso" and rec.get("op") in ops:
+            steps = ops[rec["op"]]["steps"]
+            if 0 <= rec.get("i", -1) < len(steps):
+                steps[rec["i"]]["hecho"] = True
+        elif kind == "fin":
+            ops.pop(rec.get("op"), None)
+    return list(ops.values())
+
+
+def read_journal(path: str) -> list[dict]:
+    """
+    Operaciones sin terminar de un archivo de diario, con sus pasos ('hecho' True si se anotó como
+    terminado). Una última línea cortada por el cierre se ignora.
+    """
+    with open(path, "rb") as f:
+        return _parse_journal(f)
+
+
+def replay(journal_dir: str, handlers: dict, own_path: str | None = None) -> list[dict]:
+    """
+    Recupera los diarios de journal_dir que no están en uso (procesos que terminaron o se
+    cerraron a medias), salvo own_path. Cada paso recibe 'estado' (hecho, no_hecho, conflicto o
+    perdido) y se llama a handlers[tipo](operación). Devuelve las operaciones recuperadas.
+    """
+    try:
+        names = sorted(n for n in os.listdir(journal_dir) if n.endswith(JOURNAL_EXTENSION))
+    except OSError:
+        return []
+    recovered = []
+    for name in names:
+        path = os.path.join(journal_dir, name)
+        if own_path and os.path.normcase(os.path.abspath(path)) == os.path.normcase(os.path.abspath(own_path)):
+            continue
+        try:
+            f = open(path, "r+b")
+        except OSError:
+            continue
+        try:
+            if not _try_lock(f):
+                continue
+            # Se lee por el mismo handle: en Windows el bloqueo es obligatorio y otro open fallaría
+            f.seek(0)
+            ops = _parse_journal(f)
+            for op in ops:
+                for step in op["steps"]:
+                    step["estado"] = resolve_move(step)
+                handler = handlers.get(op["kind"])
+                try:
+                    if handler is not None:
+                        handler(op)
+                except Exception as e:
+                    logging.error("Error recuperando la operación %s (%s): %s", op["op"], op["kind"], e)
+                for step in op["steps"]:
+                    if step["estado"] in (STEP_CONFLICT, STEP_LOST):
+                        logging.warning("Operación interrumpida (%s): %s → %s quedó %s",
+                                        op["kind"], step["de"], step.get("a"), step["estado"])
+            recovered.extend(ops)
+        except OSError as e:
+            logging.error("No se pudo recuperar el diario %s: %s", path, e)
+            continue
+        finally:
+            f.close()
+        try:
+            os.remove(path)
+        except OSError as e:
+            logging.error("No se pudo borrar el diario recuperado %s: %s", path, e)
+    if recovered:
+        logging.info("Diario: %s operaciones interrumpidas recuperadas", len(recovered))
+    return recovered
+
+
+class OperationJournal:
+    """
+    Diario de este proceso en journal_dir (se crea con la primera operación). begin() vuelve
+    cuando la operación ya está en disco; step_done() y finish() se escriben en la siguiente
+    tanda sin esperar. Un hilo escribe las tandas: lo que se anota mientras hace fsync va en la
+    siguiente, así muchas operaciones a la vez comparten cada fsync.
+    """
+
+    def __init__(self, journal_dir: str):
+        self.journal_dir = journal_dir
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(journal_dir, f"{stamp}_{os.getpid()}_{uuid.uuid4().hex[:6]}{JOURNAL_EXTENSION}")
+        self.commits = 0
+        self._file = None
+        self._cond = threading.Condition()
+        self._buffer: list[str] = []
+        self._queued = 0
+        self._flushed = 0
+        self._error = None
+        self._active: set[str] = set()
+        self._thread = None
+        self._closing = False
+
+    def begin(self, kind: str, steps: list[dict], meta: dict | None = None) -> str:
+        """Anota una operación con sus pasos y espera a que esté en disco. Devuelve su id."""
+        op = uuid.uuid4().hex[:12]
+        fecha = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._append({"t": "inicio", "op": op, "tipo": kind, "fecha": fecha, "meta": meta or {}, "pasos": steps},
+                     durable=True, begin=op)
+        return op
+
+    def step_done(self, op: str, index: int):
+        self._append({"t": "paso", "op": op, "i": index})
+
+    def finish(self, op: str):
+        self._append({"t": "fin", "op": op}, finish=op)
+
+    def _append(self, record: dict, durable: bool = False, begin: str | None = None, finish: str | None = None):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._cond:
+            if self._closing:
+                raise OSError("El diario de operaciones está cerrado")
+            if self._thread is None:
+                self._open()
+            if begin:
+                self._active.add(begin)
+            if finish:
+                self._active.discard(finish)
+            self._buffer.append(line)
+            self._queued += 1
+            seq = self._queued
+            self._cond.notify_all()
+            if durable:
+                while self._flushed < seq and self._error is None:
+                    self._cond.wait()
+                if self._error is not None:
+                    raise OSError(f"No se pudo escribir el diario de operaciones: {self._error}")
+
+    def _open(self):
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._file = open(self.path, "a+b")
+        if not _try_lock(self._file):
+            logging.warning("No se pudo bloquear el diario %s", self.path)
+        self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closing:
+                    self._cond.wait()
+                if not self._buffer:
+                    return
+                lines, self._buffer = self._buffer, []
+                seq = self._queued
+            try:
+                self._file.write("".join(lines).encode("utf-8"))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                error = None
+            except OSError as e:
+                logging.error("Error escribiendo el diario de operaciones: %s", e)
+                error = e
+            with self._cond:
+                self._flushed = seq
+                self._error = error
+                self.commits += 1
+                if not self._active and not self._buffer and self._file.tell() > _MAX_JOURNAL_BYTES:
+                    # Nada en curso: lo escrito ya no hace falta para recuperar
+                    self._file.truncate(0)
+                self._cond.notify_all()
+
+    def replay(self, handlers: dict) -> list[dict]:
+        """Recupera los diarios de otros procesos que ya no están en marcha (ver replay)."""
+        return replay(self.journal_dir, handlers, own_path=self.path)
+
+    def close(self):
+        """Escribe lo pendiente y cierra; sin operaciones en curso, borra el archivo."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is None:
+            return
+        thread.join()
+        self._file.close()
+        if not self._active:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
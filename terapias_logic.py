@@ -2,6 +2,7 @@
 Lógica pura del Organizador de Terapias.
 Funciones sin dependencias de GUI o configuración, para facilitar tests.
 """
+import datetime
 
 
 def sanitize_filename(name: str) -> str:
@@ -48,3 +49,77 @@ def build_folder_structure(base_dest: str, year: int, month: int, day: int, mese
     ruta_mes = os.path.join(ruta_anio, mes_nombre)
     ruta_dia = os.path.join(ruta_mes, dia_nombre)
     return ruta_anio, ruta_mes, ruta_dia, ruta_dia
+
+
+def parse_year_folder(name: str) -> int | None:
+    """'2026' -> 2026; None si la carpeta no es un año."""
+    name = name.strip()
+    return int(name) if len(name) == 4 and name.isdigit() else None
+
+
+def parse_month_folder(name: str, meses: dict) -> int | None:
+    """Inverso del nombre de mes de build_folder_structure: '01- ENERO' -> 1 (también 'ENERO' -> 1)."""
+    nombres = {v.upper(): k for k, v in meses.items()}
+    prefix, sep, nombre_mes = name.partition("-")
+    if sep and prefix.strip().isdigit():
+        month = int(prefix)
+    else:
+        month = nombres.get(name.strip().upper(), 0)
+    if not month and nombre_mes:
+        month = nombres.get(nombre_mes.strip().upper(), 0)
+    return month if 1 <= month <= 12 else None
+
+
+def parse_day_folder(name: str) -> int | None:
+    """'28 DE ENERO' -> 28; None si la carpeta no empieza por un día."""
+    parts = name.strip().split()
+    if not parts or not parts[0].isdigit():
+        return None
+    day = int(parts[0])
+    return day if 1 <= day <= 31 else None
+
+
+def parse_folder_date(year_name: str, month_name: str, day_name: str, meses: dict) -> datetime.date | None:
+    """
+    Inverso de build_folder_structure: ('2026', '01- ENERO', '28 DE ENERO') -> date(2026, 1, 28).
+    Devuelve None si los nombres no siguen la estructura AÑO/MES/DÍA.
+    """
+    year = parse_year_folder(year_name)
+    month = parse_month_folder(month_name, meses)
+    day = parse_day_folder(day_name)
+    if year is None or month is None or day is None:
+        return None
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def parse_user_date(text: str) -> datetime.date | None:
+    """Fecha escrita por el usuario: '2026-01-28', '28/01/2026' o '28-01-2026'. None si no es válida."""
+    text = (text or "").strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
+        try:
+            return datetime.datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+DATE_PRESETS = ("Todo", "Hoy", "Últimos 7 días", "Este mes", "Mes anterior", "Este año", "Personalizado")
+
+
+def date_range_preset(preset: str, today: datetime.date) -> tuple[datetime.date | None, datetime.date | None]:
+    """Rango (desde, hasta) inclusivo para un periodo de DATE_PRESETS. (None, None) = sin límite."""
+    if preset == "Hoy":
+        return today, today
+    if preset == "Últimos 7 días":
+        return today - datetime.timedelta(days=6), today
+    if preset == "Este mes":
+        return today.replace(day=1), today
+    if preset == "Mes anterior":
+        last = today.replace(day=1) - datetime.timedelta(days=1)
+        return last.replace(day=1), last
+    if preset == "Este año":
+        return today.replace(month=1, day=1), today
+    return None, None
@@ -0,0 +1,205 @@
+"""
+Organizar varios documentos de una vez: primero se planifica (paciente, carpeta y nombre final de
+cada uno, sin tocar nada) y después se aplican juntos las carpetas, las copias de respaldo y los
+movimientos, en paralelo. Sin dependencias de GUI.
+"""
+import os
+import datetime
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from terapias_logic import sanitize_filename, patient_from_user_input, check_path_length, build_folder_structure
+from terapias_history import EVENT_ORGANIZED
+from terapias_backup import get_store
+from terapias_transfer import move_file
+from terapias_journal import STEP_DONE
+from terapias_inbox import SUPPORTED_INBOX_EXTENSIONS
+
+DEFAULT_MAX_PATH_LEN = 250
+# Movimientos simultáneos: en el mismo disco son renombrados; entre discos o en red, copias
+DEFAULT_WORKERS = 4
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_SKIPPED = "omitido"
+# Tipo de operación en el diario (terapias_journal)
+KIND_ORGANIZE = "organizar"
+
+
+def free_doc_stem(folder: str, name: str, ext: str, claimed=()) -> str:
+    """
+    Primera ruta sin extensión libre en folder (name, name_1...) para un documento ext: no existe
+    ni el documento ni su PDF (que tendrá el mismo nombre) y no está en claimed (normcase).
+    """
+    n = 0
+    while True:
+        stem = os.path.join(folder, f"{name}_{n}" if n else name)
+        if (os.path.normcase(stem) not in claimed
+                and not os.path.exists(stem + ext) and not os.path.exists(stem + ".pdf")):
+            return stem
+        n += 1
+
+
+def plan_batch(
+    items,
+    base_dest: str,
+    today: datetime.date,
+    meses: dict,
+    max_path_len: int = DEFAULT_MAX_PATH_LEN,
+) -> list[dict]:
+    """
+    Planifica items [(ruta_origen, nombre_escrito), ...]. Cada entrada del plan es un dict con
+    source, name, patient, folder, target, date_names (año, mes, día) y error (None si se puede
+    aplicar). Los nombres repetidos, en disco o dentro del mismo lote, reciben _1, _2...
+    """
+    ruta_anio, ruta_mes, ruta_dia, _ = build_folder_structure(base_dest, today.year, today.month, today.day, meses)
+    date_names = (os.path.basename(ruta_anio), os.path.basename(ruta_mes), os.path.basename(ruta_dia))
+    claimed = set()
+    sources = set()
+    plan = []
+    for source, user_name in items:
+        name = sanitize_filename(user_name or "")
+        entry = {"source": source, "name": name, "patient": None, "folder": None, "target": None,
+                 "date_names": date_names, "error": None}
+        plan.append(entry)
+        if not name:
+            entry["error"] = "El nombre no puede estar vacío."
+            continue
+        if os.path.normcase(source) in sources:
+            entry["error"] = "El archivo está repetido en el lote."
+            continue
+        patient = patient_from_user_input(name)
+        folder = os.path.join(ruta_dia, patient)
+        ext = os.path.splitext(source)[1].lower()
+        if ext not in SUPPORTED_INBOX_EXTENSIONS:
+            ext = ".docx"
+        # Se reserva el nombre sin extensión: el PDF de cada documento tendrá ese mismo nombre
+        stem = free_doc_stem(folder, name, ext, claimed)
+        target = stem + ext
+        entry.update(patient=patient, folder=folder, target=target)
+        if not check_path_length(target, max_path_len):
+            entry["error"] = "La ruta es demasiado larga para Windows. Usa un nombre más corto."
+            continue
+        claimed.add(os.path.normcase(stem))
+        sources.add(os.path.normcase(source))
+    return plan
+
+
+def journal_step(source: str, target: str, patient: str, folder: str, date_names) -> dict:
+    """Paso de diario de organizar un documento: el movimiento y lo que hay que registrar después."""
+    return {"de": os.path.abspath(source), "a": os.path.abspath(target), "paciente": patient,
+            "carpeta": folder, "fechas": list(date_names)}
+
+
+def _apply_one(entry: dict, backup_dir: str) -> dict:
+    # Primero la copia de respaldo: si falla el movimiento, el original sigue en su sitio
+    backup = get_store(backup_dir).store(entry["source"], move=False, name=os.path.basename(entry["target"]))
+    move_file(entry["source"], entry["target"])
+    return {**entry, "status": STATUS_OK, "backup": backup["blob"]}
+
+
+def apply_batch(
+    plan: list[dict],
+    backup_dir: str,
+    max_workers: int = DEFAULT_WORKERS,
+    cancel: threading.Event | None = None,
+    progress=None,
+    journal=None,
+) -> list[dict]:
+    """
+    Aplica un plan de plan_batch: crea cada carpeta una sola vez, guarda cada documento en el
+    respaldo de backup_dir (con su nombre final) y lo mueve a su destino, varios a la vez.
+    progress(hechos, total) se llama desde este hilo. Devuelve el plan con status
+    (ok/error/omitido), backup y error por entrada; con cancel activado, las entradas aún no
+    empezadas quedan omitidas. Con journal (OperationJournal) el lote entero se anota como una
+    operación antes de mover nada (un solo fsync); record_batch la da por terminada.
+    """
+    results = {id(e): {**e, "status": STATUS_SKIPPED, "backup": None} for e in plan}
+    for e in plan:
+        if e["error"]:
+            results[id(e)]["status"] = STATUS_ERROR
+    pending = [e for e in plan if not e["error"]]
+    try:
+        os.makedirs(backup_dir, exist_ok=True)
+        for folder in {e["folder"] for e in pending}:
+            os.makedirs(folder, exist_ok=True)
+        op = None
+        if journal is not None and pending:
+            op = journal.begin(KIND_ORGANIZE, [
+                journal_step(e["source"], e["target"], e["patient"], e["folder"], e["date_names"]) for e in pending
+            ])
+    except OSError as err:
+        logging.error("No se pudieron crear las carpetas del lote: %s", err)
+        for e in pending:
+            results[id(e)].update(status=STATUS_ERROR, error=str(err))
+        return [results[id(e)] for e in plan]
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="organize") as pool:
+        futures = {}
+        for e in pending:
+            if cancel is not None and cancel.is_set():
+                break
+            futures[pool.submit(_apply_one, e, backup_dir)] = e
+        for future in as_completed(futures):
+            e = futures[future]
+            if future.cancelled():
+                continue
+            try:
+                results[id(e)] = future.result()
+            except Exception as err:
+                logging.error("No se pudo organizar %s → %s: %s", e["source"], e["target"], err)
+                results[id(e)].update(status=STATUS_ERROR, error=str(err))
+            done += 1
+            if progress:
+                progress(done, len(futures))
+            if cancel is not None and cancel.is_set():
+                for f in futures:
+                    f.cancel()
+    if op is not None:
+        for i, e in enumerate(pending):
+            results[id(e)].update(op=op, step=i)
+    return [results[id(e)] for e in plan]
+
+
+def record_batch(results: list[dict], patient_index, history_store, base_dest: str, journal=None) -> int:
+    """
+    Registra los documentos organizados de un lote (resultados de apply_batch): la carpeta en el
+    índice de pacientes (si está construido para base_dest), la línea 'Esperado PDF' del log y la
+    entrada del historial. Con journal, anota cada paso registrado y termina la operación del
+    lote. Devuelve cuántos se registraron.
+    """
+    index_built = patient_index is not None and patient_index.is_built_for(base_dest)
+    n = 0
+    for r in results:
+        if r["status"] != STATUS_OK:
+            continue
+        if index_built:
+            patient_index.add(r["patient"], r["folder"], *r["date_names"])
+        logging.info(
+            "Esperado PDF: %s → %s | Paciente: %s | Fecha: %s/%s/%s",
+            os.path.splitext(os.path.basename(r["target"]))[0] + ".pdf", r["folder"], r["patient"], *r["date_names"]
+        )
+        if history_store is not None:
+            history_store.record(EVENT_ORGANIZED, r["patient"], r["folder"], r["target"])
+        if journal is not None and r.get("op"):
+            journal.step_done(r["op"], r["step"])
+        n += 1
+    if journal is not None:
+        for op in {r["op"] for r in results if r.get("op")}:
+            journal.finish(op)
+    return n
+
+
+def replay_organize(op: dict, patient_index, history_store, base_dest: str) -> int:
+    """
+    Recupera una operación de organizar interrumpida (ver terapias_journal.replay): registra los
+    documentos que sí llegaron a su carpeta pero no se anotaron como registrados. Los que no se
+    movieron siguen en su carpeta de origen. Devuelve cuántos se registraron.
+    """
+    results = [
+        {"status": STATUS_OK, "source": step["de"], "target": step["a"], "patient": step["paciente"],
+         "folder": step["carpeta"], "date_names": tuple(step["fechas"])}
+        for step in op["steps"] if step.get("estado") == STEP_DONE and not step.get("hecho")
+    ]
+    return record_batch(results, patient_index, history_store, base_dest)
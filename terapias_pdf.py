@@ -0,0 +1,371 @@
+"""
+Conversión de .doc/.docx a PDF con backends intercambiables y un grupo de conversores que se
+mantienen abiertos entre conversiones (arrancar Word o LibreOffice cuesta segundos por documento).
+- word: Microsoft Word por COM (pywin32, solo Windows).
+- libreoffice: soffice --headless, con un perfil propio por conversor.
+- fake: escribe un PDF mínimo en el mismo proceso (pruebas y desarrollo en Linux).
+Sin dependencias de GUI.
+"""
+import os
+import sys
+import time
+import queue
+import shutil
+import logging
+import pathlib
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import Future
+
+from terapias_transfer import move_file
+
+PDF_FORMAT_WORD = 17  # wdFormatPDF
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_LIBREOFFICE_TIMEOUT = 120.0
+_SOFFICE_PATHS = [
+    "soffice",
+    "libreoffice",
+    os.path.join(os.environ.get("ProgramFiles", r"C:\Program Files"), "LibreOffice", "program", "soffice.exe"),
+    os.path.join(os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)"), "LibreOffice", "program", "soffice.exe"),
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+]
+
+
+class ConverterBackend:
+    """
+    Un conversor. Cada instancia la crea, usa y cierra un único hilo de ConverterPool, así que
+    puede guardar estado ligado al hilo (p. ej. COM) y reutilizarlo entre conversiones.
+    """
+
+    name = ""
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    def convert(self, doc_path: str, pdf_path: str) -> bool:
+        """Convierte doc_path en pdf_path. Devuelve False si no se pudo."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class WordComBackend(ConverterBackend):
+    """
+    Word por COM: una instancia oculta de Word por conversor, abierta en la primera conversión y
+    reutilizada. Si el documento ya está abierto en el Word del usuario, se guarda desde ahí.
+    """
+
+    name = "word"
+
+    def __init__(self):
+        import pythoncom
+        import win32com.client
+        self._pythoncom = pythoncom
+        self._client = win32com.client
+        pythoncom.CoInitialize()
+        self._word = None
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import win32com.client  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _find_open_document(self, doc_path: str):
+        try:
+            word = self._client.GetActiveObject("Word.Application")
+        except Exception:
+            return None
+        target = doc_path.lower()
+        try:
+            for open_doc in word.Documents:
+                try:
+                    if os.path.abspath(open_doc.FullName).lower() == target:
+                        return open_doc
+                except Exception:
+                    continue
+        except Exception:
+            pass
+        return None
+
+    def _hidden_word(self):
+        if self._word is not None:
+            try:
+                self._word.Documents.Count
+                return self._word
+            except Exception:
+                # Word se cerró o dejó de responder: se abre otro
+                self._word = None
+        word = self._client.DispatchEx("Word.Application")
+        word.Visible = False
+        word.DisplayAlerts = 0
+        self._word = word
+        return word
+
+    def convert(self, doc_path: str, pdf_path: str) -> bool:
+        doc_path = os.path.abspath(doc_path)
+        pdf_path = os.path.abspath(pdf_path)
+        doc = self._find_open_document(doc_path)
+        if doc is None:
+            try:
+                doc = self._hidden_word().Documents.Open(doc_path, ReadOnly=False, AddToRecentFiles=False)
+            except Exception as e:
+                logging.error("Error opening Word: %s", e)
+                self._word = None
+                return False
+        try:
+            doc.SaveAs(pdf_path, FileFormat=PDF_FORMAT_WORD)
+            return True
+        except Exception as e:
+            logging.error("Error saving PDF: %s", e)
+            return False
+        finally:
+            try:
+                doc.Close(SaveChanges=False)
+            except Exception:
+                pass
+
+    def close(self):
+        if self._word is not None:
+            try:
+                self._word.Quit()
+            except Exception:
+                pass
+            self._word = None
+        try:
+            self._pythoncom.CoUninitialize()
+        except Exception:
+            pass
+
+
+def find_soffice(soffice_path: str | None = None) -> str | None:
+    """Ejecutable de LibreOffice: soffice_path si se indica, o el primero que se encuentre."""
+    for path in ([soffice_path] if soffice_path else []) + _SOFFICE_PATHS:
+        if os.path.isabs(path):
+            if os.path.isfile(path):
+                return path
+        else:
+            found = shutil.which(path)
+            if found:
+                return found
+    return None
+
+
+class LibreOfficeBackend(ConverterBackend):
+    """
+    LibreOffice sin ventana. Cada conversor tiene su propio perfil de usuario: se crea en la primera
+    conversión (la más lenta) y se reutiliza, y varios conversores pueden trabajar a la vez
+    (dos soffice no pueden compartir perfil).
+    """
+
+    name = "libreoffice"
+
+    def __init__(self, soffice_path: str | None = None, timeout: float = DEFAULT_LIBREOFFICE_TIMEOUT):
+        self.soffice = find_soffice(soffice_path)
+        if not self.soffice:
+            raise OSError("No se encontró LibreOffice (soffice)")
+        self.timeout = timeout
+        self._workdir = tempfile.mkdtemp(prefix="terapias_lo_")
+        self._profile = pathlib.Path(self._workdir, "perfil").as_uri()
+        self._outdir = os.path.join(self._workdir, "salida")
+
+    @staticmethod
+    def available() -> bool:
+        return find_soffice() is not None
+
+    def convert(self, doc_path: str, pdf_path: str) -> bool:
+        doc_path = os.path.abspath(doc_path)
+        produced = os.path.join(self._outdir, os.path.splitext(os.path.basename(doc_path))[0] + ".pdf")
+        cmd = [
+            self.soffice, f"-env:UserInstallation={self._profile}", "--headless", "--norestore", "--nologo",
+            "--convert-to", "pdf", "--outdir", self._outdir, doc_path,
+        ]
+        flags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+        if os.path.exists(produced):
+            os.remove(produced)
+        try:
+            proc = subprocess.run(cmd, capture_output=True, timeout=self.timeout, creationflags=flags)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logging.error("LibreOffice no pudo convertir %s: %s", doc_path, e)
+            return False
+        if proc.returncode != 0 or not os.path.isfile(produced):
+            logging.error("LibreOffice no pudo convertir %s: %s", doc_path,
+                          proc.stderr.decode(errors="replace").strip() or f"código {proc.returncode}")
+            return False
+        try:
+            move_file(produced, os.path.abspath(pdf_path), overwrite=True)
+            return True
+        except OSError as e:
+            logging.error("Error moviendo el PDF a %s: %s", pdf_path, e)
+            return False
+
+    def close(self):
+        shutil.rmtree(self._workdir, ignore_errors=True)
+
+
+class FakeBackend(ConverterBackend):
+    """Conversor de pruebas: escribe un PDF mínimo tras delay segundos; fail(doc_path) simula fallos."""
+
+    name = "fake"
+
+    def __init__(self, delay: float = 0.0, fail=None):
+        self.delay = delay
+        self.fail = fail
+        self.converted: list[str] = []
+
+    def convert(self, doc_path: str, pdf_path: str) -> bool:
+        if not os.path.isfile(doc_path):
+            return False
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail is not None and self.fail(doc_path):
+            return False
+        with open(pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4\n% " + os.path.basename(doc_path).encode("utf-8") + b"\n%%EOF\n")
+        self.converted.append(doc_path)
+        return True
+
+
+BACKENDS = {
+    WordComBackend.name: WordComBackend,
+    LibreOfficeBackend.name: LibreOfficeBackend,
+    FakeBackend.name: FakeBackend,
+}
+BACKEND_AUTO = "auto"
+
+
+def detect_backend(soffice_path: str | None = None) -> str | None:
+    """Backend disponible en este equipo: Word si hay pywin32, si no LibreOffice. None si ninguno."""
+    if WordComBackend.available():
+        return WordComBackend.name
+    if find_soffice(soffice_path):
+        return LibreOfficeBackend.name
+    return None
+
+
+def backend_factory(name: str = BACKEND_AUTO, soffice_path: str | None = None, **options):
+    """
+    Función sin argumentos que crea un conversor del backend name (word, libreoffice, fake o
+    auto). soffice_path solo se usa con LibreOffice; options se pasan al constructor.
+    ValueError si el backend no existe o, con auto, si no hay ninguno disponible.
+    """
+    if name == BACKEND_AUTO:
+        name = detect_backend(soffice_path)
+        if name is None:
+            raise ValueError("No hay ningún conversor a PDF disponible (Word o LibreOffice)")
+    cls = BACKENDS.get(name)
+    if cls is None:
+        raise ValueError(f"Conversor a PDF desconocido: {name}")
+    if cls is LibreOfficeBackend:
+        options["soffice_path"] = soffice_path
+    return lambda: cls(**options)
+
+
+class ConverterPool:
+    """
+    Hasta size hilos, cada uno con su conversor; se abre otro solo si los que hay están ocupados.
+    El conversor se crea con la primera conversión del hilo, se reutiliza en las siguientes y se
+    cierra tras idle_timeout segundos sin trabajo (se vuelve a crear si llega otro documento).
+    Si una conversión lanza una excepción, ese conversor se descarta.
+    """
+
+    def __init__(self, factory, size: int = 1, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self._factory = factory
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self._queue: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._idle = 0
+        self.backends_created = 0
+
+    def submit(self, doc_path: str, pdf_path: str) -> Future:
+        """Encola una conversión; el Future da True/False al terminar."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ConverterPool cerrado")
+            self._queue.put((doc_path, pdf_path, future))
+            # Solo se abre otro conversor si los que hay están ocupados
+            if self._queue.qsize() > self._idle and len(self._threads) < self.size:
+                thread = threading.Thread(target=self._worker, name=f"pdf-{len(self._threads) + 1}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+    def convert(self, doc_path: str, pdf_path: str, timeout: float | None = None) -> bool:
+        """Convierte y espera el resultado. False si falla, se cancela o se agota timeout."""
+        try:
+            return self.submit(doc_path, pdf_path).result(timeout)
+        except Exception as e:
+            logging.error("PDF conversion error: %s", e)
+            return False
+
+    def _worker(self):
+        backend = None
+        try:
+            while True:
+                with self._lock:
+                    self._idle += 1
+                try:
+                    item = self._queue.get(timeout=self.idle_timeout if backend is not None else None)
+                except queue.Empty:
+                    backend.close()
+                    backend = None
+                    continue
+                finally:
+                    with self._lock:
+                        self._idle -= 1
+                if item is None:
+                    return
+                doc_path, pdf_path, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if backend is None:
+                        backend = self._factory()
+                        with self._lock:
+                            self.backends_created += 1
+                    ok = backend.convert(doc_path, pdf_path)
+                except Exception as e:
+                    logging.error("PDF conversion error (%s): %s", doc_path, e)
+                    ok = False
+                    if backend is not None:
+                        try:
+                            backend.close()
+                        except Exception:
+                            pass
+                        backend = None
+                future.set_result(ok)
+        finally:
+            if backend is not None:
+                try:
+                    backend.close()
+                except Exception as e:
+                    logging.warning("Error cerrando conversor a PDF: %s", e)
+
+    def close(self, wait: bool = False):
+        """Cancela las conversiones pendientes y cierra los conversores (al terminar la que esté en curso)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[2].cancel()
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
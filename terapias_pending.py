@@ -0,0 +1,183 @@
+"""
+Documentos a la espera de su PDF. Al organizar un documento y abrirlo en Word se anota el PDF que
+se espera en la carpeta del paciente; un hilo revisa cada pocos segundos solo las carpetas con
+documentos pendientes (un scandir por carpeta) y, cuando el PDF aparece, registra el historial y
+mueve el documento a respaldo sin esperar a «Finalizar (PDF)». Puede haber muchos a la vez.
+Sin dependencias de GUI.
+"""
+import os
+import time
+import logging
+import datetime
+import threading
+
+from terapias_convert import backup_converted, find_pending_docs, pdf_path_for
+from terapias_history import EVENT_PDF
+
+DEFAULT_INTERVAL = 3.0
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _scan_files(folder: str) -> dict[str, tuple[int, float]]:
+    """{nombre en normcase: (tamaño, fecha de modificación)} de los archivos de folder ({} si no se puede leer)."""
+    files = {}
+    try:
+        with os.scandir(folder) as it:
+            for e in it:
+                try:
+                    if e.is_file():
+                        st = e.stat()
+                        files[os.path.normcase(e.name)] = (st.st_size, st.st_mtime)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files
+
+
+class PendingPdfTracker:
+    """
+    Documentos pendientes de PDF. Cada entrada es un dict con doc, pdf, patient y since (time.time()
+    al anotarla). El PDF se da por terminado cuando es posterior a since y tiene el mismo tamaño
+    (no vacío) en dos pasadas seguidas: un PDF anterior con ese nombre no es el de este documento.
+    Si el documento sigue abierto en Word y no se puede mover, se reintenta en la siguiente.
+    on_finalized(entradas) se llama desde el hilo de sondeo con las entradas ya finalizadas
+    (con backup, la ruta en respaldo).
+    """
+
+    def __init__(self, backup_dir: str, on_finalized=None, history_store=None, interval: float = DEFAULT_INTERVAL, journal=None):
+        self.backup_dir = backup_dir
+        self.on_finalized = on_finalized
+        self.history_store = history_store
+        self.journal = journal
+        self.interval = interval
+        self._pending: dict[str, dict] = {}
+        self._sizes: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def expect(self, doc_path: str, pdf_path: str | None = None, patient: str = "", since: float | None = None) -> dict:
+        """
+        Anota que doc_path espera pdf_path (por defecto, el mismo nombre con .pdf). since (por
+        defecto, ahora) es desde cuándo cuenta un PDF como suyo; al volver a anotar una entrada
+        se pasa la suya.
+        """
+        entry = {"doc": doc_path, "pdf": pdf_path or pdf_path_for(doc_path), "patient": patient,
+                 "since": time.time() if since is None else since}
+        with self._lock:
+            self._pending[_key(doc_path)] = entry
+        return entry
+
+    def forget(self, doc_path: str):
+        with self._lock:
+            self._pending.pop(_key(doc_path), None)
+            self._sizes.pop(_key(doc_path), None)
+
+    def get(self, doc_path: str) -> dict | None:
+        """Copia de la entrada de doc_path, o None si no está pendiente."""
+        with self._lock:
+            entry = self._pending.get(_key(doc_path))
+            return dict(entry) if entry is not None else None
+
+    def is_pending(self, doc_path: str) -> bool:
+        return self.get(doc_path) is not None
+
+    def pending(self) -> list[dict]:
+        """Entradas pendientes, de la más antigua a la más reciente."""
+        with self._lock:
+            entries = [dict(e) for e in self._pending.values()]
+        return sorted(entries, key=lambda e: e["since"])
+
+    def adopt(self, base_dest: str, meses: dict, date_from: datetime.date | None = None, date_to: datetime.date | None = None) -> int:
+        """
+        Anota los .doc/.docx que siguen en las carpetas de paciente del periodo (p. ej. organizados
+        antes de cerrar la app). Su PDF cuenta desde la fecha del documento: pudo guardarse con la
+        app cerrada. Devuelve cuántos se añadieron.
+        """
+        added = 0
+        for doc_path, patient in find_pending_docs(base_dest, meses, date_from, date_to):
+            if not self.is_pending(doc_path):
+                try:
+                    since = os.path.getmtime(doc_path)
+                except OSError:
+                    continue
+                self.expect(doc_path, patient=patient, since=since)
+                added += 1
+        return added
+
+    def poll(self) -> list[dict]:
+        """Una pasada: finaliza los documentos cuyo PDF ya está completo. Devuelve esas entradas."""
+        with self._poll_lock:
+            with self._lock:
+                entries = list(self._pending.values())
+            by_folder: dict[str, list[dict]] = {}
+            for entry in entries:
+                by_folder.setdefault(os.path.dirname(os.path.abspath(entry["pdf"])), []).append(entry)
+            finalized = []
+            for folder, items in by_folder.items():
+                files = _scan_files(folder)
+                for entry in items:
+                    result = self._check(entry, folder, files)
+                    if result is not None:
+                        finalized.append(result)
+        if finalized and self.on_finalized is not None:
+            self.on_finalized(finalized)
+        return finalized
+
+    def _check(self, entry: dict, folder: str, files: dict[str, tuple[int, float]]) -> dict | None:
+        key = _key(entry["doc"])
+        doc_dir = os.path.dirname(os.path.abspath(entry["doc"]))
+        doc_exists = os.path.normcase(os.path.basename(entry["doc"])) in files if doc_dir == folder else os.path.exists(entry["doc"])
+        if not doc_exists:
+            # Ya se finalizó de otra forma (Finalizar, PDF del día) o se movió a mano
+            self.forget(entry["doc"])
+            return None
+        size, mtime = files.get(os.path.normcase(os.path.basename(entry["pdf"])), (0, 0.0))
+        if mtime < entry["since"]:
+            # PDF anterior con el mismo nombre: no es el de este documento
+            size = 0
+        with self._lock:
+            previous = self._sizes.get(key)
+            if not size:
+                self._sizes.pop(key, None)
+                return None
+            if size != previous:
+                # Visto por primera vez o aún creciendo: se confirma en la siguiente pasada
+                self._sizes[key] = size
+                return None
+            if key not in self._pending:
+                # Se quitó mientras tanto (p. ej. Finalizar a mano lo está convirtiendo)
+                return None
+        try:
+            backup = backup_converted(entry["doc"], self.backup_dir, self.journal)
+        except OSError as e:
+            if not entry.get("locked"):
+                entry["locked"] = True
+                logging.info("PDF listo pero %s sigue abierto, se reintentará: %s", entry["doc"], e)
+            return None
+        self.forget(entry["doc"])
+        if self.history_store is not None:
+            self.history_store.record(EVENT_PDF, entry["patient"], os.path.dirname(entry["pdf"]), entry["pdf"])
+        logging.info("PDF detectado: %s; documento movido a respaldo: %s", entry["pdf"], backup)
+        return {**entry, "backup": backup}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="pdf-pending", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self._pending:
+                continue
+            try:
+                self.poll()
+            except Exception as e:
+                logging.error("Error revisando PDF pendientes: %s", e)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,138 @@
+"""
+Mover y copiar archivos de forma segura entre discos o carpetas de red. En el mismo disco mover
+es un renombrado; entre discos se copia por bloques grandes a un archivo parcial (con progreso),
+se comprueba el SHA-256 de la copia contra el del original y solo entonces se borra el original.
+Si la copia se corta (red caída, app cerrada), el siguiente intento continúa desde donde quedó.
+Sin dependencias de GUI.
+"""
+import os
+import shutil
+import hashlib
+import threading
+
+DEFAULT_CHUNK = 4 * 1024 * 1024
+PARTIAL_SUFFIX = ".parcial"
+
+
+class TransferCancelled(Exception):
+    """Se canceló la copia; el archivo parcial se conserva para continuar después."""
+
+
+def _partial_path(src: str, dst: str, st: os.stat_result) -> str:
+    """
+    Archivo parcial de copiar src (en su versión actual) a dst. Nombre corto y fijo para no alargar
+    la ruta; si src cambia, el nombre cambia y no se continúa una copia de otra versión.
+    """
+    key = f"{os.path.normcase(os.path.abspath(src))}|{st.st_size}|{st.st_mtime_ns}|{os.path.normcase(os.path.abspath(dst))}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(os.path.dirname(os.path.abspath(dst)), f".~{digest}{PARTIAL_SUFFIX}")
+
+
+def file_sha256(path: str, chunk_size: int = DEFAULT_CHUNK, cancel: threading.Event | None = None) -> str:
+    """SHA-256 de path leído por bloques."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise TransferCancelled(path)
+            block = f.read(chunk_size)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+def copy_file(
+    src: str,
+    dst: str,
+    progress=None,
+    cancel: threading.Event | None = None,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> str:
+    """
+    Copia src en dst (sobrescribe dst) con sus fechas y devuelve el SHA-256 del contenido.
+    Escribe en un parcial junto a dst que se continúa si quedó de un intento anterior; al terminar
+    relee la copia y, si no coincide con el original, la borra y lanza OSError. progress(bytes,
+    total) se llama tras cada bloque. Con cancel activado lanza TransferCancelled.
+    """
+    st = os.stat(src)
+    total = st.st_size
+    partial = _partial_path(src, dst, st)
+    try:
+        done = os.path.getsize(partial)
+    except OSError:
+        done = 0
+    if done > total:
+        done = 0
+    h = hashlib.sha256()
+    with open(src, "rb") as fin, open(partial, "r+b" if done else "wb") as fout:
+        # Lo ya copiado no se vuelve a escribir, pero el hash del original se calcula entero
+        remaining = done
+        while remaining:
+            block = fin.read(min(chunk_size, remaining))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+        fout.seek(done)
+        fout.truncate()
+        if progress and done:
+            progress(done, total)
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise TransferCancelled(src)
+            block = fin.read(chunk_size)
+            if not block:
+                break
+            h.update(block)
+            fout.write(block)
+            done += len(block)
+            if progress:
+                progress(done, total)
+        fout.flush()
+        os.fsync(fout.fileno())
+    expected = h.hexdigest()
+    if file_sha256(partial, chunk_size, cancel) != expected:
+        os.remove(partial)
+        raise OSError(f"La copia de {src} no coincide con el original")
+    shutil.copystat(src, partial)
+    os.replace(partial, dst)
+    return expected
+
+
+def move_file(
+    src: str,
+    dst: str,
+    progress=None,
+    cancel: threading.Event | None = None,
+    chunk_size: int = DEFAULT_CHUNK,
+    overwrite: bool = False,
+) -> str | None:
+    """
+    Mueve src a dst (que no debe existir, salvo con overwrite). En el mismo disco renombra y
+    devuelve None; entre discos copia con copy_file, borra el original y devuelve el SHA-256. Si el
+    original no se puede borrar (abierto en Word) se quita la copia y se lanza OSError: el
+    documento queda solo en su sitio.
+    """
+    if not overwrite and os.path.exists(dst):
+        raise FileExistsError(f"Ya existe {dst}")
+    try:
+        if overwrite:
+            os.replace(src, dst)
+        else:
+            os.rename(src, dst)
+        return None
+    except (PermissionError, FileExistsError, FileNotFoundError):
+        raise
+    except OSError:
+        pass
+    digest = copy_file(src, dst, progress, cancel, chunk_size)
+    try:
+        os.remove(src)
+    except OSError:
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+        raise
+    return digest
@@ -0,0 +1,132 @@
+"""
+Recorrido de la estructura AÑO/MES/DÍA/PACIENTE con os.scandir.
+Usa el tipo que trae cada DirEntry (sin stat extra por entrada) y reparte los meses entre
+un grupo acotado de hilos, lo que acelera mucho el recorrido en carpetas de red.
+Sin dependencias de GUI.
+"""
+import os
+import datetime
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from terapias_logic import parse_year_folder, parse_month_folder, parse_day_folder
+
+DEFAULT_WORKERS = 8
+
+
+def _scan_dirs(path: str) -> list[tuple[str, str]]:
+    """Subcarpetas de path como [(nombre, ruta)]; lista vacía si no se puede leer."""
+    try:
+        with os.scandir(path) as it:
+            return [(e.name, e.path) for e in it if e.is_dir()]
+    except OSError as e:
+        logging.warning("No se pudo leer %s: %s", path, e)
+        return []
+
+
+def _scan_month(year: str, month: str, month_path: str, day_range: tuple[int, int] | None = None) -> list[tuple[str, str, str, str, str]]:
+    out = []
+    for day, day_path in _scan_dirs(month_path):
+        if day_range is not None:
+            d = parse_day_folder(day)
+            if d is None or not day_range[0] <= d <= day_range[1]:
+                continue
+        for patient, patient_path in _scan_dirs(day_path):
+            out.append((patient, patient_path, year, month, day))
+    return out
+
+
+def _month_tasks(years, month_lists, date_from, date_to, meses):
+    """(año, mes, ruta_mes, rango_de_días) de los meses que caen dentro del rango."""
+    for (year, _), months in zip(years, month_lists):
+        y = parse_year_folder(year) if date_from or date_to else None
+        for month, month_path in months:
+            if not (date_from or date_to):
+                yield year, month, month_path, None
+                continue
+            m = parse_month_folder(month, meses)
+            if m is None:
+                continue
+            first_day, last_day = 1, 31
+            if date_from and (y, m) < (date_from.year, date_from.month):
+                continue
+            if date_to and (y, m) > (date_to.year, date_to.month):
+                continue
+            if date_from and (y, m) == (date_from.year, date_from.month):
+                first_day = date_from.day
+            if date_to and (y, m) == (date_to.year, date_to.month):
+                last_day = date_to.day
+            yield year, month, month_path, (first_day, last_day)
+
+
+def iter_patient_folders(
+    base_dest: str,
+    max_workers: int = DEFAULT_WORKERS,
+    cancel: threading.Event | None = None,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    meses: dict | None = None,
+):
+    """
+    Produce (paciente, ruta, año, mes, día) por cada carpeta de paciente bajo base_dest.
+    Los resultados llegan según termina cada mes (sin orden garantizado). Si el consumidor
+    deja de iterar o se activa cancel, los meses pendientes se cancelan.
+    Con date_from/date_to (requiere meses) solo se listan los años, meses y días del rango:
+    el resto de carpetas ni siquiera se abre.
+    """
+    if (date_from or date_to) and not meses:
+        raise ValueError("iter_patient_folders: el filtro por fechas necesita meses")
+    years = _scan_dirs(base_dest)
+    if date_from or date_to:
+        lo = date_from.year if date_from else 0
+        hi = date_to.year if date_to else 9999
+        years = [(y, p) for y, p in years if (n := parse_year_folder(y)) is not None and lo <= n <= hi]
+    if not years or (cancel is not None and cancel.is_set()):
+        return
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="walk")
+    try:
+        month_lists = executor.map(_scan_dirs, [path for _, path in years])
+        futures = [
+            executor.submit(_scan_month, year, month, month_path, day_range)
+            for year, month, month_path, day_range in _month_tasks(years, month_lists, date_from, date_to, meses)
+        ]
+        for future in as_completed(futures):
+            if cancel is not None and cancel.is_set():
+                return
+            yield from future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def folder_depth(base_dest: str, path: str) -> int | None:
+    """Nivel de path bajo base_dest: 0 raíz, 1 año, 2 mes, 3 día, 4 paciente. None si está fuera."""
+    rel = os.path.relpath(os.path.normpath(path), os.path.normpath(base_dest))
+    if rel == os.curdir:
+        return 0
+    if rel.startswith(os.pardir) or os.path.isabs(rel):
+        return None
+    return len(rel.split(os.sep))
+
+
+def iter_patient_folders_under(base_dest: str, path: str):
+    """
+    Como iter_patient_folders, pero solo bajo path (la raíz, un año, un mes o un día de base_dest).
+    Sirve para volver a leer únicamente la parte del árbol que cambió.
+    """
+    depth = folder_depth(base_dest, path)
+    if depth is None or depth > 3:
+        return
+    if depth == 0:
+        yield from iter_patient_folders(base_dest)
+        return
+    parts = os.path.relpath(os.path.normpath(path), os.path.normpath(base_dest)).split(os.sep)
+    if depth == 3:
+        year, month, day = parts
+        for patient, patient_path in _scan_dirs(path):
+            yield patient, patient_path, year, month, day
+    elif depth == 2:
+        yield from _scan_month(parts[0], parts[1], path)
+    else:
+        for month, month_path in _scan_dirs(path):
+            yield from _scan_month(parts[0], month, month_path)
@@ -0,0 +1,304 @@
+"""
+Vigilancia de la carpeta Destino para mantener el índice de pacientes al día sin recorridos completos.
+- Linux (disco local): inotify mediante ctypes, un watch por carpeta raíz/año/mes/día.
+- Resto (Windows, carpetas de red): sondeo barato del mtime de esas carpetas; crear, borrar o
+  renombrar una subcarpeta cambia el mtime de la carpeta que la contiene.
+Los cambios se agrupan (debounce) y se entregan por lotes como un conjunto de carpetas a releer.
+Sin dependencias de GUI.
+"""
+import os
+import sys
+import time
+import errno
+import ctypes
+import select
+import struct
+import logging
+import threading
+
+# Profundidad máxima vigilada bajo la raíz: 0 raíz, 1 año, 2 mes, 3 día
+_MAX_DEPTH = 3
+_NETWORK_FS = ("cifs", "smb3", "smbfs", "nfs", "nfs4", "fuse.sshfs", "9p", "afs")
+
+
+class ChangeBatcher:
+    """
+    Acumula carpetas cambiadas y llama a callback(carpetas) cuando llevan quiet segundos sin
+    cambios nuevos (o como mucho max_delay segundos después del primer cambio pendiente).
+    """
+
+    def __init__(self, callback, quiet: float = 2.0, max_delay: float = 10.0):
+        self.callback = callback
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self._pending: set[str] = set()
+        self._first = 0.0
+        self._last = 0.0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="watch-batch", daemon=True)
+        self._thread.start()
+
+    def add(self, paths):
+        with self._cond:
+            now = time.monotonic()
+            if not self._pending:
+                self._first = now
+            self._pending.update(paths)
+            self._last = now
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._pending:
+                        now = time.monotonic()
+                        due = min(self._last + self.quiet, self._first + self.max_delay)
+                        if now >= due:
+                            break
+                        self._cond.wait(due - now)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                batch, self._pending = self._pending, set()
+            try:
+                self.callback(batch)
+            except Exception as e:
+                logging.error("Error aplicando cambios de carpetas: %s", e)
+
+
+def _subdirs(path: str) -> list[str]:
+    try:
+        with os.scandir(path) as it:
+            return [e.path for e in it if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
+
+
+class PollingWatcher:
+    """Sondea el mtime de las carpetas raíz/año/mes/día cada interval segundos."""
+
+    def __init__(self, base_dest: str, on_changes, interval: float = 15.0):
+        self.base_dest = os.path.normpath(base_dest)
+        self.on_changes = on_changes
+        self.interval = interval
+        self._mtimes: dict[str, int] = {}
+        self._depths: dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _track(self, path: str, depth: int):
+        """Registra path y, si no es un día, sus subcarpetas."""
+        try:
+            self._mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        self._depths[path] = depth
+        if depth < _MAX_DEPTH:
+            for sub in _subdirs(path):
+                self._track(sub, depth + 1)
+
+    def _untrack(self, path: str):
+        prefix = path + os.sep
+        for p in [p for p in self._mtimes if p == path or p.startswith(prefix)]:
+            del self._mtimes[p]
+            del self._depths[p]
+
+    def poll(self) -> set[str]:
+        """Una pasada: devuelve las carpetas cuyo contenido cambió desde la pasada anterior."""
+        changed = set()
+        for path in list(self._mtimes):
+            if path not in self._mtimes:
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                self._untrack(path)
+                changed.add(os.path.dirname(path) if path != self.base_dest else path)
+                continue
+            if mtime == self._mtimes[path]:
+                continue
+            self._mtimes[path] = mtime
+            changed.add(path)
+            depth = self._depths[path]
+            if depth < _MAX_DEPTH:
+                known = {p for p in self._mtimes if os.path.dirname(p) == path}
+                current = set(_subdirs(path))
+                for sub in current - known:
+                    self._track(sub, depth + 1)
+                for sub in known - current:
+                    self._untrack(sub)
+        return changed
+
+    def start(self):
+        self._track(self.base_dest, 0)
+        self._thread = threading.Thread(target=self._run, name="watch-poll", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            changed = self.poll()
+            if changed:
+                self.on_changes(changed)
+
+    def stop(self):
+        self._stop.set()
+
+
+class InotifyWatcher:
+    """inotify (Linux): un watch por carpeta raíz/año/mes/día; los eventos llegan al instante."""
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    _MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, base_dest: str, on_changes):
+        self.base_dest = os.path.normpath(base_dest)
+        self.on_changes = on_changes
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._paths: dict[int, tuple[str, int]] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _add_watch(self, path: str, depth: int):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self._MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err != errno.ENOENT:
+                logging.warning("inotify: no se pudo vigilar %s: %s", path, os.strerror(err))
+            return
+        self._paths[wd] = (path, depth)
+        if depth < _MAX_DEPTH:
+            for sub in _subdirs(path):
+                self._add_watch(sub, depth + 1)
+
+    def start(self):
+        self._add_watch(self.base_dest, 0)
+        self._thread = threading.Thread(target=self._run, name="watch-inotify", daemon=True)
+        self._thread.start()
+
+    def _read_events(self) -> set[str]:
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].split(b"\0", 1)[0]
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                # Se perdieron eventos: releer todo
+                changed.add(self.base_dest)
+                continue
+            watched = self._paths.get(wd)
+            if watched is None:
+                continue
+            path, depth = watched
+            if mask & self.IN_IGNORED:
+                del self._paths[wd]
+                continue
+            if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                changed.add(os.path.dirname(path) if depth else path)
+                continue
+            if not mask & self.IN_ISDIR:
+                continue
+            changed.add(path)
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO) and depth < _MAX_DEPTH:
+                self._add_watch(os.path.join(path, os.fsdecode(name)), depth + 1)
+        return changed
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([self._fd], [], [], 0.5)
+                if ready:
+                    changed = self._read_events()
+                    if changed:
+                        self.on_changes(changed)
+        finally:
+            os.close(self._fd)
+
+    def stop(self):
+        self._stop.set()
+
+
+def is_network_path(path: str) -> bool:
+    """True si path está en una carpeta de red (UNC, unidad de red o montaje CIFS/NFS)."""
+    path = os.path.abspath(path)
+    if sys.platform == "win32":
+        if path.startswith("\\\\"):
+            return True
+        try:
+            DRIVE_REMOTE = 4
+            return ctypes.windll.kernel32.GetDriveTypeW(os.path.splitdrive(path)[0] + "\\") == DRIVE_REMOTE
+        except Exception:
+            return False
+    try:
+        best, fstype = "", ""
+        with open("/proc/mounts", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 3:
+                    mount = fields[1].replace("\\040", " ")
+                    if (path == mount or path.startswith(mount.rstrip("/") + "/")) and len(mount) > len(best):
+                        best, fstype = mount, fields[2]
+        return fstype in _NETWORK_FS
+    except OSError:
+        return False
+
+
+class FolderWatcher:
+    """
+    Vigilante de base_dest: elige inotify o sondeo y agrupa los cambios antes de entregarlos a
+    on_batch(carpetas). Mientras no se llame a stop() sigue funcionando en hilos de fondo.
+    """
+
+    def __init__(self, base_dest: str, on_batch, quiet: float = 2.0, poll_interval: float = 15.0, use_inotify: bool | None = None):
+        self.base_dest = base_dest
+        self._batcher = ChangeBatcher(on_batch, quiet=quiet)
+        if use_inotify is None:
+            use_inotify = sys.platform.startswith("linux") and not is_network_path(base_dest)
+        self._backend = None
+        if use_inotify:
+            try:
+                self._backend = InotifyWatcher(base_dest, self._batcher.add)
+            except (OSError, AttributeError) as e:
+                logging.warning("inotify no disponible, se usa sondeo: %s", e)
+        if self._backend is None:
+            self._backend = PollingWatcher(base_dest, self._batcher.add, interval=poll_interval)
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if isinstance(self._backend, InotifyWatcher) else "sondeo"
+
+    def start(self):
+        self._backend.start()
+        logging.info("Vigilando %s (%s)", self.base_dest, self.backend)
+
+    def stop(self):
+        self._backend.stop()
+        self._batcher.stop()
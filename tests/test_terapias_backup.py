@@ -0,0 +1,242 @@
+"""
+Tests del almacén de respaldo por contenido (terapias_backup.py).
+"""
+import os
+import shutil
+import datetime
+import tempfile
+import zipfile
+import unittest
+from unittest import mock
+
+from terapias_backup import (
+    BackupStore, parse_legacy_name, name_key, OBJECTS_DIR_NAME, ARCHIVES_DIR_NAME, CATALOG_FILE_NAME,
+)
+
+
+class TestAlmacenRespaldo(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_backup_")
+        self.backup = os.path.join(self.temp_dir, "RESPALDO")
+        self.store = BackupStore(self.backup)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def _blobs(self):
+        return [f for _, _, files in os.walk(os.path.join(self.backup, OBJECTS_DIR_NAME)) for f in files]
+
+    def test_duplicados_no_ocupan(self):
+        a = self.store.store(self._write("SS Juan Pérez.docx", "mismo"))
+        b = self.store.store(self._write("SS Ana.docx", "mismo"))
+        c = self.store.store(self._write("SS Luis.docx", "otro"))
+        self.assertFalse(a["duplicate"])
+        self.assertTrue(b["duplicate"])
+        self.assertEqual(a["blob"], b["blob"])
+        self.assertNotEqual(a["blob"], c["blob"])
+        self.assertEqual(len(self._blobs()), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "SS Ana.docx")))
+        stats = self.store.stats()
+        self.assertEqual((stats["copias"], stats["objetos"], stats["ahorrado"]), (3, 2, len("mismo")))
+        self.assertEqual([e["id"] for e in self.store.find_hash(a["hash"])], [b["id"], a["id"]])
+        self.assertEqual(self.store.find_hash("0" * 64), [])
+
+    def test_copiar_deja_el_original(self):
+        path = self._write("a.docx", "x")
+        entry = self.store.store(path, move=False, name="SS Ana.docx")
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(self.store.find("ss ana")[0]["id"], entry["id"])
+
+    def test_buscar_por_nombre(self):
+        self.store.store(self._write("SS Juan Pérez.docx", "1"), when=datetime.datetime(2026, 1, 1))
+        self.store.store(self._write("SS Juan Pérez.docx", "2"), when=datetime.datetime(2026, 1, 2))
+        self.store.store(self._write("SS Juan Pérez_1.docx", "3"))
+        found = self.store.find("ss juan perez.DOCX")
+        self.assertEqual([e["timestamp"][:10] for e in found], ["2026-01-02", "2026-01-01"])
+        self.assertEqual(len(self.store.find("SS Juan", prefix=True)), 3)
+        self.assertEqual(self.store.find("nadie"), [])
+
+    def test_restaurar(self):
+        entry = self.store.store(self._write("SS Ana.docx", "contenido"))
+        dest = os.path.join(self.temp_dir, "restaurado")
+        first = self.store.restore(entry, dest)
+        second = self.store.restore(entry, dest)
+        self.assertEqual(os.path.basename(first), "SS Ana.docx")
+        self.assertEqual(os.path.basename(second), "SS Ana_1.docx")
+        with open(second, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "contenido")
+
+    def test_bloqueado_no_se_toca(self):
+        path = self._write("SS Ana.docx", "x")
+        with mock.patch("terapias_backup.os.replace", side_effect=PermissionError("abierto en Word")):
+            with self.assertRaises(OSError):
+                self.store.store(path)
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(self.store.stats()["copias"], 0)
+
+    def test_entre_discos(self):
+        path = self._write("SS Ana.docx", "x")
+        real_replace = os.replace
+
+        def replace(src, dst):
+            if src == path:
+                raise OSError(18, "otro disco")
+            return real_replace(src, dst)
+
+        with mock.patch("terapias_backup.os.replace", side_effect=replace):
+            entry = self.store.store(path)
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.isfile(entry["blob"]))
+
+    def test_importar_respaldo_plano(self):
+        os.makedirs(self.backup)
+        for name in ("20260105_101500_SS Ana.docx", "SS Luis_20260106_090000.doc", "suelto.docx"):
+            with open(os.path.join(self.backup, name), "w", encoding="utf-8") as f:
+                f.write(name)
+        self.assertEqual(self.store.import_flat(), 3)
+        self.assertEqual(sorted(os.listdir(self.backup)), sorted([CATALOG_FILE_NAME, OBJECTS_DIR_NAME]))
+        self.assertEqual(self.store.find("SS Luis")[0]["timestamp"], "2026-01-06 09:00:00")
+        self.assertEqual(len(self.store.find("suelto")), 1)
+        self.assertEqual(self.store.import_flat(), 0)
+
+    def test_nombres_antiguos(self):
+        self.assertEqual(parse_legacy_name("20260105_101500_SS J. Pérez.docx"),
+                         ("SS J. Pérez.docx", datetime.datetime(2026, 1, 5, 10, 15)))
+        self.assertEqual(parse_legacy_name("SS Ana_1_20260105_101500_2.docx")[0], "SS Ana_1.docx")
+        self.assertEqual(parse_legacy_name("otro.docx"), ("otro.docx", None))
+        self.assertEqual(name_key("SS Pérez_1.DOCX"), "ss perez 1")
+
+
+class TestCompactarRespaldo(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_backup_zip_")
+        self.backup = os.path.join(self.temp_dir, "RESPALDO")
+        self.store = BackupStore(self.backup)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _store(self, name, content, when):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return self.store.store(path, when=when)
+
+    def test_empaquetar_por_mes(self):
+        viejos = [self._store(f"SS Ana {i}.doc", "texto " * 100 + str(i), datetime.datetime(2025, 1 + i % 2, 10)) for i in range(4)]
+        nuevo = self._store("SS Luis.docx", "nuevo", datetime.datetime.now())
+        calls = []
+        stats = self.store.compact(30, progress=lambda done, total: calls.append((done, total)))
+        self.assertEqual((stats["archivados"], stats["meses"]), (4, 2))
+        self.assertEqual(calls[-1], (4, 4))
+        self.assertEqual(sorted(os.listdir(os.path.join(self.backup, ARCHIVES_DIR_NAME))), ["2025-01.zip", "2025-02.zip"])
+        for v in viejos:
+            self.assertFalse(os.path.exists(v["blob"]))
+        self.assertTrue(os.path.isfile(nuevo["blob"]))
+        self.assertEqual(self.store.stats()["archivados"], 4)
+        with zipfile.ZipFile(os.path.join(self.backup, ARCHIVES_DIR_NAME, "2025-01.zip")) as zf:
+            info = zf.infolist()[0]
+            self.assertEqual(info.compress_type, zipfile.ZIP_DEFLATED)
+            self.assertLess(info.compress_size, info.file_size)
+        # Una segunda pasada no tiene nada que hacer
+        self.assertEqual(self.store.compact(30)["archivados"], 0)
+
+    def test_restaurar_desde_zip(self):
+        self._store("SS Ana.docx", "primero", datetime.datetime(2025, 3, 1))
+        self.store.compact(30)
+        self._store("SS Luis.docx", "segundo", datetime.datetime(2025, 3, 2))
+        self.store.compact(30)
+        entry = self.store.find("SS Ana")[0]
+        self.assertTrue(entry["blob"].endswith("2025-03.zip"))
+        target = self.store.restore(entry, os.path.join(self.temp_dir, "restaurado"))
+        with open(target, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "primero")
+        # Mismo contenido que uno ya archivado: no se vuelve a guardar suelto
+        dup = self._store("SS Ana otra vez.docx", "primero", datetime.datetime.now())
+        self.assertTrue(dup["duplicate"])
+        self.assertEqual(dup["member"], entry["member"])
+
+    def test_corte_a_medias_no_estropea(self):
+        self._store("SS Ana.docx", "a", datetime.datetime(2025, 3, 1))
+        self.store.compact(30)
+        self._store("SS Luis.docx", "b", datetime.datetime(2025, 3, 2))
+        path = os.path.join(self.backup, ARCHIVES_DIR_NAME, "2025-03.zip")
+        with open(path, "rb") as f:
+            before = f.read()
+        with mock.patch("terapias_backup.shutil.copyfileobj", side_effect=OSError("red caída")):
+            self.assertEqual(self.store.compact(30)["archivados"], 0)
+        entry = self.store.find("SS Luis")[0]
+        self.assertIsNone(entry["member"])
+        self.assertTrue(os.path.isfile(entry["blob"]))
+        self.assertEqual(os.listdir(os.path.join(self.backup, ARCHIVES_DIR_NAME)), ["2025-03.zip"])
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(self.store.compact(30)["archivados"], 1)
+
+    def test_recuperar_zip_tras_cierre(self):
+        self._store("SS Ana.docx", "a", datetime.datetime(2025, 3, 1))
+        self.store.compact(30)
+        path = os.path.join(self.backup, ARCHIVES_DIR_NAME, "2025-03.zip")
+        with zipfile.ZipFile(path) as zf:
+            start_dir = zf.start_dir
+        with open(path, "rb") as f:
+            before = f.read()
+        # Cierre mientras se añadía: directorio central guardado y el ZIP cortado tras él
+        with open(os.path.join(self.backup, ARCHIVES_DIR_NAME, ".2025-03.zip.cola"), "wb") as f:
+            f.write(start_dir.to_bytes(8, "little") + before[start_dir:])
+        with open(path, "r+b") as f:
+            f.seek(start_dir)
+            f.write(b"PK\x03\x04 a medias")
+            f.truncate()
+        self._store("SS Luis.docx", "b", datetime.datetime(2025, 3, 2))
+        self.assertEqual(self.store.compact(30)["archivados"], 1)
+        self.assertEqual(os.listdir(os.path.join(self.backup, ARCHIVES_DIR_NAME)), ["2025-03.zip"])
+        for name, content in (("SS Ana", "a"), ("SS Luis", "b")):
+            target = self.store.restore(self.store.find(name)[0], os.path.join(self.temp_dir, "restaurado"))
+            with open(target, encoding="utf-8") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_anadir_no_reescribe_el_mes(self):
+        self._store("SS Ana.docx", "a" * 5000, datetime.datetime(2025, 3, 1))
+        self.store.compact(30)
+        path = os.path.join(self.backup, ARCHIVES_DIR_NAME, "2025-03.zip")
+        with zipfile.ZipFile(path) as zf:
+            start_dir = zf.start_dir
+        with open(path, "rb") as f:
+            before = f.read()
+        # Ya en el ZIP pero sin anotar en el catálogo (p. ej. falló al guardarlo): solo se anota
+        conn = self.store._connect()
+        with conn:
+            conn.execute("UPDATE objetos SET archivo = NULL")
+        conn.close()
+        with mock.patch("terapias_backup.zipfile.ZipFile", wraps=zipfile.ZipFile) as zf_mock:
+            self.store.compact(30)
+        self.assertNotIn("a", [c.args[1] for c in zf_mock.call_args_list if len(c.args) > 1])
+        self.assertNotIn("w", [c.args[1] for c in zf_mock.call_args_list if len(c.args) > 1])
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(self.store.stats()["archivados"], 1)
+        # Con documentos nuevos se añaden al mismo archivo, sin copiar lo ya archivado
+        inode = os.stat(path).st_ino
+        self._store("SS Luis.docx", "b", datetime.datetime(2025, 3, 2))
+        self.assertEqual(self.store.compact(30)["archivados"], 1)
+        self.assertEqual(os.stat(path).st_ino, inode)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(start_dir), before[:start_dir])
+
+    def test_compactacion_diaria(self):
+        self.assertTrue(self.store.compact_due())
+        self.store.compact(30)
+        self.assertFalse(self.store.compact_due())
+
+
+if __name__ == "__main__":
+    unittest.main()
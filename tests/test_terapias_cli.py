@@ -0,0 +1,169 @@
+"""
+Tests de la línea de comandos (terapias_cli.py) y de la configuración compartida (terapias_config.py).
+"""
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+import contextlib
+import configparser
+
+import terapias_cli
+from terapias_config import get_rutas, get_backup_config, get_inbox_config, load_config, DEFAULT_RUTAS
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+}
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLineaDeComandos(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_cli_")
+        self.source = os.path.join(self.temp_dir, "origen")
+        self.base = os.path.join(self.temp_dir, "TERAPIAS")
+        self.backup = os.path.join(self.temp_dir, "RESPALDO")
+        os.makedirs(self.source)
+        self.config_file = os.path.join(self.temp_dir, "organizar_config.ini")
+        config = configparser.ConfigParser()
+        config["RUTAS"] = {
+            "source": self.source, "base_dest": self.base, "backup": self.backup,
+            "logfile": os.path.join(self.temp_dir, "log.txt"),
+        }
+        with open(self.config_file, "w", encoding="utf-8") as f:
+            config.write(f)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _doc(self, name):
+        path = os.path.join(self.source, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(name)
+        return path
+
+    def _mapping(self, text):
+        path = os.path.join(self.temp_dir, "mapeo.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def _run(self, *args):
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            code = terapias_cli.main(["--config", self.config_file, *args])
+        return code, out.getvalue()
+
+    def test_leer_mapeo(self):
+        mapping = self._mapping("archivo;nombre\na.docx;SS Juan Pérez\n\n/abs/b.doc;SS Ana\n")
+        items = terapias_cli.read_mapping(mapping, self.source)
+        self.assertEqual(items, [
+            (os.path.join(self.source, "a.docx"), "SS Juan Pérez"),
+            (os.path.normpath("/abs/b.doc"), "SS Ana"),
+        ])
+
+    def test_organizar_buscar_historial(self):
+        self._doc("a.docx")
+        self._doc("b.docx")
+        mapping = self._mapping("a.docx,SS Juan Pérez\nb.docx,SS Ana Gómez\nfalta.docx,SS Luis\n")
+        code, out = self._run("organizar", mapping, "--fecha", "2026-01-28")
+        self.assertEqual(code, 1)  # falta.docx no existe
+        dia = os.path.join(self.base, "2026", "01- ENERO", "28 DE ENERO")
+        self.assertTrue(os.path.isfile(os.path.join(dia, "Juan Pérez", "SS Juan Pérez.docx")))
+        self.assertTrue(os.path.isfile(os.path.join(dia, "Ana Gómez", "SS Ana Gómez.docx")))
+        self.assertIn("No existe", out)
+        code, out = self._run("respaldo", "SS Ana Gómez")
+        self.assertEqual(code, 0)
+        self.assertEqual(len(out.splitlines()), 1)
+
+        code, out = self._run("buscar", "juan perez")
+        self.assertEqual(code, 0)
+        self.assertIn(os.path.join(dia, "Juan Pérez"), out)
+        self.assertNotIn("Ana", out)
+
+        code, out = self._run("historial", "--paciente", "ana")
+        self.assertEqual(code, 0)
+        self.assertEqual(len(out.splitlines()), 1)
+        self.assertIn("SS Ana Gómez.docx", out)
+
+    def test_simular_no_mueve(self):
+        a = self._doc("a.docx")
+        code, out = self._run("organizar", self._mapping("a.docx,SS Juan\n"), "--simular")
+        self.assertEqual(code, 0)
+        self.assertTrue(os.path.isfile(a))
+        self.assertFalse(os.path.exists(self.base))
+        self.assertTrue(out.startswith("plan\t"))
+
+    def test_pdf_del_dia(self):
+        self._doc("a.docx")
+        self._run("organizar", self._mapping("a.docx,SS Juan\n"), "--fecha", "2026-01-28")
+        shutil.rmtree(self.backup)
+        code, out = self._run("pdf", "--desde", "2026-01-28", "--conversor", "fake")
+        self.assertEqual(code, 0)
+        carpeta = os.path.join(self.base, "2026", "01- ENERO", "28 DE ENERO", "Juan")
+        self.assertEqual(os.listdir(carpeta), ["SS Juan.pdf"])
+        self.assertTrue(out.startswith("ok\t"))
+        code, out = self._run("respaldo", "SS Juan", "--restaurar", self.temp_dir)
+        self.assertEqual(code, 0)
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "SS Juan.docx")))
+
+    def test_reindexar(self):
+        for patient in ("Ana", "Luis"):
+            os.makedirs(os.path.join(self.base, "2026", "01- ENERO", "28 DE ENERO", patient))
+        code, out = self._run("reindexar")
+        self.assertEqual(code, 0)
+        self.assertIn("2 carpetas", out)
+
+    def test_config_inexistente(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            code = terapias_cli.main(["--config", os.path.join(self.temp_dir, "no.ini"), "historial"])
+        self.assertEqual(code, 2)
+
+    def test_sin_tkinter(self):
+        code = "import sys, terapias_cli; sys.exit(1 if 'tkinter' in sys.modules else 0)"
+        self.assertEqual(subprocess.run([sys.executable, "-c", code], cwd=_ROOT).returncode, 0)
+
+
+class TestConfiguracion(unittest.TestCase):
+
+    def test_rutas_por_defecto(self):
+        config = configparser.ConfigParser()
+        config["RUTAS"] = {"base_dest": "/x", "word_path": "  "}
+        rutas = get_rutas(config)
+        self.assertEqual(rutas["base_dest"], "/x")
+        self.assertEqual(rutas["backup"], DEFAULT_RUTAS["backup"])
+        self.assertEqual(rutas["word_path"], "winword.exe")
+
+    def test_respaldo_por_defecto(self):
+        config = configparser.ConfigParser()
+        self.assertEqual(get_backup_config(config)["compact_days"], 90)
+        config["RESPALDO"] = {"compactar_dias": "abc"}
+        self.assertEqual(get_backup_config(config)["compact_days"], 90)
+        config["RESPALDO"] = {"compactar_dias": "0"}
+        self.assertEqual(get_backup_config(config)["compact_days"], 0)
+
+    def test_origen_por_defecto(self):
+        config = configparser.ConfigParser()
+        self.assertEqual(get_inbox_config(config), {"extensions": (".doc", ".docx"), "recursive": False, "watch": False})
+        config["ORIGEN"] = {"extensiones": ".docx, odt .PDF .txt", "subcarpetas": "sí", "vigilar": "Si"}
+        self.assertEqual(get_inbox_config(config), {"extensions": (".docx", ".odt", ".pdf"), "recursive": True, "watch": True})
+
+    def test_crea_config(self):
+        temp_dir = tempfile.mkdtemp(prefix="terapias_config_")
+        try:
+            path = os.path.join(temp_dir, "sub", "organizar_config.ini")
+            config = load_config(path)
+            self.assertTrue(os.path.isfile(path))
+            self.assertIn("RUTAS", config)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
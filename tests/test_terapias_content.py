@@ -0,0 +1,102 @@
+"""
+Tests del índice de texto completo (terapias_content.py).
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import zipfile
+
+from terapias_logic import build_folder_structure
+from terapias_content import ContentIndex, extract_docx_text, fts_query
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+}
+
+_DOC_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    '{}</w:body></w:document>'
+)
+
+
+def write_docx(path: str, *paragraphs: str):
+    body = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragraphs)
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", _DOC_XML.format(body))
+
+
+class TestExtraccion(unittest.TestCase):
+
+    def test_docx(self):
+        tmp = tempfile.mkdtemp(prefix="terapias_content_")
+        try:
+            path = os.path.join(tmp, "informe.docx")
+            write_docx(path, "Evolución favorable", "Continúa terapia")
+            self.assertEqual(extract_docx_text(path), "Evolución favorable\nContinúa terapia")
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def test_fts_query(self):
+        self.assertEqual(fts_query('dolor "lumbar'), '"dolor"* "lumbar"*')
+        self.assertEqual(fts_query("   "), "")
+
+
+class TestContentIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_content_")
+        self.base = os.path.join(self.temp_dir, "TERAPIAS")
+        _, _, ruta_dia, _ = build_folder_structure(self.base, 2026, 1, 28, MESES)
+        self.folder = os.path.join(ruta_dia, "Juan Pérez")
+        os.makedirs(self.folder)
+        self.doc = os.path.join(self.folder, "Informe SS Juan Pérez.docx")
+        write_docx(self.doc, "Paciente con dolor lumbar crónico.", "Evolución favorable.")
+        write_docx(os.path.join(self.folder, "Otro.docx"), "Control de rodilla.")
+        self.index = ContentIndex(os.path.join(self.temp_dir, "contenido.sqlite"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_indexa_y_busca(self):
+        stats = self.index.update(self.base, max_workers=1)
+        self.assertEqual(stats["indexados"], 2)
+        results = self.index.search("evolucion lumbar")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["patient"], "Juan Pérez")
+        self.assertEqual(results[0]["file"], os.path.normpath(self.doc))
+        self.assertIn("«", results[0]["snippet"])
+
+    def test_actualizacion_incremental(self):
+        self.index.update(self.base, max_workers=1)
+        stats = self.index.update(self.base, max_workers=1)
+        self.assertEqual((stats["indexados"], stats["sin_cambios"]), (0, 2))
+
+        write_docx(self.doc, "Alta médica.")
+        future = time.time() + 5
+        os.utime(self.doc, (future, future))
+        stats = self.index.update(self.base, max_workers=1)
+        self.assertEqual((stats["indexados"], stats["sin_cambios"]), (1, 1))
+        self.assertEqual(self.index.search("lumbar"), [])
+        self.assertEqual(len(self.index.search("alta")), 1)
+
+        os.remove(self.doc)
+        stats = self.index.update(self.base, max_workers=1)
+        self.assertEqual(stats["eliminados"], 1)
+        self.assertEqual(self.index.search("alta"), [])
+
+    def test_archivo_danado(self):
+        with open(os.path.join(self.folder, "roto.docx"), "w") as f:
+            f.write("no es un zip")
+        stats = self.index.update(self.base, max_workers=1)
+        self.assertEqual((stats["indexados"], stats["errores"]), (2, 1))
+        # No se reintenta hasta que el archivo cambie
+        self.assertEqual(self.index.update(self.base, max_workers=1)["sin_cambios"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
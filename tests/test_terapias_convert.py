@@ -0,0 +1,137 @@
+"""
+Tests de la conversión a PDF por lotes (terapias_convert.py) con el conversor de pruebas.
+"""
+import os
+import time
+import shutil
+import datetime
+import tempfile
+import threading
+import unittest
+
+from terapias_logic import build_folder_structure
+from terapias_pdf import ConverterPool, FakeBackend
+from terapias_history import HistoryStore
+from terapias_backup import get_store
+from terapias_convert import (
+    ConversionQueue, find_pending_docs, backup_converted, default_workers, pdf_is_current,
+    CONV_OK, CONV_SKIPPED, CONV_ERROR, CONV_CANCELLED, MAX_WORKERS_WORD,
+)
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+}
+HOY = datetime.date(2026, 1, 28)
+
+
+class TestColaConversion(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_convert_")
+        self.base = os.path.join(self.temp_dir, "TERAPIAS")
+        self.backup = os.path.join(self.temp_dir, "RESPALDO")
+        _, _, self.dia, _ = build_folder_structure(self.base, HOY.year, HOY.month, HOY.day, MESES)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _doc(self, patient, name):
+        folder = os.path.join(self.dia, patient)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(name)
+        return path
+
+    def test_documentos_pendientes(self):
+        a = self._doc("Ana", "SS Ana.docx")
+        b = self._doc("Luis", "SS Luis.doc")
+        self._doc("Luis", "SS Luis.pdf")
+        self._doc("Luis", "~$SS Luis.doc")
+        otro_dia = os.path.join(build_folder_structure(self.base, 2026, 1, 27, MESES)[2], "Eva")
+        os.makedirs(otro_dia)
+        with open(os.path.join(otro_dia, "SS Eva.docx"), "w", encoding="utf-8") as f:
+            f.write("x")
+        self.assertEqual(find_pending_docs(self.base, MESES, HOY, HOY), [(a, "Ana"), (b, "Luis")])
+
+    def test_convertir_en_paralelo(self):
+        docs = [self._doc(f"Paciente {i}", f"SS Paciente {i}.docx") for i in range(8)]
+        history = HistoryStore(os.path.join(self.temp_dir, "historial.sqlite"))
+        pool = ConverterPool(lambda: FakeBackend(delay=0.1), size=4)
+        try:
+            conv_queue = ConversionQueue(pool, self.backup, history_store=history)
+            for d in docs:
+                conv_queue.add(d, patient="P")
+            updates = []
+            start = time.monotonic()
+            stats = conv_queue.run(on_update=updates.append)
+            elapsed = time.monotonic() - start
+        finally:
+            pool.close(wait=True)
+        self.assertEqual(stats[CONV_OK], 8)
+        self.assertEqual(len(updates), 8)
+        # 8 × 0,1 s con 4 conversores: claramente menos que en serie
+        self.assertLess(elapsed, 0.6)
+        self.assertGreater(stats["por_minuto"], 0)
+        for d in docs:
+            self.assertFalse(os.path.exists(d))
+            self.assertTrue(os.path.isfile(d[:-5] + ".pdf"))
+        self.assertEqual(get_store(self.backup).stats()["copias"], 8)
+        self.assertEqual(history.count(), 8)
+
+    def test_omitir_pdf_al_dia_y_errores(self):
+        al_dia = self._doc("Ana", "SS Ana.docx")
+        pdf = al_dia[:-5] + ".pdf"
+        with open(pdf, "w", encoding="utf-8") as f:
+            f.write("pdf")
+        os.utime(pdf, (time.time() + 10, time.time() + 10))
+        falla = self._doc("Luis", "SS Luis.docx")
+        backend = FakeBackend(fail=lambda path: "Luis" in path)
+        pool = ConverterPool(lambda: backend)
+        try:
+            conv_queue = ConversionQueue(pool, self.backup)
+            conv_queue.add(al_dia)
+            conv_queue.add(falla)
+            conv_queue.add(os.path.join(self.dia, "no.docx"))
+            stats = conv_queue.run()
+        finally:
+            pool.close(wait=True)
+        self.assertEqual(backend.converted, [])
+        self.assertEqual([e["status"] for e in conv_queue.entries], [CONV_SKIPPED, CONV_ERROR, CONV_ERROR])
+        self.assertFalse(os.path.exists(al_dia))
+        self.assertTrue(os.path.exists(falla))
+        self.assertEqual((stats[CONV_SKIPPED], stats[CONV_ERROR], stats["total"]), (1, 2, 3))
+
+    def test_cancelar(self):
+        docs = [self._doc(f"P{i}", f"SS P{i}.docx") for i in range(6)]
+        cancel = threading.Event()
+        pool = ConverterPool(lambda: FakeBackend(delay=0.05))
+        try:
+            conv_queue = ConversionQueue(pool, self.backup)
+            for d in docs:
+                conv_queue.add(d)
+            stats = conv_queue.run(cancel=cancel, on_update=lambda entry: cancel.set())
+        finally:
+            pool.close(wait=True)
+        self.assertGreaterEqual(stats[CONV_OK], 1)
+        self.assertGreaterEqual(stats[CONV_CANCELLED], 1)
+        self.assertEqual(stats[CONV_OK] + stats[CONV_CANCELLED], 6)
+
+    def test_respaldo_sin_duplicar(self):
+        a = self._doc("Ana", "SS.docx")
+        b = self._doc("Luis", "SS.docx")
+        first, second = backup_converted(a, self.backup), backup_converted(b, self.backup)
+        # Mismo contenido: una sola copia en el almacén, dos entradas en el catálogo
+        self.assertEqual(first, second)
+        self.assertEqual(len(get_store(self.backup).find("SS.docx")), 2)
+
+    def test_utilidades(self):
+        self.assertLessEqual(default_workers("word"), MAX_WORKERS_WORD)
+        self.assertGreaterEqual(default_workers(), 1)
+        self.assertFalse(pdf_is_current(os.path.join(self.temp_dir, "a.docx"), os.path.join(self.temp_dir, "a.pdf")))
+
+
+if __name__ == "__main__":
+    unittest.main()
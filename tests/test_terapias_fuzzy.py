@@ -0,0 +1,116 @@
+"""
+Tests de la búsqueda aproximada de pacientes (terapias_fuzzy.py).
+"""
+import unittest
+from unittest.mock import patch
+
+from terapias_fuzzy import FuzzyMatcher, IncrementalSearch, normalize_name, name_score
+
+
+class TestNormalizeName(unittest.TestCase):
+
+    def test_acentos_y_mayusculas(self):
+        self.assertEqual(normalize_name("PÉREZ"), "perez")
+        self.assertEqual(normalize_name("Nuñez Ibáñez"), "nunez ibanez")
+
+    def test_signos_y_espacios(self):
+        self.assertEqual(normalize_name("  García,  López-Díaz "), "garcia lopez diaz")
+        self.assertEqual(normalize_name(""), "")
+
+
+class TestNameScore(unittest.TestCase):
+
+    def _score(self, query, name):
+        return name_score(normalize_name(query).split(), normalize_name(name).split())
+
+    def test_exacto_mejor_que_aproximado(self):
+        self.assertGreater(self._score("perez", "Juan Pérez"), self._score("perz", "Juan Pérez"))
+
+    def test_orden_de_palabras(self):
+        self.assertEqual(self._score("perez juan", "Juan Pérez"), self._score("juan perez", "Juan Pérez"))
+
+    def test_error_tipografico(self):
+        self.assertGreater(self._score("gracia", "María García"), 0)
+        self.assertGreater(self._score("rodriges", "Ana Rodríguez"), 0)
+
+    def test_sin_parecido(self):
+        self.assertEqual(self._score("lopez", "Juan Pérez"), 0)
+        self.assertEqual(self._score("juan lopez", "Juan Pérez"), 0)
+
+
+class TestFuzzyMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = FuzzyMatcher()
+        for name, fecha in [
+            ("Juan PÉREZ", "2025-12-01"),
+            ("Juan Pérez", "2026-01-28"),
+            ("María García", "2026-01-28"),
+            ("Pedro Perea", "2026-01-10"),
+        ]:
+            self.matcher.add(normalize_name(name), {"patient": name, "fecha": fecha}, order=fecha)
+
+    def test_acentos_y_recencia(self):
+        results = self.matcher.search("perez")
+        self.assertEqual([r["fecha"] for r in results[:2]], ["2026-01-28", "2025-12-01"])
+
+    def test_exactos_antes_que_aproximados(self):
+        results = self.matcher.search("perez")
+        self.assertEqual(results[-1]["patient"], "Pedro Perea")
+
+    def test_consulta_corta_por_subcadena(self):
+        self.assertEqual([r["patient"] for r in self.matcher.search("ma")], ["María García"])
+
+    def test_max_results(self):
+        self.assertEqual(len(self.matcher.search("juan", max_results=1)), 1)
+
+    def test_consulta_vacia(self):
+        self.assertEqual(self.matcher.search("  "), [])
+
+
+class TestIncrementalSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = FuzzyMatcher()
+        for i, name in enumerate(["Juan Pérez", "Juana Paz", "Julio Ruiz", "María García"]):
+            self.matcher.add(normalize_name(name), name, order=str(i))
+
+    def test_refina_la_consulta_anterior(self):
+        session = IncrementalSearch()
+        self.assertEqual(len(session.search(self.matcher, "j")), 3)
+        with patch.object(self.matcher, "match", wraps=self.matcher.match) as spy:
+            results = session.search(self.matcher, "ju")
+        self.assertEqual(sorted(spy.call_args.args[1]), [0, 1, 2])
+        self.assertEqual(results, self.matcher.search("ju"))
+        session.search(self.matcher, "juan")
+        # Una palabra más solo puede quitar resultados
+        with patch.object(self.matcher, "match", wraps=self.matcher.match) as spy:
+            results = session.search(self.matcher, "juan p")
+        self.assertEqual(sorted(spy.call_args.args[1]), [0, 1])
+        self.assertEqual(results, self.matcher.search("juan p"))
+
+    def test_letra_a_letra_igual_que_de_nuevo(self):
+        matcher = FuzzyMatcher()
+        for i, name in enumerate(["PRE GOMEZ", "PEREZ ANA", "JOSE LUIS", "Juan Pérez", "Jian Soto"]):
+            matcher.add(normalize_name(name), name, order=str(i))
+        for query in ("pere", "jsoe", "juan perez", "jian"):
+            session = IncrementalSearch()
+            for i in range(1, len(query) + 1):
+                self.assertEqual(sorted(session.search(matcher, query[:i])), sorted(matcher.search(query[:i])), query[:i])
+        session = IncrementalSearch()
+        session.search(matcher, "per")
+        self.assertIn("PRE GOMEZ", session.search(matcher, "pere"))
+
+    def test_consulta_distinta_busca_de_nuevo(self):
+        session = IncrementalSearch()
+        session.search(self.matcher, "juan")
+        self.assertEqual(session.search(self.matcher, "maria"), ["María García"])
+
+    def test_no_pierde_resultados_no_mostrados(self):
+        session = IncrementalSearch()
+        self.assertEqual(len(session.search(self.matcher, "ju", max_results=1)), 1)
+        self.assertEqual(len(session.search(self.matcher, "jua")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
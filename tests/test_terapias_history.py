@@ -0,0 +1,89 @@
+"""
+Tests del historial estructurado (terapias_history.py).
+"""
+import os
+import shutil
+import datetime
+import tempfile
+import unittest
+
+from terapias_history import HistoryStore, parse_log_line, EVENT_ORGANIZED, EVENT_PDF
+
+
+class TestHistoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_history_")
+        self.store = HistoryStore(os.path.join(self.temp_dir, "historial.sqlite"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _llenar(self, n):
+        inicio = datetime.datetime(2026, 1, 1, 9, 0, 0)
+        for i in range(n):
+            paciente = "María García" if i % 2 else "Juan Pérez"
+            self.store.record(EVENT_ORGANIZED, paciente, f"/dest/{paciente}", when=inicio + datetime.timedelta(days=i))
+
+    def test_paginas_mas_recientes_primero(self):
+        self._llenar(25)
+        self.assertEqual(self.store.count(), 25)
+        primera = self.store.page(0, 10)
+        self.assertEqual(len(primera), 10)
+        self.assertEqual(primera[0]["id"], 25)
+        self.assertEqual(primera[0]["timestamp"], "2026-01-25 09:00:00")
+        ultima = self.store.page(20, 10)
+        self.assertEqual([e["id"] for e in ultima], [5, 4, 3, 2, 1])
+        self.assertEqual(self.store.page(30, 10), [])
+
+    def test_paginas_fijas_con_entradas_nuevas(self):
+        self._llenar(25)
+        top = self.store.count()
+        primera = self.store.page(0, 10, top)
+        # Se organiza algo mientras la lista está abierta: las páginas no se desplazan
+        self._llenar(3)
+        self.assertEqual(self.store.page(0, 10, top), primera)
+        self.assertEqual([e["id"] for e in self.store.page(20, 10, top)], [5, 4, 3, 2, 1])
+        self.assertEqual(self.store.page(0, 1)[0]["id"], 28)
+
+    def test_filtros(self):
+        self._llenar(10)
+        ids = self.store.find_ids(patient="maria")
+        self.assertEqual(ids, [10, 8, 6, 4, 2])
+        self.assertEqual({e["patient"] for e in self.store.get_many(ids)}, {"María García"})
+        ids = self.store.find_ids(date_from=datetime.date(2026, 1, 3), date_to=datetime.date(2026, 1, 4))
+        self.assertEqual(ids, [4, 3])
+        self.assertEqual([e["id"] for e in self.store.get_many([3, 9])], [3, 9])
+
+    def test_evento_pdf(self):
+        self.store.record(EVENT_PDF, "Ana López", "/dest/Ana", "/dest/Ana/informe.pdf")
+        entrada = self.store.page(0, 1)[0]
+        self.assertEqual((entrada["event"], entrada["file"]), (EVENT_PDF, "/dest/Ana/informe.pdf"))
+
+    def test_importar_log_una_vez(self):
+        antiguo = os.path.join(self.temp_dir, "log.txt.1")
+        actual = os.path.join(self.temp_dir, "log.txt")
+        with open(antiguo, "w", encoding="utf-8") as f:
+            f.write("2026-01-02 10:00:00 - INFO - Esperado PDF: SS Juan.pdf → /dest/Juan | Paciente: Juan | Fecha: 2026/x/y\n")
+        with open(actual, "w", encoding="utf-8") as f:
+            f.write("2026-01-03 10:00:00 - ERROR - No se pudo abrir Word\n")
+            f.write("2026-01-03 11:00:00 - INFO - Esperado PDF: SS Ana.pdf → /dest/Ana | Paciente: Ana | Fecha: 2026/x/y\n")
+        self.assertEqual(self.store.import_log([antiguo, actual]), 2)
+        self.assertEqual(self.store.import_log([antiguo, actual]), 0)
+        self.assertEqual([e["patient"] for e in self.store.page(0, 10)], ["Ana", "Juan"])
+
+
+class TestParseLogLine(unittest.TestCase):
+
+    def test_linea_valida(self):
+        entry = parse_log_line("2026-01-02 10:00:00 - INFO - Esperado PDF: a.pdf → C:\\T\\Juan | Paciente: Juan | Fecha: x\n")
+        self.assertEqual(entry["patient"], "Juan")
+        self.assertEqual(entry["path"], "C:\\T\\Juan")
+
+    def test_linea_sin_historial(self):
+        self.assertIsNone(parse_log_line("2026-01-02 10:00:00 - INFO - Arrancando\n"))
+        self.assertIsNone(parse_log_line("basura | Paciente: x → y"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+Tests de la instantánea de la carpeta de origen (terapias_inbox.py).
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import terapias_inbox
+from terapias_inbox import InboxSnapshot, InboxQueue, suggest_name, INBOX_WAITING, INBOX_READY
+
+
+class TestCarpetaOrigen(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_inbox_")
+        self.inbox = InboxSnapshot()
+        # Carpetas creadas en el test: su mtime es reciente y se volverían a listar siempre
+        self._racy = mock.patch.object(terapias_inbox, "_RACY_SECONDS", -1e9)
+        self._racy.start()
+
+    def tearDown(self):
+        self._racy.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, mtime):
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("x")
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def _touch_dir(self, folder, mtime):
+        os.utime(folder, (mtime, mtime))
+
+    def test_mas_recientes_primero(self):
+        paths = [self._write(f"{i:03d}.docx", 1_000_000 + i) for i in range(120)]
+        self._write("viejo.doc", 10)
+        self._write("notas.txt", 2_000_000)
+        self._write("~$003.docx", 2_000_000)
+        docs = self.inbox.find(self.temp_dir, max_count=50)
+        self.assertEqual([p for p, _ in docs], paths[::-1][:50])
+        self.assertEqual(docs[0][1], 1_000_119)
+        self.assertEqual(len(self.inbox.find(self.temp_dir, max_count=0)), 121)
+
+    def test_solo_relista_si_cambia_la_carpeta(self):
+        self._write("a.docx", 100)
+        self._touch_dir(self.temp_dir, 1000)
+        self.inbox.find(self.temp_dir)
+        self.inbox.find(self.temp_dir)
+        self.assertEqual(self.inbox.listings, 1)
+        self._write("b.docx", 200)
+        self._touch_dir(self.temp_dir, 2000)
+        self.assertEqual([os.path.basename(p) for p, _ in self.inbox.find(self.temp_dir)], ["b.docx", "a.docx"])
+        self.assertEqual(self.inbox.listings, 2)
+
+    def test_carpeta_recien_cambiada_se_vuelve_a_listar(self):
+        self._write("a.docx", 100)
+        with mock.patch.object(terapias_inbox, "_RACY_SECONDS", 2.0):
+            # mtime de la carpeta de hace un instante: podría cambiar sin que se note
+            self.inbox.find(self.temp_dir)
+            self.inbox.find(self.temp_dir)
+        self.assertEqual(self.inbox.listings, 2)
+
+    def test_subcarpetas_y_extensiones(self):
+        self._write("a.docx", 100)
+        self._write(os.path.join("sub", "b.odt"), 300)
+        self._write(os.path.join("sub", "profunda", "c.pdf"), 200)
+        self._write(os.path.join(".oculta", "d.docx"), 400)
+        self.assertEqual(len(self.inbox.find(self.temp_dir)), 1)
+        docs = self.inbox.find(self.temp_dir, recursive=True, extensions=(".docx", ".odt", ".pdf"))
+        self.assertEqual([os.path.basename(p) for p, _ in docs], ["b.odt", "c.pdf", "a.docx"])
+
+    def test_carpeta_inexistente(self):
+        self.assertEqual(self.inbox.find(os.path.join(self.temp_dir, "no")), [])
+        self.inbox.find(self.temp_dir)
+        shutil.rmtree(self.temp_dir)
+        self.assertEqual(self.inbox.find(self.temp_dir), [])
+
+    def test_invalidar(self):
+        self._write("a.docx", 100)
+        self.inbox.find(self.temp_dir)
+        self.inbox.invalidate(self.temp_dir)
+        self.inbox.find(self.temp_dir)
+        self.assertEqual(self.inbox.listings, 2)
+
+
+class TestBandejaVigilada(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_inbox_queue_")
+        self._write("viejo.docx")
+        self.changes = []
+        self.queue = InboxQueue(InboxSnapshot(), self.temp_dir, on_change=lambda: self.changes.append(1),
+                                lookup=lambda text: "Juan Pérez" if text == "juan perez" else None,
+                                known=lambda h: {"name": "SS Ana.docx"} if h == self.known_hash else None)
+        self.known_hash = None
+        self.queue.poll()
+
+    def tearDown(self):
+        self.queue.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, content="contenido"):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        # Cada cambio con un mtime de carpeta distinto (la instantánea solo relista si cambia)
+        os.utime(self.temp_dir, ns=(0, (len(os.listdir(self.temp_dir)) + len(content)) * 10**9))
+        return path
+
+    def test_sugerir_nombre(self):
+        self.assertEqual(suggest_name("/x/SS Ana López.docx"), ("SS Ana López", "Ana López"))
+        lookup = {"juan perez": "Juan Pérez"}.get
+        self.assertEqual(suggest_name("/x/Informe Juan Perez 2026-01.doc", lookup), ("SS Juan Pérez", "Juan Pérez"))
+        self.assertEqual(suggest_name("/x/documento.docx", lookup), ("", ""))
+
+    def test_solo_documentos_nuevos_y_terminados(self):
+        self.assertEqual(self.queue.entries(), [])
+        path = self._write("Informe Juan Perez.docx")
+        self.assertTrue(self.queue.poll())
+        self.assertEqual(self.queue.entries()[0]["status"], INBOX_WAITING)
+        # Sigue escribiéndose: el tamaño cambia entre pasadas
+        self._write("Informe Juan Perez.docx", "contenido más largo")
+        self.queue.poll()
+        self.assertEqual(self.queue.entries(ready_only=True), [])
+        self.assertTrue(self.queue.poll())
+        entry = self.queue.get(path)
+        self.assertEqual(entry["status"], INBOX_READY)
+        self.assertEqual(entry["suggestion"], "SS Juan Pérez")
+        self.assertEqual(len(entry["hash"]), 64)
+        self.assertIsNone(entry["duplicate"])
+        self.assertTrue(self.changes)
+
+    def test_abierto_en_word_o_duplicado(self):
+        path = self._write("SS Ana.docx")
+        lock = self._write("~$SS Ana.docx")
+        self.queue.poll()
+        self.queue.poll()
+        self.assertEqual(self.queue.get(path)["status"], INBOX_WAITING)
+        os.remove(lock)
+        from terapias_transfer import file_sha256
+        self.known_hash = file_sha256(path)
+        self.queue.poll()
+        self.assertEqual(self.queue.get(path)["duplicate"], {"name": "SS Ana.docx"})
+
+    def test_organizado_sale_de_la_cola(self):
+        path = self._write("SS Ana.docx")
+        self.queue.poll()
+        self.queue.discard(path)
+        self.assertEqual(self.queue.entries(), [])
+        other = self._write("SS Luis.docx")
+        self.queue.poll()
+        os.remove(other)
+        os.utime(self.temp_dir, ns=(0, 99 * 10**9))
+        self.queue.poll()
+        self.assertEqual(self.queue.entries(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests del índice persistente de pacientes (terapias_index.py).
+"""
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from terapias_logic import build_folder_structure
+from terapias_index import PatientIndex
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+}
+
+
+class TestPatientIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_index_")
+        self.base = os.path.join(self.temp_dir, "TERAPIAS")
+        self.index = PatientIndex(os.path.join(self.temp_dir, "index.sqlite"), MESES)
+        self._crear_paciente(2025, 12, 1, "Juan Pérez")
+        self._crear_paciente(2026, 1, 28, "Juan Pérez")
+        self._crear_paciente(2026, 1, 28, "María García")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _crear_paciente(self, year, month, day, paciente):
+        _, _, ruta_dia, _ = build_folder_structure(self.base, year, month, day, MESES)
+        path = os.path.join(ruta_dia, paciente)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def test_rebuild_y_busqueda(self):
+        self.assertFalse(self.index.is_built_for(self.base))
+        self.assertEqual(self.index.rebuild(self.base), 3)
+        self.assertTrue(self.index.is_built_for(self.base))
+        results = self.index.search("juan")
+        self.assertEqual(len(results), 2)
+        # Más reciente primero
+        self.assertEqual(results[0]["date"], "2026/01- ENERO/28 DE ENERO")
+        self.assertEqual(results[1]["date"], "2025/12- DICIEMBRE/01 DE DICIEMBRE")
+
+    def test_max_results(self):
+        self.index.rebuild(self.base)
+        self.assertEqual(len(self.index.search("a", max_results=1)), 1)
+
+    def test_add_sin_recorrer(self):
+        self.index.rebuild(self.base)
+        path = self._crear_paciente(2026, 2, 3, "Ana López")
+        self.assertTrue(self.index.add("Ana López", path, "2026", "02- FEBRERO", "03 DE FEBRERO"))
+        self.assertEqual(self.index.search("lópez")[0]["path"], os.path.normpath(path))
+        self.assertEqual(self.index.count(), 4)
+
+    def test_rebuild_carpeta_inexistente(self):
+        self.assertIsNone(self.index.rebuild(os.path.join(self.temp_dir, "no_existe")))
+
+    def test_busqueda_vacia(self):
+        self.index.rebuild(self.base)
+        self.assertEqual(self.index.search(""), [])
+
+    def test_busqueda_por_periodo(self):
+        self.index.rebuild(self.base)
+        enero = (datetime.date(2026, 1, 1), datetime.date(2026, 1, 31))
+        self.assertEqual(len(self.index.search("juan", date_from=enero[0], date_to=enero[1])), 1)
+        # Sin consulta: todas las carpetas del periodo, más recientes primero
+        self.assertEqual(
+            sorted(r["patient"] for r in self.index.search("", date_from=enero[0], date_to=enero[1])),
+            ["Juan Pérez", "María García"],
+        )
+        self.assertEqual(len(self.index.search("", date_to=datetime.date(2025, 12, 31))), 1)
+
+    def test_sync_dirs_relee_solo_lo_cambiado(self):
+        self.index.rebuild(self.base)
+        nueva = self._crear_paciente(2026, 1, 28, "Ana López")
+        shutil.rmtree(os.path.join(os.path.dirname(nueva), "Juan Pérez"))
+        self.assertTrue(self.index.sync_dirs(self.base, [os.path.dirname(nueva)]))
+        self.assertEqual(self.index.count(), 3)
+        self.assertEqual(self.index.search("ana")[0]["path"], os.path.normpath(nueva))
+        # La carpeta de diciembre no se ha tocado
+        self.assertEqual([r["date"] for r in self.index.search("juan")], ["2025/12- DICIEMBRE/01 DE DICIEMBRE"])
+
+    def test_sync_dirs_sin_indice(self):
+        self.assertFalse(self.index.sync_dirs(self.base, [self.base]))
+
+
+if __name__ == "__main__":
+    unittest.main()
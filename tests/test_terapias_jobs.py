@@ -0,0 +1,67 @@
+"""
+Tests de las tareas en segundo plano (terapias_jobs.py).
+"""
+import queue
+import threading
+import unittest
+
+from terapias_jobs import JobRunner, JOB_DONE, JOB_CANCELLED, JOB_FAILED
+
+
+class TestJobRunner(unittest.TestCase):
+
+    def setUp(self):
+        # dispatch de prueba: los avisos se ejecutan en el hilo del test, como after() en Tk
+        self.calls = queue.Queue()
+        self.runner = JobRunner(dispatch=self.calls.put)
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def _drain(self, until):
+        """Ejecuta los avisos recibidos hasta que until() sea cierto."""
+        while not until():
+            self.calls.get(timeout=5)()
+
+    def test_resultado_y_progreso(self):
+        progress, done = [], []
+
+        def work(job, a, b):
+            job.report("mitad", 0.5)
+            return a + b
+
+        job = self.runner.submit("suma", work, 2, 3, on_progress=lambda m, f: progress.append((m, f)), on_done=done.append)
+        self._drain(lambda: done)
+        self.assertEqual(done, [5])
+        self.assertEqual(progress, [("mitad", 0.5)])
+        self.assertEqual(job.status, JOB_DONE)
+        self.assertEqual(self.runner.active(), [])
+
+    def test_error(self):
+        errors = []
+
+        def work(job):
+            raise OSError("disco lleno")
+
+        job = self.runner.submit("falla", work, on_error=errors.append)
+        self._drain(lambda: errors)
+        self.assertIsInstance(errors[0], OSError)
+        self.assertEqual(job.status, JOB_FAILED)
+
+    def test_cancelar_durante_espera(self):
+        started, cancelled = threading.Event(), []
+
+        def work(job):
+            started.set()
+            job.sleep(30)
+            return "no debería llegar"
+
+        job = self.runner.submit("espera", work, on_done=self.fail, on_cancel=lambda: cancelled.append(True))
+        self.assertTrue(started.wait(5))
+        job.cancel()
+        self._drain(lambda: cancelled)
+        self.assertEqual(job.status, JOB_CANCELLED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Tests del diario de operaciones (terapias_journal.py) y su recuperación al organizar y respaldar.
+"""
+import os
+import json
+import time
+import shutil
+import datetime
+import tempfile
+import builtins
+import threading
+import unittest
+from unittest import mock
+
+import terapias_journal
+
+from terapias_journal import (
+    OperationJournal, read_journal, replay, resolve_move,
+    STEP_DONE, STEP_NOT_DONE, STEP_CONFLICT, STEP_LOST,
+)
+from terapias_backup import get_store
+from terapias_history import HistoryStore
+from terapias_convert import replay_backup, KIND_BACKUP
+from terapias_organize import plan_batch, apply_batch, replay_organize, KIND_ORGANIZE, STATUS_OK
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+}
+HOY = datetime.date(2026, 1, 28)
+
+
+class TestDiarioOperaciones(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_journal_")
+        self.journal_dir = os.path.join(self.temp_dir, "operaciones")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, content="x"):
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_commit_en_grupo(self):
+        journal = OperationJournal(self.journal_dir)
+        real_fsync = os.fsync
+
+        def slow_fsync(fd):
+            time.sleep(0.05)
+            real_fsync(fd)
+
+        with mock.patch("terapias_journal.os.fsync", side_effect=slow_fsync):
+            threads = [threading.Thread(target=journal.begin, args=("prueba", [{"de": f"/x/{i}", "a": None}]))
+                       for i in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        # Las operaciones que llegan mientras se hace un fsync comparten el siguiente
+        self.assertLess(journal.commits, 8)
+        self.assertEqual(len(read_journal(journal.path)), 8)
+        journal.close()
+        self.assertTrue(os.path.exists(journal.path))
+
+    def test_terminadas_no_se_recuperan(self):
+        journal = OperationJournal(self.journal_dir)
+        op = journal.begin("prueba", [{"de": "a", "a": "b"}, {"de": "c", "a": "d"}])
+        journal.step_done(op, 1)
+        other = journal.begin("prueba", [])
+        journal.finish(other)
+        journal.close()
+        ops = read_journal(journal.path)
+        self.assertEqual([o["op"] for o in ops], [op])
+        self.assertTrue(ops[0]["steps"][1]["hecho"])
+        self.assertNotIn("hecho", ops[0]["steps"][0])
+        # Sin operaciones en curso el diario se borra al cerrar
+        done = OperationJournal(os.path.join(self.temp_dir, "otro"))
+        done.finish(done.begin("prueba", []))
+        done.close()
+        self.assertFalse(os.path.exists(done.path))
+
+    def test_estado_segun_disco(self):
+        src, dst = self._write("a.docx"), os.path.join(self.temp_dir, "b.docx")
+        self.assertEqual(resolve_move({"de": src, "a": dst}), STEP_NOT_DONE)
+        shutil.copy(src, dst)
+        # Copia entre discos terminada sin borrar el original: se completa
+        self.assertEqual(resolve_move({"de": src, "a": dst}), STEP_DONE)
+        self.assertFalse(os.path.exists(src))
+        self._write("a.docx", "otro contenido")
+        self.assertEqual(resolve_move({"de": src, "a": dst}), STEP_CONFLICT)
+        os.remove(src)
+        os.remove(dst)
+        self.assertEqual(resolve_move({"de": src, "a": dst}), STEP_LOST)
+        self.assertEqual(resolve_move({"de": src, "a": None}), STEP_DONE)
+
+    def test_diario_en_uso_no_se_recupera(self):
+        live = OperationJournal(self.journal_dir)
+        live.begin("prueba", [{"de": "a", "a": None}])
+        seen = []
+        self.assertEqual(replay(self.journal_dir, {"prueba": seen.append}), [])
+        self.assertTrue(os.path.exists(live.path))
+        live.close()
+        self.assertEqual(len(replay(self.journal_dir, {"prueba": seen.append})), 1)
+        self.assertEqual(len(seen), 1)
+        self.assertFalse(os.path.exists(live.path))
+
+    def _leftover(self, name, op):
+        os.makedirs(self.journal_dir, exist_ok=True)
+        path = os.path.join(self.journal_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"t": "inicio", "op": op, "tipo": "prueba", "pasos": []}) + "\n")
+        return path
+
+    def test_recuperar_con_bloqueo_obligatorio(self):
+        path = self._leftover("20260128_120000_1.jsonl", "abc")
+        locked = set()
+        real_lock, real_open = terapias_journal._try_lock, builtins.open
+
+        # Como msvcrt.locking en Windows: con el bloqueo tomado, abrir el archivo otra vez falla
+        def lock(f):
+            locked.add(os.path.abspath(f.name))
+            return real_lock(f)
+
+        def strict_open(file, *args, **kw):
+            if os.path.abspath(file) in locked:
+                raise PermissionError(13, "Permission denied", file)
+            return real_open(file, *args, **kw)
+
+        seen = []
+        with mock.patch("terapias_journal._try_lock", side_effect=lock), \
+                mock.patch("terapias_journal.open", side_effect=strict_open, create=True):
+            recovered = replay(self.journal_dir, {"prueba": seen.append})
+        self.assertEqual([o["op"] for o in recovered], ["abc"])
+        self.assertEqual(len(seen), 1)
+        self.assertFalse(os.path.exists(path))
+
+    def test_diario_ilegible_no_detiene(self):
+        bad = self._leftover("20260128_120000_1.jsonl", "abc")
+        self._leftover("20260128_120001_2.jsonl", "def")
+        real_parse = terapias_journal._parse_journal
+        calls = []
+
+        def parse(lines):
+            calls.append(1)
+            if len(calls) == 1:
+                raise OSError("disco no disponible")
+            return real_parse(lines)
+
+        with mock.patch("terapias_journal._parse_journal", side_effect=parse):
+            recovered = replay(self.journal_dir, {})
+        self.assertEqual([o["op"] for o in recovered], ["def"])
+        # El que no se pudo leer se deja para el siguiente inicio
+        self.assertTrue(os.path.exists(bad))
+
+    def test_linea_cortada(self):
+        os.makedirs(self.journal_dir)
+        path = os.path.join(self.journal_dir, "20260128_120000_1.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"t": "inicio", "op": "abc", "tipo": "prueba", "pasos": []}) + "\n")
+            f.write('{"t": "fin", "op": "ab')
+        self.assertEqual([o["op"] for o in read_journal(path)], ["abc"])
+
+    def test_recuperar_organizar(self):
+        source = os.path.join(self.temp_dir, "origen")
+        base = os.path.join(self.temp_dir, "TERAPIAS")
+        docs = [self._write(os.path.join("origen", f"{i}.docx"), str(i)) for i in range(3)]
+        plan = plan_batch([(d, f"SS Paciente {i}") for i, d in enumerate(docs)], base, HOY, MESES)
+        journal = OperationJournal(self.journal_dir)
+        results = apply_batch(plan, os.path.join(self.temp_dir, "RESPALDO"), journal=journal)
+        self.assertEqual([r["status"] for r in results], [STATUS_OK] * 3)
+        # Cierre a medias: movidos pero sin registrar; uno además vuelve a su origen
+        os.rename(results[2]["target"], docs[2])
+        journal.close()
+        history = HistoryStore(os.path.join(self.temp_dir, "historial.sqlite"))
+        recovered = OperationJournal(self.journal_dir).replay({
+            KIND_ORGANIZE: lambda op: replay_organize(op, None, history, base),
+        })
+        self.assertEqual([s["estado"] for s in recovered[0]["steps"]], [STEP_DONE, STEP_DONE, STEP_NOT_DONE])
+        self.assertEqual(sorted(e["patient"] for e in history.page(0, 10)), ["Paciente 0", "Paciente 1"])
+        self.assertTrue(os.path.isfile(docs[2]))
+        self.assertEqual(os.listdir(self.journal_dir), [])
+        self.assertTrue(os.path.isdir(source))
+
+    def test_recuperar_respaldo(self):
+        backup = os.path.join(self.temp_dir, "RESPALDO")
+        store = get_store(backup)
+        doc = self._write("SS Ana.docx", "contenido de Ana")
+        journal = OperationJournal(self.journal_dir)
+        journal.begin(KIND_BACKUP, [{"de": os.path.abspath(doc), "a": None}], {"respaldo": backup})
+        # Cierre justo después de llevar el documento al temporal del almacén
+        os.makedirs(store.objects_dir, exist_ok=True)
+        os.replace(doc, store._tmp_path(doc))
+        journal.close()
+        OperationJournal(self.journal_dir).replay({KIND_BACKUP: replay_backup})
+        entries = store.find("SS Ana")
+        self.assertEqual(len(entries), 1)
+        with open(entries[0]["blob"], encoding="utf-8") as f:
+            self.assertEqual(f.read(), "contenido de Ana")
+        self.assertFalse(os.path.exists(store._tmp_path(doc)))
+
+
+if __name__ == "__main__":
+    unittest.main()
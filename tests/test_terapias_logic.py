@@ -1,6 +1,7 @@
 """
 Tests unitarios para terapias_logic.py
 """
+import datetime
 import os
 import tempfile
 import unittest
@@ -10,6 +11,10 @@ from terapias_logic import (
     patient_from_user_input,
     check_path_length,
     build_folder_structure,
+    parse_folder_date,
+    parse_month_folder,
+    parse_user_date,
+    date_range_preset,
 )
 
 
@@ -116,5 +121,51 @@ class TestBuildFolderStructure(unittest.TestCase):
         self.assertIn("01 DE DICIEMBRE", ruta_dia)
 
 
+class TestParseFolderDate(unittest.TestCase):
+    """Tests para parse_folder_date (inverso de build_folder_structure)."""
+
+    def setUp(self):
+        self.meses = {
+            1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+            5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+            9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+        }
+
+    def test_ida_y_vuelta(self):
+        ruta_anio, ruta_mes, ruta_dia, _ = build_folder_structure("C:\\TERAPIAS", 2026, 1, 28, self.meses)
+        fecha = parse_folder_date(os.path.basename(ruta_anio), os.path.basename(ruta_mes), os.path.basename(ruta_dia), self.meses)
+        self.assertEqual(fecha, datetime.date(2026, 1, 28))
+
+    def test_mes_sin_numero(self):
+        self.assertEqual(parse_folder_date("2025", "MARZO", "05 DE MARZO", self.meses), datetime.date(2025, 3, 5))
+
+    def test_nombres_invalidos(self):
+        self.assertIsNone(parse_folder_date("varios", "01- ENERO", "28 DE ENERO", self.meses))
+        self.assertIsNone(parse_folder_date("2026", "02- FEBRERO", "31 DE FEBRERO", self.meses))
+        self.assertIsNone(parse_folder_date("2026", "OTROS", "01 DE ENERO", self.meses))
+
+    def test_mes_por_partes(self):
+        self.assertEqual(parse_month_folder("12- DICIEMBRE", self.meses), 12)
+        self.assertEqual(parse_month_folder("diciembre", self.meses), 12)
+        self.assertIsNone(parse_month_folder("13- NADA", self.meses))
+
+
+class TestRangosDeFecha(unittest.TestCase):
+    """Tests para parse_user_date y date_range_preset."""
+
+    def test_formatos_de_fecha(self):
+        self.assertEqual(parse_user_date("2026-01-28"), datetime.date(2026, 1, 28))
+        self.assertEqual(parse_user_date("28/01/2026"), datetime.date(2026, 1, 28))
+        self.assertIsNone(parse_user_date("31/02/2026"))
+        self.assertIsNone(parse_user_date(""))
+
+    def test_presets(self):
+        hoy = datetime.date(2026, 3, 15)
+        self.assertEqual(date_range_preset("Hoy", hoy), (hoy, hoy))
+        self.assertEqual(date_range_preset("Este mes", hoy), (datetime.date(2026, 3, 1), hoy))
+        self.assertEqual(date_range_preset("Mes anterior", hoy), (datetime.date(2026, 2, 1), datetime.date(2026, 2, 28)))
+        self.assertEqual(date_range_preset("Todo", hoy), (None, None))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests del organizado por lotes (terapias_organize.py).
+"""
+import os
+import shutil
+import datetime
+import tempfile
+import threading
+import unittest
+
+from terapias_organize import plan_batch, apply_batch, free_doc_stem, STATUS_OK, STATUS_ERROR, STATUS_SKIPPED
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+}
+HOY = datetime.date(2026, 1, 28)
+
+
+class TestOrganizarLote(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_organize_")
+        self.source = os.path.join(self.temp_dir, "origen")
+        self.base = os.path.join(self.temp_dir, "TERAPIAS")
+        self.backup = os.path.join(self.temp_dir, "RESPALDO")
+        os.makedirs(self.source)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _doc(self, name, content="x"):
+        path = os.path.join(self.source, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_plan_nombres_y_pacientes(self):
+        a, b, c = self._doc("a.docx"), self._doc("b.doc"), self._doc("c.docx")
+        plan = plan_batch([(a, "SS Juan Pérez"), (b, "SS Juan Pérez"), (c, "")], self.base, HOY, MESES)
+        dia = os.path.join(self.base, "2026", "01- ENERO", "28 DE ENERO", "Juan Pérez")
+        self.assertEqual(plan[0]["patient"], "Juan Pérez")
+        self.assertEqual(plan[0]["target"], os.path.join(dia, "SS Juan Pérez.docx"))
+        # Mismo nombre en el mismo lote: no se pisan
+        self.assertEqual(plan[1]["target"], os.path.join(dia, "SS Juan Pérez_1.doc"))
+        self.assertIsNotNone(plan[2]["error"])
+        # Planificar no toca el disco
+        self.assertFalse(os.path.exists(self.base))
+
+    def test_nombre_libre_con_su_pdf(self):
+        folder = os.path.join(self.temp_dir, "Juan")
+        os.makedirs(folder)
+        self.assertEqual(free_doc_stem(folder, "SS Juan", ".docx"), os.path.join(folder, "SS Juan"))
+        # Queda el PDF de un documento anterior ya pasado a respaldo: el nuevo no puede esperarlo
+        with open(os.path.join(folder, "SS Juan.pdf"), "w", encoding="utf-8") as f:
+            f.write("%PDF")
+        self.assertEqual(free_doc_stem(folder, "SS Juan", ".docx"), os.path.join(folder, "SS Juan_1"))
+        claimed = {os.path.normcase(os.path.join(folder, "SS Juan_1"))}
+        self.assertEqual(free_doc_stem(folder, "SS Juan", ".docx", claimed), os.path.join(folder, "SS Juan_2"))
+
+    def test_plan_ruta_larga_y_repetido(self):
+        a = self._doc("a.docx")
+        plan = plan_batch([(a, "SS " + "x" * 300), (a, "SS Ana"), (a, "SS Ana")], self.base, HOY, MESES)
+        self.assertIn("larga", plan[0]["error"])
+        self.assertIsNone(plan[1]["error"])
+        self.assertIn("repetido", plan[2]["error"])
+
+    def test_aplicar(self):
+        docs = [self._doc(f"{i}.docx", str(i)) for i in range(6)]
+        plan = plan_batch([(d, f"SS Paciente {i % 2}") for i, d in enumerate(docs)] + [(docs[0], "")], self.base, HOY, MESES)
+        calls = []
+        results = apply_batch(plan, self.backup, progress=lambda done, total: calls.append((done, total)))
+        self.assertEqual([r["status"] for r in results], [STATUS_OK] * 6 + [STATUS_ERROR])
+        for r in results[:6]:
+            self.assertTrue(os.path.isfile(r["target"]))
+            self.assertTrue(os.path.isfile(r["backup"]))
+            self.assertFalse(os.path.exists(r["source"]))
+        self.assertEqual(len(set(r["backup"] for r in results[:6])), 6)
+        self.assertEqual(calls[-1], (6, 6))
+
+    def test_origen_desaparecido(self):
+        a = self._doc("a.docx")
+        plan = plan_batch([(a, "SS Ana")], self.base, HOY, MESES)
+        os.remove(a)
+        self.assertEqual(apply_batch(plan, self.backup)[0]["status"], STATUS_ERROR)
+
+    def test_cancelado_antes_de_empezar(self):
+        plan = plan_batch([(self._doc("a.docx"), "SS Ana")], self.base, HOY, MESES)
+        cancel = threading.Event()
+        cancel.set()
+        self.assertEqual(apply_batch(plan, self.backup, cancel=cancel)[0]["status"], STATUS_SKIPPED)
+        self.assertTrue(os.path.exists(plan[0]["source"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
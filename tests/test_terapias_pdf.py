@@ -0,0 +1,176 @@
+"""
+Tests de los conversores a PDF (terapias_pdf.py): backend de pruebas y grupo de conversores.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import subprocess
+from unittest import mock
+
+from terapias_pdf import (
+    ConverterBackend, ConverterPool, FakeBackend, LibreOfficeBackend, backend_factory, find_soffice,
+)
+
+
+class _CountingBackend(FakeBackend):
+    """FakeBackend que anota en created/closed cuándo se crea y se cierra cada instancia."""
+
+    created = []
+    closed = []
+
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.created.append(self)
+
+    def close(self):
+        self.closed.append(self)
+
+
+class TestConversoresPdf(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_pdf_")
+        _CountingBackend.created = []
+        _CountingBackend.closed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _doc(self, name):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(name)
+        return path
+
+    def test_fake_escribe_pdf(self):
+        doc = self._doc("a.docx")
+        pdf = os.path.join(self.temp_dir, "a.pdf")
+        backend = FakeBackend()
+        self.assertTrue(backend.convert(doc, pdf))
+        with open(pdf, "rb") as f:
+            self.assertTrue(f.read().startswith(b"%PDF"))
+        self.assertFalse(backend.convert(os.path.join(self.temp_dir, "no.docx"), pdf))
+
+    def test_pool_reutiliza_conversor(self):
+        pool = ConverterPool(_CountingBackend, size=1)
+        try:
+            for i in range(5):
+                doc = self._doc(f"{i}.docx")
+                self.assertTrue(pool.convert(doc, doc[:-5] + ".pdf"))
+        finally:
+            pool.close(wait=True)
+        self.assertEqual(len(_CountingBackend.created), 1)
+        self.assertEqual(len(_CountingBackend.created[0].converted), 5)
+        self.assertEqual(_CountingBackend.closed, _CountingBackend.created)
+
+    def test_pool_varios_hilos(self):
+        pool = ConverterPool(lambda: _CountingBackend(delay=0.05), size=3)
+        try:
+            futures = [pool.submit(self._doc(f"{i}.docx"), os.path.join(self.temp_dir, f"{i}.pdf")) for i in range(9)]
+            self.assertTrue(all(f.result(5) for f in futures))
+        finally:
+            pool.close(wait=True)
+        self.assertLessEqual(len(_CountingBackend.created), 3)
+        self.assertEqual(sum(len(b.converted) for b in _CountingBackend.created), 9)
+
+    def test_excepcion_descarta_conversor(self):
+        class Broken(ConverterBackend):
+            def convert(self, doc_path, pdf_path):
+                raise RuntimeError("Word dejó de responder")
+        made = []
+
+        def factory():
+            made.append(1)
+            return Broken() if len(made) == 1 else FakeBackend()
+
+        pool = ConverterPool(factory)
+        try:
+            doc = self._doc("a.docx")
+            self.assertFalse(pool.convert(doc, os.path.join(self.temp_dir, "a.pdf")))
+            self.assertTrue(pool.convert(doc, os.path.join(self.temp_dir, "a.pdf")))
+        finally:
+            pool.close(wait=True)
+        self.assertEqual(len(made), 2)
+
+    def test_cierre_por_inactividad(self):
+        pool = ConverterPool(_CountingBackend, idle_timeout=0.05)
+        try:
+            doc = self._doc("a.docx")
+            self.assertTrue(pool.convert(doc, os.path.join(self.temp_dir, "a.pdf")))
+            for _ in range(100):
+                if _CountingBackend.closed:
+                    break
+                threading.Event().wait(0.01)
+            self.assertEqual(len(_CountingBackend.closed), 1)
+            self.assertTrue(pool.convert(doc, os.path.join(self.temp_dir, "b.pdf")))
+            self.assertEqual(len(_CountingBackend.created), 2)
+        finally:
+            pool.close(wait=True)
+
+    def test_cerrar_cancela_pendientes(self):
+        started, release = threading.Event(), threading.Event()
+
+        class Slow(FakeBackend):
+            def convert(self, doc_path, pdf_path):
+                started.set()
+                release.wait(5)
+                return super().convert(doc_path, pdf_path)
+
+        pool = ConverterPool(Slow)
+        doc = self._doc("a.docx")
+        first = pool.submit(doc, os.path.join(self.temp_dir, "1.pdf"))
+        started.wait(5)
+        second = pool.submit(doc, os.path.join(self.temp_dir, "2.pdf"))
+        pool.close()
+        release.set()
+        self.assertTrue(first.result(5))
+        self.assertTrue(second.cancelled())
+        with self.assertRaises(RuntimeError):
+            pool.submit(doc, os.path.join(self.temp_dir, "3.pdf"))
+
+    def test_factory(self):
+        self.assertIsInstance(backend_factory("fake")(), FakeBackend)
+        self.assertEqual(backend_factory("fake", delay=0.5)().delay, 0.5)
+        with self.assertRaises(ValueError):
+            backend_factory("impresora")
+
+    def test_libreoffice_entrega_pdf(self):
+        doc = self._doc("a.docx")
+        pdf = os.path.join(self.temp_dir, "a.pdf")
+
+        def fake_soffice(cmd, **kw):
+            outdir = cmd[cmd.index("--outdir") + 1]
+            os.makedirs(outdir, exist_ok=True)
+            with open(os.path.join(outdir, "a.pdf"), "wb") as f:
+                f.write(b"%PDF-1.4")
+            return subprocess.CompletedProcess(cmd, 0, b"", b"")
+
+        with mock.patch("terapias_pdf.find_soffice", return_value="soffice"), \
+                mock.patch("terapias_pdf.subprocess.run", side_effect=fake_soffice):
+            backend = LibreOfficeBackend()
+            try:
+                self.assertTrue(backend.convert(doc, pdf))
+            finally:
+                backend.close()
+        # El PDF se saca del directorio de trabajo antes de borrarlo
+        with open(pdf, "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1.4")
+
+    @unittest.skipUnless(find_soffice(), "LibreOffice no está instalado")
+    def test_libreoffice(self):
+        doc = os.path.join(self.temp_dir, "a.txt")
+        with open(doc, "w", encoding="utf-8") as f:
+            f.write("Informe de prueba")
+        backend = LibreOfficeBackend()
+        try:
+            pdf = os.path.join(self.temp_dir, "a.pdf")
+            self.assertTrue(backend.convert(doc, pdf))
+            self.assertTrue(os.path.isfile(pdf))
+        finally:
+            backend.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests del seguimiento de documentos a la espera de su PDF (terapias_pending.py).
+"""
+import os
+import shutil
+import datetime
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from terapias_logic import build_folder_structure
+from terapias_history import HistoryStore
+from terapias_pending import PendingPdfTracker
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+}
+HOY = datetime.date(2026, 1, 28)
+
+
+class TestPdfPendientes(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_pending_")
+        self.base = os.path.join(self.temp_dir, "TERAPIAS")
+        self.backup = os.path.join(self.temp_dir, "RESPALDO")
+        _, _, self.dia, _ = build_folder_structure(self.base, HOY.year, HOY.month, HOY.day, MESES)
+        self.history = HistoryStore(os.path.join(self.temp_dir, "historial.sqlite"))
+        self.tracker = PendingPdfTracker(self.backup, history_store=self.history)
+
+    def tearDown(self):
+        self.tracker.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, path, content="x"):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def _doc(self, patient):
+        return self._write(os.path.join(self.dia, patient, f"SS {patient}.docx"))
+
+    def test_varios_pendientes(self):
+        ana, luis = self._doc("Ana"), self._doc("Luis")
+        self.tracker.expect(ana, patient="Ana")
+        self.tracker.expect(luis, patient="Luis")
+        self.assertEqual(self.tracker.poll(), [])
+        self._write(ana[:-5] + ".pdf", "%PDF")
+        # Primera vez que se ve el PDF: se espera a confirmar que no sigue creciendo
+        self.assertEqual(self.tracker.poll(), [])
+        finalized = self.tracker.poll()
+        self.assertEqual([e["doc"] for e in finalized], [ana])
+        self.assertFalse(os.path.exists(ana))
+        self.assertTrue(os.path.isfile(finalized[0]["backup"]))
+        self.assertEqual([e["doc"] for e in self.tracker.pending()], [luis])
+        self.assertEqual(self.history.page(0, 10)[0]["event"], "pdf")
+
+    def test_pdf_creciendo_o_vacio(self):
+        ana = self._doc("Ana")
+        pdf = ana[:-5] + ".pdf"
+        self.tracker.expect(ana)
+        self._write(pdf, "")
+        self.tracker.poll()
+        self.assertEqual(self.tracker.poll(), [])
+        self._write(pdf, "%PDF")
+        self.tracker.poll()
+        self._write(pdf, "%PDF-1.7 más contenido")
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertEqual(len(self.tracker.poll()), 1)
+
+    def test_documento_bloqueado_se_reintenta(self):
+        ana = self._doc("Ana")
+        self.tracker.expect(ana)
+        self._write(ana[:-5] + ".pdf", "%PDF")
+        self.tracker.poll()
+        with mock.patch("terapias_pending.backup_converted", side_effect=PermissionError("abierto en Word")):
+            self.assertEqual(self.tracker.poll(), [])
+        self.assertTrue(self.tracker.is_pending(ana))
+        self.assertEqual(len(self.tracker.poll()), 1)
+
+    def test_pdf_anterior_no_cuenta(self):
+        juan = self._doc("Juan")
+        pdf = juan[:-5] + ".pdf"
+        self._write(pdf, "%PDF de otro documento")
+        old = os.path.getmtime(pdf) - 3600
+        os.utime(pdf, (old, old))
+        self.tracker.expect(juan, pdf, "Juan")
+        self.tracker.poll()
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertTrue(os.path.exists(juan))
+        # Al guardarse el PDF nuevo encima sí se finaliza
+        self._write(pdf, "%PDF nuevo")
+        self.tracker.poll()
+        self.assertEqual(len(self.tracker.poll()), 1)
+
+    def test_documento_finalizado_por_otra_via(self):
+        ana = self._doc("Ana")
+        self.tracker.expect(ana)
+        os.remove(ana)
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertEqual(self.tracker.pending(), [])
+
+    def test_recuperar_pendientes(self):
+        ana = self._doc("Ana")
+        self._doc("Luis")
+        self.tracker.expect(ana, os.path.join(self.dia, "Ana", "otro nombre.pdf"))
+        self.assertEqual(self.tracker.adopt(self.base, MESES, HOY, HOY), 1)
+        self.assertEqual(len(self.tracker.pending()), 2)
+        self.assertTrue(self.tracker.get(ana)["pdf"].endswith("otro nombre.pdf"))
+        # Un PDF guardado con la app cerrada (posterior al documento) sí cuenta
+        luis = self.tracker.get(os.path.join(self.dia, "Luis", "SS Luis.docx"))
+        self.assertEqual(luis["since"], os.path.getmtime(luis["doc"]))
+
+    def test_hilo_de_sondeo(self):
+        done = threading.Event()
+        tracker = PendingPdfTracker(self.backup, on_finalized=lambda entries: done.set(), interval=0.02)
+        ana = self._doc("Ana")
+        tracker.expect(ana)
+        self._write(ana[:-5] + ".pdf", "%PDF")
+        tracker.start()
+        try:
+            self.assertTrue(done.wait(5))
+        finally:
+            tracker.stop()
+        self.assertFalse(os.path.exists(ana))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests de la copia y el movimiento verificados y continuables (terapias_transfer.py).
+"""
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from terapias_transfer import copy_file, move_file, file_sha256, TransferCancelled, _partial_path
+
+CHUNK = 1024
+DATA = bytes(range(256)) * 20  # 5120 bytes: varios bloques de CHUNK
+
+
+class TestTransferencia(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="terapias_transfer_")
+        self.src = os.path.join(self.temp_dir, "origen.docx")
+        self.dst = os.path.join(self.temp_dir, "destino", "SS Ana.docx")
+        os.makedirs(os.path.dirname(self.dst))
+        with open(self.src, "wb") as f:
+            f.write(DATA)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _cross_volume(self):
+        """os.rename/os.replace del origen fallan como entre dos discos."""
+        real_rename, real_replace = os.rename, os.replace
+
+        def fail_for_src(real):
+            def fn(a, b):
+                if a == self.src:
+                    raise OSError(18, "otro disco")
+                return real(a, b)
+            return fn
+
+        return mock.patch.multiple("terapias_transfer.os", rename=fail_for_src(real_rename), replace=fail_for_src(real_replace))
+
+    def test_copiar_con_progreso(self):
+        calls = []
+        digest = copy_file(self.src, self.dst, progress=lambda done, total: calls.append((done, total)), chunk_size=CHUNK)
+        self.assertEqual(digest, hashlib.sha256(DATA).hexdigest())
+        self.assertEqual(self._read(self.dst), DATA)
+        self.assertEqual(calls[0], (CHUNK, len(DATA)))
+        self.assertEqual(calls[-1], (len(DATA), len(DATA)))
+        self.assertEqual(os.path.getmtime(self.dst), os.path.getmtime(self.src))
+        self.assertEqual(file_sha256(self.dst), digest)
+
+    def test_continuar_copia_cortada(self):
+        partial = _partial_path(self.src, self.dst, os.stat(self.src))
+        with open(partial, "wb") as f:
+            f.write(DATA[:3000])
+        calls = []
+        copy_file(self.src, self.dst, progress=lambda done, total: calls.append(done), chunk_size=CHUNK)
+        self.assertEqual(calls[0], 3000)
+        self.assertEqual(self._read(self.dst), DATA)
+        self.assertFalse(os.path.exists(partial))
+
+    def test_parcial_corrupto_no_se_da_por_bueno(self):
+        partial = _partial_path(self.src, self.dst, os.stat(self.src))
+        with open(partial, "wb") as f:
+            f.write(b"\0" * 3000)
+        with self.assertRaises(OSError):
+            copy_file(self.src, self.dst, chunk_size=CHUNK)
+        self.assertFalse(os.path.exists(self.dst))
+        self.assertFalse(os.path.exists(partial))
+        copy_file(self.src, self.dst, chunk_size=CHUNK)
+        self.assertEqual(self._read(self.dst), DATA)
+
+    def test_cancelar_conserva_parcial(self):
+        cancel = threading.Event()
+        with self.assertRaises(TransferCancelled):
+            copy_file(self.src, self.dst, progress=lambda done, total: cancel.set(), cancel=cancel, chunk_size=CHUNK)
+        partial = _partial_path(self.src, self.dst, os.stat(self.src))
+        self.assertEqual(os.path.getsize(partial), CHUNK)
+        self.assertFalse(os.path.exists(self.dst))
+
+    def test_mover_mismo_disco(self):
+        self.assertIsNone(move_file(self.src, self.dst))
+        self.assertFalse(os.path.exists(self.src))
+        self.assertEqual(self._read(self.dst), DATA)
+
+    def test_mover_entre_discos(self):
+        with self._cross_volume():
+            digest = move_file(self.src, self.dst, chunk_size=CHUNK)
+        self.assertEqual(digest, hashlib.sha256(DATA).hexdigest())
+        self.assertFalse(os.path.exists(self.src))
+        self.assertEqual(self._read(self.dst), DATA)
+
+    def test_original_bloqueado(self):
+        real_remove = os.remove
+
+        def remove(path):
+            if path == self.src:
+                raise PermissionError("abierto en Word")
+            return real_remove(path)
+
+        with self._cross_volume(), mock.patch("terapias_transfer.os.remove", side_effect=remove):
+            with self.assertRaises(OSError):
+                move_file(self.src, self.dst)
+        self.assertTrue(os.path.exists(self.src))
+        self.assertFalse(os.path.exists(self.dst))
+
+    def test_no_pisa_destino(self):
+        with open(self.dst, "wb") as f:
+            f.write(b"otro")
+        with self.assertRaises(FileExistsError):
+            move_file(self.src, self.dst)
+        self.assertTrue(os.path.exists(self.src))
+        move_file(self.src, self.dst, overwrite=True)
+        self.assertEqual(self._read(self.dst), DATA)
+
+
+if __name__ == "__main__":
+    unittest.main()
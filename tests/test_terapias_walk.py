@@ -0,0 +1,108 @@
+"""
+Tests del recorrido paralelo de carpetas (terapias_walk.py).
+"""
+import os
+import shutil
+import datetime
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from terapias_logic import build_folder_structure
+from terapias_walk import iter_patient_folders, iter_patient_folders_under, folder_depth
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+}
+
+
+class TestIterPatientFolders(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp(prefix="terapias_walk_")
+        self.expected = set()
+        for year, month, day, paciente in [
+            (2025, 12, 1, "Juan Pérez"),
+            (2026, 1, 28, "Juan Pérez"),
+            (2026, 1, 28, "María García"),
+            (2026, 2, 3, "Ana López"),
+        ]:
+            ruta_anio, ruta_mes, ruta_dia, _ = build_folder_structure(self.base, year, month, day, MESES)
+            path = os.path.join(ruta_dia, paciente)
+            os.makedirs(path, exist_ok=True)
+            self.expected.add((paciente, path, os.path.basename(ruta_anio), os.path.basename(ruta_mes), os.path.basename(ruta_dia)))
+        # Archivos sueltos en cualquier nivel deben ignorarse
+        with open(os.path.join(self.base, "notas.txt"), "w") as f:
+            f.write("x")
+        with open(os.path.join(ruta_dia, "suelto.docx"), "w") as f:
+            f.write("x")
+
+    def tearDown(self):
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def test_encuentra_todas_las_carpetas(self):
+        self.assertEqual(set(iter_patient_folders(self.base)), self.expected)
+
+    def test_un_solo_hilo(self):
+        self.assertEqual(set(iter_patient_folders(self.base, max_workers=1)), self.expected)
+
+    def test_carpeta_inexistente(self):
+        self.assertEqual(list(iter_patient_folders(os.path.join(self.base, "no_existe"))), [])
+
+    def test_cortar_iteracion(self):
+        walker = iter_patient_folders(self.base)
+        self.assertEqual(len(next(walker)), 5)
+        walker.close()
+
+    def test_cancelado(self):
+        cancel = threading.Event()
+        cancel.set()
+        self.assertEqual(list(iter_patient_folders(self.base, cancel=cancel)), [])
+
+
+    def test_rango_de_fechas(self):
+        found = list(iter_patient_folders(self.base, date_from=datetime.date(2026, 1, 1), date_to=datetime.date(2026, 1, 31), meses=MESES))
+        self.assertEqual(sorted(e[0] for e in found), ["Juan Pérez", "María García"])
+        found = list(iter_patient_folders(self.base, date_from=datetime.date(2026, 1, 29), meses=MESES))
+        self.assertEqual([e[0] for e in found], ["Ana López"])
+
+    def test_poda_no_lista_carpetas_fuera_de_rango(self):
+        listed = []
+        real_scandir = os.scandir
+
+        def spy(path):
+            listed.append(os.path.relpath(path, self.base))
+            return real_scandir(path)
+
+        with patch("terapias_walk.os.scandir", side_effect=spy):
+            list(iter_patient_folders(self.base, date_from=datetime.date(2026, 2, 1), date_to=datetime.date(2026, 2, 28), meses=MESES))
+        self.assertNotIn("2025", listed)
+        self.assertNotIn(os.path.join("2026", "01- ENERO"), listed)
+        self.assertIn(os.path.join("2026", "02- FEBRERO"), listed)
+
+    def test_rango_sin_meses(self):
+        with self.assertRaises(ValueError):
+            list(iter_patient_folders(self.base, date_from=datetime.date(2026, 1, 1)))
+
+    def test_profundidad(self):
+        self.assertEqual(folder_depth(self.base, self.base), 0)
+        self.assertEqual(folder_depth(self.base, os.path.join(self.base, "2026")), 1)
+        self.assertEqual(folder_depth(self.base, os.path.join(self.base, "2026", "01- ENERO", "28 DE ENERO")), 3)
+        self.assertIsNone(folder_depth(self.base, os.path.dirname(self.base)))
+
+    def test_recorrer_solo_una_parte(self):
+        enero = os.path.join(self.base, "2026", "01- ENERO")
+        self.assertEqual(
+            set(iter_patient_folders_under(self.base, enero)),
+            {e for e in self.expected if e[3] == "01- ENERO"},
+        )
+        self.assertEqual(set(iter_patient_folders_under(self.base, os.path.join(self.base, "2026"))),
+                         {e for e in self.expected if e[2] == "2026"})
+        self.assertEqual(set(iter_patient_folders_under(self.base, self.base)), self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Tests de la vigilancia de carpetas (terapias_watch.py).
+"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+from terapias_logic import build_folder_structure
+from terapias_watch import ChangeBatcher, PollingWatcher, FolderWatcher
+
+MESES = {
+    1: "ENERO", 2: "FEBRERO", 3: "MARZO", 4: "ABRIL",
+    5: "MAYO", 6: "JUNIO", 7: "JULIO", 8: "AGOSTO",
+    9: "SEPTIEMBRE", 10: "OCTUBRE", 11: "NOVIEMBRE", 12: "DICIEMBRE",
+}
+
+
+class TestChangeBatcher(unittest.TestCase):
+
+    def test_agrupa_cambios(self):
+        batches = []
+        done = threading.Event()
+
+        def on_batch(dirs):
+            batches.append(dirs)
+            done.set()
+
+        batcher = ChangeBatcher(on_batch, quiet=0.1)
+        try:
+            batcher.add({"a"})
+            batcher.add({"b", "a"})
+            self.assertTrue(done.wait(2))
+        finally:
+            batcher.stop()
+        self.assertEqual(batches, [{"a", "b"}])
+
+
+class TestWatchers(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp(prefix="terapias_watch_")
+        _, _, self.ruta_dia, _ = build_folder_structure(self.base, 2026, 1, 28, MESES)
+        os.makedirs(os.path.join(self.ruta_dia, "Juan Pérez"))
+
+    def tearDown(self):
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def test_sondeo_detecta_carpetas_nuevas_y_borradas(self):
+        watcher = PollingWatcher(self.base, lambda dirs: None)
+        watcher._track(watcher.base_dest, 0)
+        self.assertEqual(watcher.poll(), set())
+        os.makedirs(os.path.join(self.ruta_dia, "Ana López"))
+        os.utime(self.ruta_dia, ns=(0, 1))
+        self.assertEqual(watcher.poll(), {os.path.normpath(self.ruta_dia)})
+        # Un mes nuevo se vigila desde ese momento
+        _, ruta_mes, ruta_dia, _ = build_folder_structure(self.base, 2026, 2, 3, MESES)
+        os.makedirs(ruta_dia)
+        os.utime(os.path.dirname(ruta_mes), ns=(0, 2))
+        self.assertIn(os.path.dirname(ruta_mes), watcher.poll())
+        self.assertIn(ruta_dia, watcher._mtimes)
+        shutil.rmtree(ruta_mes)
+        self.assertIn(os.path.dirname(ruta_mes), watcher.poll())
+        self.assertNotIn(ruta_dia, watcher._mtimes)
+
+    def _espera_lote(self, use_inotify):
+        received = []
+        done = threading.Event()
+
+        def on_batch(dirs):
+            received.append(dirs)
+            done.set()
+
+        watcher = FolderWatcher(self.base, on_batch, quiet=0.1, poll_interval=0.1, use_inotify=use_inotify)
+        watcher.start()
+        try:
+            os.makedirs(os.path.join(self.ruta_dia, "Ana López"))
+            self.assertTrue(done.wait(5))
+        finally:
+            watcher.stop()
+        return watcher, received
+
+    def test_vigilante_por_sondeo(self):
+        watcher, received = self._espera_lote(use_inotify=False)
+        self.assertEqual(watcher.backend, "sondeo")
+        self.assertIn(os.path.normpath(self.ruta_dia), received[0])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify solo existe en Linux")
+    def test_vigilante_inotify(self):
+        watcher, received = self._espera_lote(use_inotify=True)
+        self.assertEqual(watcher.backend, "inotify")
+        self.assertIn(os.path.normpath(self.ruta_dia), received[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -242,6 +242,17 @@ class GlassCard(ctk.CTkFrame):
             self.bind("<Enter>", self.on_hover)
             self.bind("<Leave>", self.on_leave)
 
+    def update_content(self, icon=None, title=None, subtitle=None, command=None):
+        """Cambia el contenido de la tarjeta sin recrearla (tarjetas reutilizadas en listas virtuales)."""
+        if icon is not None:
+            self.lbl_icon.configure(text=icon)
+        if title is not None:
+            self.lbl_title.configure(text=title)
+        if subtitle is not None:
+            self.lbl_sub.configure(text=subtitle)
+        if command is not None:
+            self.command = command
+
     def on_click(self):
         if self.command:
             self.command()
@@ -261,6 +272,101 @@ class GlassCard(ctk.CTkFrame):
         )
 
 
+class VirtualCardList(ctk.CTkFrame):
+    """
+    Lista virtual de GlassCard: solo existen las tarjetas que caben en pantalla y se reutilizan
+    al desplazarse. fetch(desplazamiento, cantidad) devuelve las filas visibles y
+    card_content(fila) el dict icon/title/subtitle/command de cada tarjeta, así que el coste de
+    memoria y de repintado no depende del número de filas.
+    """
+    def __init__(self, parent, fetch, card_content, row_height=92, wheel_rows=3, empty_text="", **kwargs):
+        super().__init__(parent, fg_color="transparent", **kwargs)
+        self.fetch = fetch
+        self.card_content = card_content
+        self.row_height = row_height
+        self.wheel_rows = wheel_rows
+        self.total = 0
+        self.offset = 0
+        self._cards = []
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.list_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.list_frame.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.lbl_empty = ctk.CTkLabel(
+            self.list_frame, text=empty_text, font=VisionSys.FONT_BODY_M,
+            text_color=(VisionSys.TEXT_TERTIARY_LIGHT, VisionSys.TEXT_TERTIARY_DARK)
+        )
+        self.list_frame.bind("<Configure>", lambda e: self.refresh())
+        self._bind_wheel(self.list_frame)
+
+    def set_total(self, total, reset=True):
+        """Número de filas; con reset=False se conserva la posición (p. ej. al añadir resultados)."""
+        self.total = total
+        if reset:
+            self.offset = 0
+        self.refresh()
+
+    def set_empty_text(self, text, text_color=None):
+        """Mensaje que se muestra cuando la lista está vacía."""
+        self.lbl_empty.configure(text=text, text_color=text_color or (VisionSys.TEXT_TERTIARY_LIGHT, VisionSys.TEXT_TERTIARY_DARK))
+
+    def visible_rows(self):
+        return max(1, -(-self.list_frame.winfo_height() // self.row_height))
+
+    def refresh(self):
+        """Vuelve a pedir y pintar las filas visibles."""
+        visible = self.visible_rows()
+        self.offset = max(0, min(self.offset, self.total - visible))
+        while len(self._cards) < visible:
+            # Alto fijo (CTk no admite height en place): la fila i siempre ocupa el mismo hueco
+            card = GlassCard(self.list_frame, title="", subtitle="", command=lambda: None, height=self.row_height - VisionSys.SPACE_XS)
+            card.grid_propagate(False)
+            self._bind_wheel(card)
+            for child in card.winfo_children():
+                self._bind_wheel(child)
+            self._cards.append(card)
+        rows = self.fetch(self.offset, visible) if self.total else []
+        for i, card in enumerate(self._cards):
+            if i < len(rows):
+                card.update_content(**self.card_content(rows[i]))
+                card.place(x=0, y=i * self.row_height, relwidth=1)
+            else:
+                card.place_forget()
+        if rows:
+            self.lbl_empty.place_forget()
+        else:
+            self.lbl_empty.place(relx=0.5, y=VisionSys.SPACE_XXL, anchor="n")
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, min(1.0, (self.offset + visible) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, offset):
+        if offset != self.offset:
+            self.offset = max(0, offset)
+            self.refresh()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self.total))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self.scroll_to(self.offset + int(float(value)) * step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) in (4, 5):
+            delta = -1 if event.num == 4 else 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.scroll_to(self.offset + delta * self.wheel_rows)
+
+    def _bind_wheel(self, widget):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self._on_wheel)
+
+
 class SectionHeader(ctk.CTkFrame):
     """Título de sección: jerarquía marcada, separación limpia."""
     def __init__(self, parent, title, subtitle=None, **kwargs):